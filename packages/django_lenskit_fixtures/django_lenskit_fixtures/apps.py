@@ -7,3 +7,14 @@ class FixturesAppConfig(AppConfig):
     name = "django_lenskit_fixtures"
     label = "django_lenskit_fixtures"
     verbose_name = "Django Admin Lenskit - Fixtures"
+
+    def ready(self) -> None:
+        from django.db.models.signals import class_prepared
+
+        from .exporter import clear_relation_plans
+
+        class_prepared.connect(
+            clear_relation_plans, dispatch_uid="django_lenskit_fixtures.clear_relation_plans"
+        )
+        # The cache's invalidation receivers are connected per model by cache.watch_models,
+        # once a cached export depends on the model
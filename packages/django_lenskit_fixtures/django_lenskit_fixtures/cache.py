@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import threading
+import uuid
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from django.apps import apps as django_apps
+from django.core.cache import BaseCache, caches
+from django.core.exceptions import EmptyResultSet
+from django.db import connections, models
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from .exporter import (
+    Closure,
+    ExportConfig,
+    TooManyObjects,
+    _fixtures_cfg,
+    _m2m_columns,
+    relation_plan,
+)
+from .stats import ExportStats
+
+_PREFIX = "django_lenskit_fixtures"
+# Generation label replaced by every write
+_ANY_MODEL = "*"
+# Rough per-object size of a cached Closure (a model index and a packed pk)
+_CLOSURE_BYTES_PER_OBJECT = 16
+# Labels whose models have the invalidation receivers connected in this process
+_watched: set[str] = set()
+_watch_lock = threading.Lock()
+
+
+def _cache_cfg() -> tuple[Optional[str], int, int]:
+    fixtures = _fixtures_cfg()
+    alias = fixtures.get("cache_alias") or None
+    default_timeout, default_max_bytes = 300, 5_000_000
+    try:
+        timeout = int(fixtures.get("cache_timeout", default_timeout))
+    except Exception:
+        timeout = default_timeout
+    try:
+        max_bytes = int(fixtures.get("cache_max_bytes", default_max_bytes))
+    except Exception:
+        max_bytes = default_max_bytes
+    return alias, timeout, max_bytes
+
+
+def get_export_cache() -> Optional[ExportCache]:
+    # None unless the "cache_alias" setting names one of settings.CACHES
+    alias, timeout, max_bytes = _cache_cfg()
+    if alias is None:
+        return None
+    return ExportCache(caches[alias], timeout=timeout, max_bytes=max_bytes)
+
+
+def _label(model: type[models.Model]) -> str:
+    return model._meta.concrete_model._meta.label_lower
+
+
+def _generation_key(label: str) -> str:
+    return f"{_PREFIX}:generation:{label}"
+
+
+def involved_models(model: type[models.Model], include_reverse: bool) -> set[str]:
+    # Every model a closure of model could contain, ignoring any traversal policy, so a
+    # write to any of them invalidates the cached results. A GenericForeignKey can point
+    # to any model: its closures depend on _ANY_MODEL, which every write replaces. M2M
+    # edges add their through model: rows of an explicit one can be written directly, which
+    # sends its post_save / post_delete but no m2m_changed.
+    labels = {_label(model)}
+    pending = [model]
+    while pending:
+        current = pending.pop()
+        for edge in relation_plan(current, include_reverse).edges:
+            if edge.kind == "gfk":
+                labels.add(_ANY_MODEL)
+                continue
+            if edge.kind in ("m2m", "reverse_m2m"):
+                labels.add(_label(_m2m_columns(edge)[0]))
+            target = edge.field.related_model
+            if _label(target) not in labels:
+                labels.add(_label(target))
+                pending.append(target)
+    return labels
+
+
+def _selection_query(queryset: models.QuerySet[models.Model]) -> tuple[str, Any]:
+    # The SQL selecting the queryset's pks, without its ordering; pks are never loaded
+    query = queryset.order_by().values_list("pk", flat=True).query
+    try:
+        return query.get_compiler(using=queryset.db).as_sql()
+    except EmptyResultSet:
+        return "", ()
+
+
+def _queried_models(sql: str, using: str) -> set[str]:
+    # Models whose tables the selection's SQL reads (joins and subqueries included): a write
+    # to any of them can change which rows it selects
+    quote = connections[using].ops.quote_name
+    return {
+        _label(model)
+        for model in django_apps.get_models(include_auto_created=True)
+        if quote(model._meta.db_table) in sql
+    }
+
+
+def watch_models(labels: Iterable[str]) -> None:
+    # Connect the invalidation receivers for the models of labels (every model for
+    # _ANY_MODEL) once per process, when a cached export first depends on them. They are
+    # connected per sender: any post_delete receiver for a model makes Django load the
+    # rows of a cascading delete instead of deleting them with one query.
+    with _watch_lock:
+        missing = {label for label in labels if label not in _watched}
+        if not missing:
+            return
+        for model in django_apps.get_models(include_auto_created=True):
+            # Proxies send signals under their own class
+            if _ANY_MODEL not in missing and _label(model) not in missing:
+                continue
+            post_save.connect(
+                invalidate_saved_model, sender=model, dispatch_uid=f"{_PREFIX}.invalidate_on_save"
+            )
+            post_delete.connect(
+                invalidate_saved_model,
+                sender=model,
+                dispatch_uid=f"{_PREFIX}.invalidate_on_delete",
+            )
+            m2m_changed.connect(
+                invalidate_m2m, sender=model, dispatch_uid=f"{_PREFIX}.invalidate_m2m"
+            )
+        _watched.update(missing)
+
+
+class ExportCache:
+    """Computed closures and serialized output in one of Django's caches.
+
+    Entries are keyed by the selection (model label, database, and the SQL and parameters
+    of its pk query) and the ExportConfig. Each entry records a generation token for every
+    model the selection reads or the closure could touch; post_save, post_delete and
+    m2m_changed replace the token of the affected models, which makes older entries stale.
+    Values larger than max_bytes are not stored.
+    """
+
+    def __init__(self, backend: BaseCache, *, timeout: int, max_bytes: int) -> None:
+        self.backend = backend
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+
+    def selection(self, queryset: models.QuerySet[models.Model], config: ExportConfig) -> Selection:
+        sql, params = _selection_query(queryset)
+        key = [_label(queryset.model), queryset.db, sql, list(params)]
+        digest = hashlib.sha256(json.dumps(key, default=str).encode("utf-8")).hexdigest()
+        labels = involved_models(queryset.model, config.include_reverse)
+        labels |= _queried_models(sql, queryset.db)
+        watch_models(labels)
+        return Selection(self, digest, config, self._tokens(labels))
+
+    def invalidate(self, labels: Iterable[str]) -> None:
+        labels = {*labels, _ANY_MODEL}
+        self.backend.set_many({_generation_key(label): uuid.uuid4().hex for label in labels}, None)
+
+    def _tokens(self, labels: Iterable[str]) -> dict[str, str]:
+        keys = {_generation_key(label): label for label in sorted(labels)}
+        current = self.backend.get_many(list(keys))
+        for key in keys:
+            if key not in current:
+                # add() keeps a token another process created in the meantime
+                self.backend.add(key, uuid.uuid4().hex, None)
+                current[key] = self.backend.get(key)
+        return {keys[key]: token for key, token in current.items()}
+
+    def _get(self, key: str) -> Any:
+        entry = self.backend.get(key)
+        if entry is None:
+            return None
+        stored_tokens, value = entry
+        if stored_tokens != self._tokens(stored_tokens):
+            return None
+        return value
+
+    def _set(self, key: str, tokens: dict[str, str], value: Any) -> None:
+        self.backend.set(key, (tokens, value), self.timeout)
+
+
+class Selection:
+    # Cache entries of one selection and ExportConfig. Generation tokens are read before
+    # anything is computed, so a write during the export leaves the stored entry stale.
+    # New entries are held until flush(), which exports call after leaving their read-only
+    # snapshot: a DatabaseCache on the same database could not write inside it.
+
+    def __init__(
+        self, cache: ExportCache, digest: str, config: ExportConfig, tokens: dict[str, str]
+    ) -> None:
+        self.cache = cache
+        self.digest = digest
+        self.config = config
+        self.tokens = tokens
+        self._pending: dict[str, Any] = {}
+
+    def _key(self, kind: str, fmt: str) -> str:
+        options = json.dumps(dataclasses.astuple(dataclasses.replace(self.config, fmt=fmt)))
+        suffix = hashlib.sha256(options.encode("utf-8")).hexdigest()
+        return f"{_PREFIX}:{kind}:{self.digest}:{suffix}"
+
+    def closure(self, build: Callable[[], Closure]) -> Closure:
+        # The closure does not depend on the format; TooManyObjects is cached as well
+        key = self._key("closure", "")
+        cached = self.cache._get(key)
+        if isinstance(cached, Closure):
+            return cached
+        if isinstance(cached, tuple):
+            collected, at_least = cached
+            raise TooManyObjects(self.config.object_limit, collected, at_least=at_least)
+        try:
+            closure = build()
+        except TooManyObjects as e:
+            self._pending[key] = (e.collected, e.at_least)
+            raise
+        if len(closure) * _CLOSURE_BYTES_PER_OBJECT <= self.cache.max_bytes:
+            self._pending[key] = closure
+        return closure
+
+    def output(self, render: Callable[[], bytes], stats: ExportStats) -> bytes:
+        # Encoded output, shared by previews and downloads of the same format. Entries keep
+        # the object counts render() recorded in stats, and a hit restores them.
+        cached = self.cached_bytes(stats)
+        if cached is not None:
+            return cached
+        value = render()
+        if len(value) <= self.cache.max_bytes:
+            self._pending[self._key("output", self.config.fmt)] = _output_entry(value, stats)
+        return value
+
+    def stream(self, chunks: Iterator[bytes], stats: ExportStats) -> Iterator[bytes]:
+        # Pass chunks through, keeping a copy that is stored by flush() once the stream
+        # completes (unless it grows past max_bytes). stats must hold the object counts.
+        key = self._key("output", self.config.fmt)
+        kept: Optional[list[bytes]] = []
+        size = 0
+        for chunk in chunks:
+            if kept is not None:
+                size += len(chunk)
+                if size <= self.cache.max_bytes:
+                    kept.append(chunk)
+                else:
+                    kept = None
+            yield chunk
+        if kept is not None:
+            self._pending[key] = _output_entry(b"".join(kept), stats)
+
+    def flush(self) -> None:
+        for key, value in self._pending.items():
+            self.cache._set(key, self.tokens, value)
+        self._pending.clear()
+
+    def cached_bytes(self, stats: ExportStats) -> Optional[bytes]:
+        cached = self.cache._get(self._key("output", self.config.fmt))
+        if not isinstance(cached, tuple):
+            return None
+        value, stats.objects, per_model = cached
+        stats.per_model = dict(per_model)
+        return value
+
+
+def _output_entry(value: bytes, stats: ExportStats) -> tuple[bytes, int, dict[str, int]]:
+    return value, stats.objects, dict(stats.per_model)
+
+
+def invalidate_saved_model(sender: type[models.Model], **kwargs: Any) -> None:
+    # post_save / post_delete receiver
+    cache = get_export_cache()
+    if cache is not None:
+        cache.invalidate({_label(sender)})
+
+
+def invalidate_m2m(
+    sender: type[models.Model],
+    instance: models.Model,
+    action: str,
+    model: type[models.Model],
+    **kwargs: Any,
+) -> None:
+    # m2m_changed receiver: both ends of the relation may gain or lose objects
+    if not action.startswith("post_"):
+        return
+    cache = get_export_cache()
+    if cache is not None:
+        cache.invalidate({_label(type(instance)), _label(model), _label(sender)})
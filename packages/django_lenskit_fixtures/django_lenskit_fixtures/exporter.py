@@ -1,23 +1,52 @@
 from __future__ import annotations
 
-from collections import deque
+import json
+import sys
+import time
+from array import array
+from collections import Counter, deque
+from contextlib import ExitStack, contextmanager, nullcontext
 from dataclasses import dataclass
-from typing import Iterable, Iterator, Optional, Set, Tuple
+from itertools import islice
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    Iterable,
+    Iterator,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
+from django.apps import apps as django_apps
 from django.conf import settings
 from django.core import serializers
-from django.core.exceptions import ObjectDoesNotExist
-from django.db import models
-from django.db.models import OneToOneField
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+from django.db.models import OneToOneField, Prefetch, prefetch_related_objects
 from django.db.models.fields.related import ForeignKey, ManyToManyField
 from django.db.models.fields.reverse_related import ManyToManyRel, ManyToOneRel, OneToOneRel
 
+from .stats import ExportStats, report
+
+if TYPE_CHECKING:
+    from .manifest import Manifest
+
 
 @dataclass(frozen=True)
 class ExportConfig:
     include_reverse: bool
     object_limit: int
     fmt: str = "json"
+    dependency_order: bool = False
+    # Canonical JSON of the effective field projection and traversal policy options
+    field_projection: str = ""
+    traversal_policy: str = ""
 
 
 class TooManyObjects(Exception):
@@ -54,71 +83,916 @@ def fixtures_enabled() -> bool:
     return bool(getattr(settings, "DEBUG", False))
 
 
-def _iter_related_objects(obj: models.Model, include_reverse: bool) -> Iterator[models.Model]:
-    for field in obj._meta.get_fields():
-        # Forward relations
+@dataclass(frozen=True)
+class RelationEdge:
+    # kind is one of "fk", "m2m", "gfk", "reverse_o2o", "reverse_fk", "reverse_m2m",
+    # "generic_rel" (a GenericRelation, followed like a reverse FK)
+    kind: str
+    field: Any
+    accessor: str
+
+    @property
+    def single(self) -> bool:
+        return self.kind in ("fk", "gfk", "reverse_o2o")
+
+
+@dataclass(frozen=True)
+class RelationPlan:
+    # Edges in _meta.get_fields() order, which fixes the traversal order
+    edges: Tuple[RelationEdge, ...]
+    # Forward FK/O2O fields targeting a primary key, followed by raw id
+    by_id: Tuple[ForeignKey, ...]
+    # Forward and reverse M2M edges with an auto-created through model, resolved from
+    # (source, target) pk pairs of the through table
+    through: Tuple[RelationEdge, ...]
+    # GenericForeignKey edges, resolved per content type from the rows' own columns
+    generic: Tuple[RelationEdge, ...]
+    # Accessors resolved through prefetch_related_objects
+    lookups: Tuple[str, ...]
+
+
+_relation_plans: Dict[Tuple[type[models.Model], bool], RelationPlan] = {}
+
+
+def clear_relation_plans(**kwargs: Any) -> None:
+    # Connected to class_prepared: a newly registered model can add reverse relations
+    _relation_plans.clear()
+
+
+def relation_plan(model: type[models.Model], include_reverse: bool) -> RelationPlan:
+    key = (model, include_reverse)
+    plan = _relation_plans.get(key)
+    if plan is None:
+        plan = _relation_plans[key] = _build_relation_plan(model, include_reverse)
+    return plan
+
+
+def _generic_field_types() -> Tuple[Any, ...]:
+    # (GenericForeignKey, GenericRelation), or () when django.contrib.contenttypes is not
+    # installed: its fields module imports the ContentType model
+    if not django_apps.is_installed("django.contrib.contenttypes"):
+        return ()
+    from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
+
+    return GenericForeignKey, GenericRelation
+
+
+def _build_relation_plan(model: type[models.Model], include_reverse: bool) -> RelationPlan:
+    edges: list[RelationEdge] = []
+    generic_types = _generic_field_types()
+    for field in model._meta.get_fields():
         if isinstance(field, (ForeignKey, OneToOneField)):
+            edges.append(RelationEdge("fk", field, field.name))
+        elif isinstance(field, ManyToManyField):
+            edges.append(RelationEdge("m2m", field, field.name))
+        elif generic_types and isinstance(field, generic_types[0]):
+            edges.append(RelationEdge("gfk", field, field.name))
+        elif generic_types and isinstance(field, generic_types[1]):
+            if include_reverse:
+                edges.append(RelationEdge("generic_rel", field, field.name))
+        elif include_reverse:
+            if isinstance(field, OneToOneRel):
+                edges.append(RelationEdge("reverse_o2o", field, field.get_accessor_name()))
+            elif isinstance(field, ManyToOneRel):
+                edges.append(RelationEdge("reverse_fk", field, field.get_accessor_name()))
+            elif isinstance(field, ManyToManyRel):
+                edges.append(RelationEdge("reverse_m2m", field, field.get_accessor_name()))
+    by_id = tuple(e.field for e in edges if e.kind == "fk" and e.field.target_field.primary_key)
+    through = tuple(
+        e
+        for e in edges
+        if e.kind in ("m2m", "reverse_m2m") and _m2m_columns(e)[0]._meta.auto_created
+    )
+    generic = tuple(e for e in edges if e.kind == "gfk")
+    lookups = tuple(
+        e.accessor for e in edges if e.field not in by_id and e not in through and e not in generic
+    )
+    return RelationPlan(
+        edges=tuple(edges), by_id=by_id, through=through, generic=generic, lookups=lookups
+    )
+
+
+def _m2m_columns(edge: RelationEdge) -> Tuple[Any, ForeignKey, ForeignKey]:
+    # Through model and its FKs to the source and target side of an m2m / reverse_m2m edge
+    m2m = edge.field if edge.kind == "m2m" else edge.field.field
+    through = m2m.remote_field.through
+    source, target = m2m.m2m_field_name(), m2m.m2m_reverse_field_name()
+    if edge.kind == "reverse_m2m":
+        source, target = target, source
+    return through, through._meta.get_field(source), through._meta.get_field(target)
+
+
+def _m2m_pairs(edge: RelationEdge, pks: list[object], using: Optional[str]) -> models.QuerySet[Any]:
+    # (source pk, target pk) rows of the through table, ordered by target pk. No join with
+    # the target table unless its default manager filters rows, which the related
+    # manager (and so the traversal and Django's serializer) would leave out as well.
+    through, source, target = _m2m_columns(edge)
+    qs = through._base_manager.db_manager(using).filter(**{f"{source.attname}__in": pks})
+    visible = target.remote_field.model._default_manager.db_manager(using).all()
+    if visible.query.has_filters():
+        qs = qs.filter(**{f"{target.name}__in": visible.values("pk")})
+    return qs.order_by(target.attname).values_list(source.attname, target.attname)
+
+
+def _set_prefetched(
+    obj: models.Model, cache_name: str, base: models.QuerySet[Any], values: list[Any]
+) -> None:
+    # What prefetch_related_objects stores: manager.all() then returns values without a query
+    qs = base._chain()
+    qs._result_cache = values
+    qs._prefetch_done = True
+    if not hasattr(obj, "_prefetched_objects_cache"):
+        obj._prefetched_objects_cache = {}
+    obj._prefetched_objects_cache[cache_name] = qs
+
+
+class TraversalPolicy:
+    """Limits on the relations build_closure follows.
+
+    Relations are named "app_label.model_name.accessor" (e.g. "auth.user.logentry"):
+
+    - ``allow``: models with at least one allowed relation follow only those relations
+    - ``deny``: relations that are never followed
+    - ``max_depth``: relations are followed from objects fewer than this many hops from
+      the roots (0 exports the roots only)
+    - ``relation_max_depth``: the same limit for individual relations
+    - ``stop_at``: model labels whose objects are exported but not traversed further
+
+    Pruned relations are never queried. Pruning forward FKs can produce fixtures that
+    reference rows missing from the output.
+    """
+
+    def __init__(
+        self,
+        *,
+        allow: Iterable[str] = (),
+        deny: Iterable[str] = (),
+        max_depth: Optional[int] = None,
+        relation_max_depth: Optional[Mapping[str, int]] = None,
+        stop_at: Iterable[str] = (),
+    ) -> None:
+        self.allow = frozenset(self._relation(name) for name in allow)
+        self.deny = frozenset(self._relation(name) for name in deny)
+        self.max_depth = max_depth
+        self.relation_max_depth = {
+            self._relation(name): int(depth) for name, depth in (relation_max_depth or {}).items()
+        }
+        self.stop_at = frozenset(self._model_label(label) for label in stop_at)
+        self._allowing = frozenset(name.rsplit(".", 1)[0] for name in self.allow)
+        # Depths beyond the deepest limit all share one plan
+        limits = list(self.relation_max_depth.values())
+        if max_depth is not None:
+            limits.append(max_depth)
+        self._horizon = max(limits, default=0)
+        self._plans: Dict[Tuple[type[models.Model], bool, int], RelationPlan] = {}
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.allow
+            or self.deny
+            or self.max_depth is not None
+            or self.relation_max_depth
+            or self.stop_at
+        )
+
+    @staticmethod
+    def _model_label(label: str) -> str:
+        try:
+            return django_apps.get_model(label)._meta.label_lower
+        except (LookupError, ValueError) as e:
+            raise ValueError(f"Unknown model in traversal policy: {label}") from e
+
+    @classmethod
+    def _relation(cls, name: str) -> str:
+        label, _, accessor = name.rpartition(".")
+        model = django_apps.get_model(cls._model_label(label))
+        if accessor not in {edge.accessor for edge in relation_plan(model, True).edges}:
+            raise ValueError(f"Unknown relation in traversal policy: {name}")
+        return f"{model._meta.label_lower}.{accessor}"
+
+    def follows(self, label: str, accessor: str, depth: int) -> bool:
+        name = f"{label}.{accessor}"
+        if label in self.stop_at or name in self.deny:
+            return False
+        if label in self._allowing and name not in self.allow:
+            return False
+        if self.max_depth is not None and depth >= self.max_depth:
+            return False
+        limit = self.relation_max_depth.get(name)
+        return limit is None or depth < limit
+
+    def plan(self, model: type[models.Model], include_reverse: bool, depth: int) -> RelationPlan:
+        key = (model, include_reverse, min(depth, self._horizon))
+        plan = self._plans.get(key)
+        if plan is None:
+            base = relation_plan(model, include_reverse)
+            label = model._meta.label_lower
+            edges = tuple(e for e in base.edges if self.follows(label, e.accessor, depth))
+            plan = self._plans[key] = RelationPlan(
+                edges=edges,
+                by_id=tuple(e.field for e in edges if e.field in base.by_id),
+                through=tuple(e for e in edges if e in base.through),
+                generic=tuple(e for e in edges if e in base.generic),
+                lookups=tuple(e.accessor for e in edges if e.accessor in base.lookups),
+            )
+        return plan
+
+
+def get_traversal_policy(overrides: Optional[Mapping[str, Any]] = None) -> TraversalPolicy:
+    # The "traversal_policy" setting combined with per-export overrides: relation and model
+    # lists are merged, relation_max_depth entries and max_depth are replaced
+    options: Dict[str, Any] = {
+        "allow": [],
+        "deny": [],
+        "max_depth": None,
+        "relation_max_depth": {},
+        "stop_at": [],
+    }
+    for source in (_fixtures_cfg().get("traversal_policy"), overrides):
+        if not isinstance(source, Mapping):
+            continue
+        for key in ("allow", "deny", "stop_at"):
+            options[key] = [*options[key], *(source.get(key) or ())]
+        options["relation_max_depth"].update(source.get("relation_max_depth") or {})
+        if source.get("max_depth") is not None:
+            options["max_depth"] = int(source["max_depth"])
+    return TraversalPolicy(**options)
+
+
+def _traversal_plan(
+    model: type[models.Model],
+    include_reverse: bool,
+    policy: Optional[TraversalPolicy],
+    depth: int,
+) -> RelationPlan:
+    if not policy:
+        return relation_plan(model, include_reverse)
+    return policy.plan(model, include_reverse, depth)
+
+
+FieldSpec = Mapping[str, Iterable[str]]
+
+
+class FieldProjection:
+    """Per-model field selection for exported objects.
+
+    ``spec`` maps model labels ("app_label.ModelName") to ``{"include": [...]}`` or
+    ``{"exclude": [...]}``. Excluded non-relational columns are deferred whenever rows are
+    fetched and left out of the serialized output; relation fields are still loaded
+    because the traversal needs their ids.
+    """
+
+    def __init__(self, spec: Optional[Mapping[str, FieldSpec]] = None) -> None:
+        self._spec = {label.lower(): rule for label, rule in (spec or {}).items()}
+        self._serialized: Dict[type[models.Model], Optional[Tuple[str, ...]]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self._spec)
+
+    def serialized_fields(self, model: type[models.Model]) -> Optional[Tuple[str, ...]]:
+        # Names for the serializer's fields= option, or None for every field
+        if model not in self._serialized:
+            self._serialized[model] = self._resolve(model)
+        return self._serialized[model]
+
+    def deferred_fields(self, model: type[models.Model]) -> Tuple[str, ...]:
+        selected = self.serialized_fields(model)
+        if selected is None:
+            return ()
+        return tuple(
+            f.name
+            for f in model._meta.concrete_fields
+            if not f.primary_key and not f.is_relation and f.name not in selected
+        )
+
+    def _resolve(self, model: type[models.Model]) -> Optional[Tuple[str, ...]]:
+        rule = self._spec.get(model._meta.label_lower)
+        if rule is None:
+            return None
+        opts = model._meta.concrete_model._meta
+        names = [f.name for f in opts.local_fields if f.serialize]
+        names += [f.name for f in opts.local_many_to_many if f.serialize]
+        include = rule.get("include")
+        listed = list(include if include is not None else rule.get("exclude", ()))
+        unknown = [name for name in listed if name not in names]
+        if unknown:
+            raise ValueError(
+                f"Unknown fields in field projection for {model._meta.label}: {', '.join(unknown)}"
+            )
+        if include is not None:
+            return tuple(name for name in names if name in listed)
+        return tuple(name for name in names if name not in listed)
+
+
+def get_field_projection(overrides: Optional[Mapping[str, FieldSpec]] = None) -> FieldProjection:
+    # The "field_projection" setting, with per-export overrides replacing whole model entries
+    configured = _fixtures_cfg().get("field_projection")
+    spec: Dict[str, FieldSpec] = {}
+    if isinstance(configured, dict):
+        spec.update((label.lower(), rule) for label, rule in configured.items())
+    if overrides:
+        spec.update((label.lower(), rule) for label, rule in overrides.items())
+    return FieldProjection(spec)
+
+
+class _PkSet:
+    # Visited pks of one model: a bitmap for non-negative ints (kept within ~8 bytes per
+    # member so sparse ids do not blow it up), a plain set for everything else.
+    __slots__ = ("_bits", "_other", "_len")
+
+    def __init__(self) -> None:
+        self._bits = bytearray()
+        self._other: Set[object] = set()
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __contains__(self, pk: object) -> bool:
+        if type(pk) is int and 0 <= pk < len(self._bits) * 8:
+            if self._bits[pk >> 3] & (1 << (pk & 7)):
+                return True
+        return pk in self._other
+
+    def add(self, pk: object) -> None:
+        if pk in self:
+            return
+        self._len += 1
+        if type(pk) is int and pk >= 0:
+            index = pk >> 3
+            size = len(self._bits)
+            if index >= size:
+                allowed = 8 * (self._len + 4096)
+                if index >= allowed:
+                    self._other.add(pk)
+                    return
+                self._bits.extend(bytes(min(max(index + 1, 2 * size), allowed) - size))
+            self._bits[index] |= 1 << (pk & 7)
+            return
+        self._other.add(pk)
+
+
+class _VisitedIndex:
+    # Membership of (label_lower, pk) keys, stored as one _PkSet per model
+    __slots__ = ("_by_label", "_len")
+
+    def __init__(self) -> None:
+        self._by_label: Dict[str, _PkSet] = {}
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __contains__(self, key: object) -> bool:
+        label, pk = key  # type: ignore[misc]
+        pks = self._by_label.get(label)
+        return pks is not None and pk in pks
+
+    def add(self, key: Tuple[str, object]) -> None:
+        label, pk = key
+        pks = self._by_label.get(label)
+        if pks is None:
+            pks = self._by_label[label] = _PkSet()
+        before = len(pks)
+        pks.add(pk)
+        self._len += len(pks) - before
+
+
+class Closure:
+    """Objects collected by build_closure, in visiting order.
+
+    Only (model, pk) pairs are kept; iterating re-fetches the instances from the database
+    in chunks of ``batch_size``, so a large closure is never fully resident.
+    """
+
+    def __init__(
+        self, using: Optional[str] = None, projection: Optional[FieldProjection] = None
+    ) -> None:
+        self.using = using
+        self.projection = projection if projection is not None else FieldProjection()
+        self._models: list[type[models.Model]] = []
+        self._model_index: Dict[type[models.Model], int] = {}
+        self._model_ids = array("I")
+        # Integer pks are packed until the first pk that does not fit, then kept as objects
+        self._pks: Union[array[int], list[object]] = array("q")
+
+    def append(self, model: type[models.Model], pk: object) -> None:
+        index = self._model_index.get(model)
+        if index is None:
+            index = self._model_index[model] = len(self._models)
+            self._models.append(model)
+        self._model_ids.append(index)
+        if isinstance(self._pks, array):
+            if type(pk) is int and -(2**63) <= pk < 2**63:
+                self._pks.append(pk)
+                return
+            self._pks = list(self._pks)
+        self._pks.append(pk)
+
+    def __len__(self) -> int:
+        return len(self._model_ids)
+
+    def keys(self) -> Iterator[Tuple[type[models.Model], object]]:
+        models_ = self._models
+        for index, pk in zip(self._model_ids, self._pks):
+            yield models_[index], pk
+
+    def per_model(self) -> Dict[str, int]:
+        counts = Counter(self._model_ids)
+        return {self._models[index]._meta.label_lower: n for index, n in counts.items()}
+
+    def by_dependency(self) -> Closure:
+        """Return a copy ordered so that FK targets come before the objects referencing them.
+
+        Models are ordered by sort_models_by_dependency (ties and cycles keep first-visit
+        order); within a model with a self-referencing FK, parents precede children.
+        Otherwise objects keep their visiting order.
+        """
+        by_model: Dict[type[models.Model], list[object]] = {}
+        for model, pk in self.keys():
+            by_model.setdefault(model, []).append(pk)
+        ordered = Closure(using=self.using, projection=self.projection)
+        for model in sort_models_by_dependency(self._models):
+            for pk in _order_self_referencing(model, by_model[model], self.using):
+                ordered.append(model, pk)
+        return ordered
+
+    def __iter__(self) -> Iterator[models.Model]:
+        keys = self.keys()
+        batch_size = _batch_size()
+        while True:
+            chunk = list(islice(keys, batch_size))
+            if not chunk:
+                return
+            by_model: Dict[type[models.Model], list[object]] = {}
+            for model, pk in chunk:
+                by_model.setdefault(model, []).append(pk)
+            loaded: Dict[Tuple[type[models.Model], object], models.Model] = {}
+            for model, pks in by_model.items():
+                qs = model._base_manager.db_manager(self.using).filter(pk__in=pks)
+                deferred = self.projection.deferred_fields(model)
+                if deferred:
+                    qs = qs.defer(*deferred)
+                objs = list(qs)
+                _attach_serialized_m2m(model, objs, self.projection)
+                for obj in objs:
+                    loaded[(model, obj.pk)] = obj
+            for key in chunk:
+                # Rows deleted since the traversal are skipped
+                obj = loaded.get(key)
+                if obj is not None:
+                    yield obj
+
+
+def _order_self_referencing(
+    model: type[models.Model], pks: list[object], using: Optional[str]
+) -> list[object]:
+    concrete = model._meta.concrete_model
+    fields = [
+        f
+        for f in model._meta.concrete_fields
+        if isinstance(f, ForeignKey) and f.remote_field.model._meta.concrete_model is concrete
+    ]
+    if not fields:
+        return pks
+    columns = [f.attname if f.target_field.primary_key else f"{f.name}__pk" for f in fields]
+    members = set(pks)
+    parents: Dict[object, list[object]] = {}
+    manager = model._base_manager.db_manager(using)
+    batch_size = _batch_size()
+    for start in range(0, len(pks), batch_size):
+        qs = manager.filter(pk__in=pks[start : start + batch_size]).values_list("pk", *columns)
+        for pk, *targets in qs:
+            parents[pk] = [t for t in targets if t in members and t != pk]
+
+    # Depth-first over parent links, emitting parents first; a link that closes a
+    # cycle is ignored, so cyclic rows keep their visiting order.
+    result: list[object] = []
+    emitted: Set[object] = set()
+    for root in pks:
+        if root in emitted:
+            continue
+        active = {root}
+        stack = [(root, iter(parents.get(root, ())))]
+        while stack:
+            node, remaining = stack[-1]
+            for parent in remaining:
+                if parent not in emitted and parent not in active:
+                    active.add(parent)
+                    stack.append((parent, iter(parents.get(parent, ()))))
+                    break
+            else:
+                stack.pop()
+                active.discard(node)
+                emitted.add(node)
+                result.append(node)
+    return result
+
+
+def _attach_serialized_m2m(
+    model: type[models.Model], objs: list[models.Model], projection: FieldProjection
+) -> None:
+    # The serializer reads many-to-many values from the prefetch cache; fill it from one
+    # through-table query per relation with pk-only instances of the targets. Only the
+    # fields it writes are fetched: the concrete model's own m2m fields (a multi-table
+    # parent's belong to the parent's object), minus those projected out.
+    if not objs:
+        return
+    db = objs[0]._state.db
+    selected = projection.serialized_fields(model)
+    local = set(model._meta.concrete_model._meta.local_many_to_many)
+    for edge in relation_plan(model, False).through:
+        if edge.field not in local or not edge.field.serialize:
+            continue
+        if selected is not None and edge.field.name not in selected:
+            continue
+        related = edge.field.related_model
+        fields = [related._meta.pk.attname]
+        values: Dict[object, list[models.Model]] = {obj.pk: [] for obj in objs}
+        targets: Dict[object, models.Model] = {}
+        for source, target in _m2m_pairs(edge, list(values), db):
+            instance = targets.get(target)
+            if instance is None:
+                instance = targets[target] = related.from_db(db, fields, [target])
+            values[source].append(instance)
+        base = related._default_manager.db_manager(db).all()
+        for obj in objs:
+            _set_prefetched(obj, edge.accessor, base, values[obj.pk])
+
+
+def _iter_related_objects(
+    obj: models.Model,
+    include_reverse: bool,
+    visited: Optional[Collection[Tuple[str, object]]] = None,
+    policy: Optional[TraversalPolicy] = None,
+    depth: int = 0,
+) -> Iterator[models.Model]:
+    # Forward FKs to already visited objects are skipped by their raw id, without
+    # touching (or loading) the related instance. depth is obj's distance from the roots.
+    for edge in _traversal_plan(type(obj), include_reverse, policy, depth).edges:
+        if edge.single:
+            if visited is not None and edge.kind == "fk" and edge.field.target_field.primary_key:
+                value = getattr(obj, edge.field.attname)
+                if value is None:
+                    continue
+                if (edge.field.remote_field.model._meta.label_lower, value) in visited:
+                    continue
+            elif visited is not None and edge.kind == "gfk":
+                target_key = _gfk_target(obj, edge.field)
+                if target_key is None:
+                    continue
+                if (target_key[0]._meta.label_lower, target_key[1]) in visited:
+                    continue
             try:
-                target = getattr(obj, field.name, None)
+                target = getattr(obj, edge.accessor, None)
             except ObjectDoesNotExist:
                 target = None
             if target is not None:
                 yield target
-        elif isinstance(field, ManyToManyField):
-            manager = getattr(obj, field.name)
-            for target in manager.all():
+        else:
+            for target in getattr(obj, edge.accessor).all():
                 yield target
 
-        if include_reverse:
-            # Reverse relations
-            if isinstance(field, OneToOneRel):
-                try:
-                    related_obj = getattr(obj, field.get_accessor_name())
-                except ObjectDoesNotExist:
-                    related_obj = None
-                if related_obj is not None:
-                    yield related_obj
-            elif isinstance(field, ManyToOneRel):
-                rel_manager = getattr(obj, field.get_accessor_name())
-                for target in rel_manager.all():
-                    yield target
-            elif isinstance(field, ManyToManyRel):
-                rel_manager = getattr(obj, field.get_accessor_name())
-                for target in rel_manager.all():
-                    yield target
 
+def _release_relations(obj: models.Model) -> None:
+    # Drop relation caches once an object's edges are read, so that instances of
+    # finished levels are not kept alive through their neighbours.
+    obj._state.fields_cache = {}
+    obj.__dict__.pop("_prefetched_objects_cache", None)
 
-def build_closure(
-    initial: Iterable[models.Model], *, include_reverse: bool, object_limit: int
-) -> list[models.Model]:
-    queue: deque[models.Model] = deque(initial)
-    seen: Set[Tuple[str, object]] = set()
-    ordered: list[models.Model] = []
-
-    while queue:
-        obj = queue.popleft()
-        key = (obj._meta.label_lower, obj.pk)
-        if key in seen:
+
+def _attach_forward_targets(
+    group: list[models.Model],
+    fields: Iterable[ForeignKey],
+    known: Mapping[Tuple[str, object], models.Model],
+    visited: Collection[Tuple[str, object]],
+    batch_size: int,
+    projection: FieldProjection,
+) -> None:
+    # Read target ids from the FK columns already on each row, reuse instances of the
+    # current level, skip visited targets and bulk-load only the targets that are new.
+    for field in fields:
+        target_model = field.remote_field.model
+        label = target_model._meta.label_lower
+        missing: dict[object, list[models.Model]] = {}
+        for obj in group:
+            if field.is_cached(obj):
+                continue
+            value = getattr(obj, field.attname)
+            if value is None or (label, value) in visited:
+                continue
+            target = known.get((label, value))
+            if target is not None:
+                field.set_cached_value(obj, target)
+            else:
+                missing.setdefault(value, []).append(obj)
+        ids = list(missing)
+        for start in range(0, len(ids), batch_size):
+            chunk = ids[start : start + batch_size]
+            # Read from the rows' own database, like the related descriptor would
+            manager = target_model._base_manager.db_manager(group[0]._state.db)
+            qs = manager.filter(pk__in=chunk)
+            deferred = projection.deferred_fields(target_model)
+            if deferred:
+                qs = qs.defer(*deferred)
+            loaded = {t.pk: t for t in qs}
+            for value in chunk:
+                # Dangling ids cache None, which _iter_related_objects treats as no target
+                target = loaded.get(value)
+                for obj in missing[value]:
+                    field.set_cached_value(obj, target)
+
+
+def _gfk_target(obj: models.Model, field: Any) -> Optional[Tuple[type[models.Model], object]]:
+    # (model, pk) a GenericForeignKey points to, from the row's own columns
+    ct_id = getattr(obj, obj._meta.get_field(field.ct_field).attname)
+    value = getattr(obj, field.fk_field)
+    if ct_id is None or value is None:
+        return None
+    return _content_type_target(obj._state.db, ct_id, value)
+
+
+def _content_type_target(
+    db: Optional[str], ct_id: int, value: object
+) -> Optional[Tuple[type[models.Model], object]]:
+    # Content types come from ContentType's per-database cache
+    from django.contrib.contenttypes.models import ContentType
+
+    try:
+        model = ContentType.objects.db_manager(db).get_for_id(ct_id).model_class()
+    except ObjectDoesNotExist:
+        return None
+    if model is None:
+        # A content type of a model that no longer exists
+        return None
+    try:
+        return model, model._meta.pk.to_python(value)
+    except ValidationError:
+        return None
+
+
+def _attach_generic_targets(
+    group: list[models.Model],
+    edges: Iterable[RelationEdge],
+    known: Mapping[Tuple[str, object], models.Model],
+    visited: Collection[Tuple[str, object]],
+    batch_size: int,
+    projection: FieldProjection,
+) -> None:
+    # Like _attach_forward_targets, grouped by content type: one query per target model
+    # (and chunk) for the targets that are new.
+    db = group[0]._state.db
+    for edge in edges:
+        field = edge.field
+        missing: Dict[type[models.Model], Dict[object, list[models.Model]]] = {}
+        for obj in group:
+            if field.is_cached(obj):
+                continue
+            target_key = _gfk_target(obj, field)
+            if target_key is None:
+                continue
+            target_model, value = target_key
+            key = (target_model._meta.label_lower, value)
+            if key in visited:
+                continue
+            target = known.get(key)
+            if target is not None:
+                field.set_cached_value(obj, target)
+            else:
+                missing.setdefault(target_model, {}).setdefault(value, []).append(obj)
+        for target_model, by_value in missing.items():
+            manager = target_model._base_manager.db_manager(db)
+            deferred = projection.deferred_fields(target_model)
+            ids = list(by_value)
+            for start in range(0, len(ids), batch_size):
+                chunk = ids[start : start + batch_size]
+                qs = manager.filter(pk__in=chunk)
+                if deferred:
+                    qs = qs.defer(*deferred)
+                loaded = {t.pk: t for t in qs}
+                for value in chunk:
+                    # Dangling ids cache None, which _iter_related_objects treats as no target
+                    target = loaded.get(value)
+                    for obj in by_value[value]:
+                        field.set_cached_value(obj, target)
+
+
+def _attach_m2m_targets(
+    group: list[models.Model],
+    edges: Iterable[RelationEdge],
+    known: Mapping[Tuple[str, object], models.Model],
+    visited: Collection[Tuple[str, object]],
+    batch_size: int,
+    projection: FieldProjection,
+) -> None:
+    # Read (source, target) pk pairs from the through table, skip visited targets by pk,
+    # reuse instances of the current level and bulk-load only new targets. Each object's
+    # related manager then returns its unvisited targets without a query.
+    db = group[0]._state.db
+    for edge in edges:
+        target_model = _m2m_columns(edge)[2].remote_field.model
+        label = target_model._meta.label_lower
+        targets: Dict[object, list[object]] = {obj.pk: [] for obj in group}
+        sources = list(targets)
+        for start in range(0, len(sources), batch_size):
+            for source, target in _m2m_pairs(edge, sources[start : start + batch_size], db):
+                if (label, target) not in visited:
+                    targets[source].append(target)
+        instances: Dict[object, Optional[models.Model]] = {}
+        missing: list[object] = []
+        for values in targets.values():
+            for value in values:
+                if value not in instances:
+                    instances[value] = known.get((label, value))
+                    if instances[value] is None:
+                        missing.append(value)
+        # Like the related manager, read targets through the default manager
+        manager = target_model._default_manager.db_manager(db)
+        deferred = projection.deferred_fields(target_model)
+        for start in range(0, len(missing), batch_size):
+            qs = manager.filter(pk__in=missing[start : start + batch_size])
+            if deferred:
+                qs = qs.defer(*deferred)
+            for target in qs:
+                instances[target.pk] = target
+        base = manager.all()
+        cache_name = edge.accessor if edge.kind == "m2m" else edge.field.field.related_query_name()
+        for obj in group:
+            found = [instances[v] for v in targets[obj.pk] if instances[v] is not None]
+            _set_prefetched(obj, cache_name, base, found)
+
+
+def _prefetch_relations(
+    objs: list[models.Model],
+    include_reverse: bool,
+    known: Mapping[Tuple[str, object], models.Model],
+    visited: Collection[Tuple[str, object]],
+    projection: FieldProjection,
+    policy: Optional[TraversalPolicy] = None,
+    depth: int = 0,
+) -> None:
+    # Resolve each relation once per model group (chunked for backend parameter limits),
+    # so _iter_related_objects reads from the relation caches instead of the database.
+    groups: dict[tuple[type[models.Model], Optional[str]], list[models.Model]] = {}
+    for obj in objs:
+        groups.setdefault((type(obj), obj._state.db), []).append(obj)
+    batch_size = _batch_size()
+    for (model, db), group in groups.items():
+        plan = _traversal_plan(model, include_reverse, policy, depth)
+        if plan.by_id:
+            _attach_forward_targets(group, plan.by_id, known, visited, batch_size, projection)
+        if plan.through:
+            _attach_m2m_targets(group, plan.through, known, visited, batch_size, projection)
+        if plan.generic:
+            _attach_generic_targets(group, plan.generic, known, visited, batch_size, projection)
+        if not plan.lookups:
             continue
-        # Compute next relations first so the probe can include this node's frontier
-        next_relations = list(_iter_related_objects(obj, include_reverse))
-        seen.add(key)
-        ordered.append(obj)
-        if len(seen) > object_limit:
-            # Probe from both the current queue and this node's immediate frontier
-            probe_limit = _excess_probe_limit()
-            pending = deque(list(next_relations) + list(queue))
-            extra_count, truncated = _probe_excess(pending, include_reverse, seen, probe_limit)
-            raise TooManyObjects(
-                limit=object_limit,
-                collected=len(seen) + extra_count,
-                at_least=truncated,
-            )
+        lookups = _projected_lookups(plan, projection, db) if projection else plan.lookups
+        for start in range(0, len(group), batch_size):
+            prefetch_related_objects(group[start : start + batch_size], *lookups)
+
+
+def _projected_lookups(
+    plan: RelationPlan, projection: FieldProjection, db: Optional[str]
+) -> list[Union[str, Prefetch]]:
+    # Prefetch querysets that defer the excluded columns of the related model
+    lookups: list[Union[str, Prefetch]] = []
+    for edge in plan.edges:
+        if edge.accessor not in plan.lookups:
+            continue
+        target = edge.field.related_model
+        deferred = projection.deferred_fields(target)
+        if not deferred:
+            lookups.append(edge.accessor)
+            continue
+        manager = target._base_manager if edge.kind == "fk" else target._default_manager
+        queryset = manager.db_manager(db).defer(*deferred)
+        lookups.append(Prefetch(edge.accessor, queryset=queryset))
+    return lookups
+
+
+def build_closure(
+    initial: Iterable[models.Model],
+    *,
+    include_reverse: bool,
+    object_limit: int,
+    on_level: Optional[Callable[[int, int], None]] = None,
+    projection: Optional[FieldProjection] = None,
+    policy: Optional[TraversalPolicy] = None,
+    using: Optional[str] = None,
+    stats: Optional[ExportStats] = None,
+) -> Closure:
+    # on_level(depth, collected) is called after each BFS level completes. projection and
+    # policy default to the "field_projection" and "traversal_policy" settings. using
+    # re-targets a root queryset; relations are always read from the roots' database.
+    # stats receives per-level counts and the cost of the excess probe.
+    if projection is None:
+        projection = get_field_projection()
+    if policy is None:
+        policy = get_traversal_policy()
+    if isinstance(initial, models.QuerySet):
+        if using is not None:
+            initial = initial.using(using)
+        deferred = projection.deferred_fields(initial.model)
+        if deferred:
+            initial = initial.defer(*deferred)
+    level: list[models.Model] = list(initial)
+    seen = _VisitedIndex()
+    closure = Closure(using=level[0]._state.db if level else None, projection=projection)
+    depth = 0
+
+    # Level-synchronous BFS: visiting order (and the probe frontier) matches a plain
+    # one-at-a-time BFS, but relations are fetched in bulk for the whole level. Only the
+    # current and next level are held as instances; visited objects are kept as keys.
+    while level:
+        fresh: Dict[Tuple[str, object], models.Model] = {}
+        budget = object_limit - len(seen)
+        for obj in level:
+            key = (obj._meta.label_lower, obj.pk)
+            if key in seen or key in fresh:
+                continue
+            fresh[key] = obj
+            # Objects past the first one over the cap are never visited
+            if len(fresh) > budget:
+                break
+        _prefetch_relations(
+            list(fresh.values()), include_reverse, fresh, seen, projection, policy, depth
+        )
+        del fresh
 
-        for rel_obj in next_relations:
-            queue.append(rel_obj)
+        next_level: list[models.Model] = []
+        for index, obj in enumerate(level):
+            key = (obj._meta.label_lower, obj.pk)
+            if key in seen:
+                continue
+            # Compute next relations first so the probe can include this node's frontier
+            next_relations = list(_iter_related_objects(obj, include_reverse, seen, policy, depth))
+            seen.add(key)
+            closure.append(type(obj), obj.pk)
+            if len(seen) > object_limit:
+                # Probe from both the pending queue and this node's immediate frontier
+                probe_limit = _excess_probe_limit()
+                pending = deque(
+                    [(o, depth + 1) for o in next_relations]
+                    + [(o, depth) for o in level[index + 1 :]]
+                    + [(o, depth + 1) for o in next_level]
+                )
+                if _excess_probe_mode() == "walk":
+                    probe = _probe_excess
+                else:
+                    probe = _probe_excess_counts
+                with stats.phase("probe") if stats is not None else nullcontext():
+                    extra_count, truncated = probe(
+                        pending,
+                        include_reverse,
+                        seen,
+                        probe_limit,
+                        policy=policy,
+                        using=closure.using,
+                    )
+                raise TooManyObjects(
+                    limit=object_limit,
+                    collected=len(seen) + extra_count,
+                    at_least=truncated,
+                )
+            _release_relations(obj)
+            next_level.extend(next_relations)
+        level = next_level
+        depth += 1
+        if stats is not None:
+            stats.per_level.append(len(seen) - sum(stats.per_level))
+        if on_level is not None:
+            on_level(depth, len(seen))
+
+    return closure
+
+
+def _fixtures_cfg() -> dict:
+    cfg = getattr(settings, "ADMIN_LENSKIT", {}) or {}
+    fixtures = cfg.get("fixtures") if isinstance(cfg, dict) else None
+    return fixtures if isinstance(fixtures, dict) else {}
 
-    return ordered
+
+def _batch_size() -> int:
+    fixtures = _fixtures_cfg()
+    default_batch = 500
+    try:
+        return max(1, int(fixtures.get("batch_size", default_batch)))
+    except Exception:
+        return default_batch
+
+
+def _serializer() -> str:
+    # "django" (django.core.serializers) or "lenskit" (values_list rows, see fastjson)
+    return "lenskit" if _fixtures_cfg().get("serializer") == "lenskit" else "django"
+
+
+def _serialize_workers() -> int:
+    # Worker processes for serialization; 0 or 1 serializes in the calling thread
+    try:
+        return max(0, int(_fixtures_cfg().get("serialize_workers", 0)))
+    except Exception:
+        return 0
 
 
 def _excess_probe_limit() -> int:
@@ -131,36 +1005,695 @@ def _excess_probe_limit() -> int:
         return default_probe
 
 
+def export_database(using: Optional[str] = None) -> Optional[str]:
+    # An explicit alias, else the "database" setting (e.g. a read replica), else None to
+    # keep the queryset's own routing
+    return using or _fixtures_cfg().get("database") or None
+
+
+@contextmanager
+def export_snapshot(using: Optional[str] = None) -> Iterator[None]:
+    """Run the enclosed reads in one read-only, repeatable-read transaction.
+
+    Keeps the traversal, the excess probe and the serialization re-fetch on one consistent
+    view of the database. Inside an existing transaction, or with the "snapshot" setting
+    set to False, the enclosed code runs unchanged.
+    """
+    alias = using or DEFAULT_DB_ALIAS
+    connection = connections[alias]
+    if not _fixtures_cfg().get("snapshot", True) or connection.in_atomic_block:
+        yield
+        return
+    if connection.vendor == "mysql":
+        # Applies to the next transaction, which atomic() starts
+        with connection.cursor() as cursor:
+            cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+    with transaction.atomic(using=alias):
+        statement = {
+            "postgresql": "SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY",
+            "oracle": "SET TRANSACTION READ ONLY",
+        }.get(connection.vendor)
+        if statement:
+            with connection.cursor() as cursor:
+                cursor.execute(statement)
+        # SQLite transactions are serializable; the snapshot starts at the first read
+        yield
+
+
+@contextmanager
+def _cache_writes(selection: Any) -> Iterator[None]:
+    # Cache entries computed in the block are written when it exits, so an export_snapshot
+    # entered inside it is already closed
+    try:
+        yield
+    finally:
+        if selection is not None:
+            selection.flush()
+
+
+class _ClosingStream:
+    # Iterates chunks and closes stack once the stream is exhausted or closed
+    # (StreamingHttpResponse closes its iterator even if it was never consumed)
+
+    def __init__(self, chunks: Iterator[bytes], stack: ExitStack) -> None:
+        self._chunks = chunks
+        self._stack = stack
+
+    def __iter__(self) -> _ClosingStream:
+        return self
+
+    def __next__(self) -> bytes:
+        try:
+            return next(self._chunks)
+        except StopIteration:
+            self._stack.close()
+            raise
+        except BaseException:
+            self._stack.__exit__(*sys.exc_info())
+            raise
+
+    def close(self) -> None:
+        close = getattr(self._chunks, "close", None)
+        if close is not None:
+            close()
+        self._stack.close()
+
+
+def _excess_probe_mode() -> str:
+    # "count" probes pk sets with values_list queries; "walk" loads instances like the traversal
+    return "walk" if _fixtures_cfg().get("excess_probe_mode") == "walk" else "count"
+
+
+def _excess_probe_budget() -> tuple[int, float]:
+    fixtures = _fixtures_cfg()
+    default_queries, default_seconds = 50, 2.0
+    try:
+        queries = int(fixtures.get("excess_probe_queries", default_queries))
+    except Exception:
+        queries = default_queries
+    try:
+        seconds = float(fixtures.get("excess_probe_seconds", default_seconds))
+    except Exception:
+        seconds = default_seconds
+    return queries, seconds
+
+
+def _edge_target_pks(
+    model: type[models.Model],
+    edge: RelationEdge,
+    pks: list[object],
+    using: Optional[str] = None,
+) -> tuple[type[models.Model], models.QuerySet[Any]]:
+    # Target model and a flat values_list of target pks for edge over the source pks
+    field = edge.field
+    if edge.kind == "fk":
+        column = field.attname if field.target_field.primary_key else f"{field.name}__pk"
+        qs = model._base_manager.db_manager(using).filter(pk__in=pks)
+        return field.remote_field.model, qs.values_list(column, flat=True)
+    if edge.kind == "m2m":
+        through = field.remote_field.through
+        qs = through._base_manager.db_manager(using).filter(
+            **{f"{field.m2m_field_name()}__pk__in": pks}
+        )
+        return field.remote_field.model, qs.values_list(
+            f"{field.m2m_reverse_field_name()}__pk", flat=True
+        )
+    if edge.kind == "reverse_m2m":
+        m2m = field.field
+        qs = field.through._base_manager.db_manager(using).filter(
+            **{f"{m2m.m2m_reverse_field_name()}__pk__in": pks}
+        )
+        return field.related_model, qs.values_list(f"{m2m.m2m_field_name()}__pk", flat=True)
+    if edge.kind == "generic_rel":
+        from django.contrib.contenttypes.models import ContentType
+
+        target = field.related_model
+        ct = ContentType.objects.db_manager(using).get_for_model(
+            model, for_concrete_model=field.for_concrete_model
+        )
+        qs = target._default_manager.db_manager(using).filter(
+            **{field.content_type_field_name: ct, f"{field.object_id_field_name}__in": pks}
+        )
+        return target, qs.values_list("pk", flat=True)
+    # reverse_fk / reverse_o2o
+    target = field.related_model
+    qs = target._default_manager.db_manager(using).filter(**{f"{field.field.name}__pk__in": pks})
+    return target, qs.values_list("pk", flat=True)
+
+
+def _edge_targets(
+    model: type[models.Model],
+    edge: RelationEdge,
+    pks: list[object],
+    using: Optional[str] = None,
+) -> Iterator[Tuple[type[models.Model], object]]:
+    # (target model, pk) pairs of edge over the source pks
+    if edge.kind == "gfk":
+        # Nothing keeps generic ids from dangling, so targets are checked per model
+        field = edge.field
+        ct_attname = model._meta.get_field(field.ct_field).attname
+        rows = model._base_manager.db_manager(using).filter(pk__in=pks)
+        by_model: Dict[type[models.Model], list[object]] = {}
+        for ct_id, value in rows.values_list(ct_attname, field.fk_field).iterator():
+            if ct_id is not None and value is not None:
+                target = _content_type_target(using, ct_id, value)
+                if target is not None:
+                    by_model.setdefault(target[0], []).append(target[1])
+        for target_model, values in by_model.items():
+            existing = target_model._base_manager.db_manager(using).filter(pk__in=values)
+            for pk in existing.values_list("pk", flat=True).iterator():
+                yield target_model, pk
+        return
+    target_model, qs = _edge_target_pks(model, edge, pks, using)
+    for pk in qs.iterator():
+        yield target_model, pk
+
+
+def _walk_pk_sets(
+    frontier: dict[tuple[type[models.Model], int], list[object]],
+    include_reverse: bool,
+    seen: Collection[Tuple[str, object]],
+    probed: Set[Tuple[str, object]],
+    *,
+    max_objects: int,
+    max_queries: int,
+    deadline: float,
+    contributions: Optional[Counter[str]] = None,
+    policy: Optional[TraversalPolicy] = None,
+    using: Optional[str] = None,
+) -> bool:
+    # BFS over pk sets keyed by (model, depth), one values_list query per relation and
+    # chunk. New keys are added to probed (an overlay on top of seen). Returns True when a
+    # budget stopped the walk.
+    batch_size = _batch_size()
+    queries = 0
+    while frontier:
+        next_frontier: dict[tuple[type[models.Model], int], list[object]] = {}
+        for (model, depth), pks in frontier.items():
+            for edge in _traversal_plan(model, include_reverse, policy, depth).edges:
+                for start in range(0, len(pks), batch_size):
+                    if queries >= max_queries or time.monotonic() >= deadline:
+                        return True
+                    queries += 1
+                    targets = _edge_targets(model, edge, pks[start : start + batch_size], using)
+                    for target, pk in targets:
+                        key = (target._meta.label_lower, pk)
+                        if pk is None or key in seen or key in probed:
+                            continue
+                        probed.add(key)
+                        if contributions is not None:
+                            contributions[f"{model._meta.label_lower}.{edge.accessor}"] += 1
+                        if len(probed) >= max_objects:
+                            return True
+                        next_frontier.setdefault((target, depth + 1), []).append(pk)
+        frontier = next_frontier
+    return False
+
+
+def _probe_excess_counts(
+    queue: Iterable[Tuple[models.Model, int]],
+    include_reverse: bool,
+    seen: Collection[Tuple[str, object]],
+    probe_limit: int,
+    *,
+    policy: Optional[TraversalPolicy] = None,
+    using: Optional[str] = None,
+) -> tuple[int, bool]:
+    # Count unvisited objects reachable from the boundary using only pk sets, stopping
+    # (as a lower bound) once the object, query or time budget is spent.
+    if probe_limit <= 0:
+        return 0, bool(queue)
+    probed: Set[Tuple[str, object]] = set()
+    frontier: dict[tuple[type[models.Model], int], list[object]] = {}
+    for obj, depth in queue:
+        key = (obj._meta.label_lower, obj.pk)
+        if key in seen or key in probed:
+            continue
+        probed.add(key)
+        if len(probed) >= probe_limit:
+            return len(probed), True
+        frontier.setdefault((type(obj), depth), []).append(obj.pk)
+
+    max_queries, max_seconds = _excess_probe_budget()
+    truncated = _walk_pk_sets(
+        frontier,
+        include_reverse,
+        seen,
+        probed,
+        max_objects=probe_limit,
+        max_queries=max_queries,
+        deadline=time.monotonic() + max_seconds,
+        policy=policy,
+        using=using,
+    )
+    return len(probed), truncated
+
+
+@dataclass(frozen=True)
+class ClosureEstimate:
+    total: int
+    at_least: bool
+    object_limit: int
+    # Object counts keyed by model label, and new objects contributed per
+    # "app.model.accessor" relation, both sorted largest first
+    per_model: Dict[str, int]
+    per_relation: Dict[str, int]
+
+
+def _estimate_budget() -> tuple[int, float]:
+    fixtures = _fixtures_cfg()
+    default_queries, default_seconds = 500, 5.0
+    try:
+        queries = int(fixtures.get("estimate_queries", default_queries))
+    except Exception:
+        queries = default_queries
+    try:
+        seconds = float(fixtures.get("estimate_seconds", default_seconds))
+    except Exception:
+        seconds = default_seconds
+    return queries, seconds
+
+
+def estimate_closure(
+    queryset: models.QuerySet[models.Model],
+    *,
+    include_reverse: bool,
+    object_limit: Optional[int] = None,
+    traversal_policy: Optional[Mapping[str, Any]] = None,
+    using: Optional[str] = None,
+) -> ClosureEstimate:
+    # Dry run of build_closure over pk sets only: no rows are loaded and nothing is
+    # serialized. The walk stops once it is clear how far the cap would be exceeded.
+    if not fixtures_enabled():
+        raise PermissionError("Fixture export is disabled by configuration")
+    limit = object_limit if object_limit is not None else _default_object_limit()
+    max_objects = limit + max(_excess_probe_limit(), 0)
+    alias = export_database(using)
+    if alias is not None:
+        queryset = queryset.using(alias)
+    model = queryset.model
+    label = model._meta.label_lower
+    probed: Set[Tuple[str, object]] = set()
+    roots: list[object] = []
+    with export_snapshot(queryset.db):
+        for pk in queryset.values_list("pk", flat=True):
+            if (label, pk) not in probed:
+                probed.add((label, pk))
+                roots.append(pk)
+
+        contributions: Counter[str] = Counter()
+        truncated = len(probed) >= max_objects
+        if not truncated:
+            max_queries, max_seconds = _estimate_budget()
+            truncated = _walk_pk_sets(
+                {(model, 0): roots},
+                include_reverse,
+                (),
+                probed,
+                max_objects=max_objects,
+                max_queries=max_queries,
+                deadline=time.monotonic() + max_seconds,
+                contributions=contributions,
+                policy=get_traversal_policy(traversal_policy),
+                using=queryset.db,
+            )
+    per_model = Counter(key[0] for key in probed)
+    return ClosureEstimate(
+        total=len(probed),
+        at_least=truncated,
+        object_limit=limit,
+        per_model=dict(per_model.most_common()),
+        per_relation=dict(contributions.most_common()),
+    )
+
+
 def _probe_excess(
-    queue: deque[models.Model],
+    queue: Iterable[Tuple[models.Model, int]],
     include_reverse: bool,
-    seen: Set[Tuple[str, object]],
+    seen: Collection[Tuple[str, object]],
     probe_limit: int,
+    *,
+    policy: Optional[TraversalPolicy] = None,
+    using: Optional[str] = None,
 ) -> tuple[int, bool]:
     # Explore from current boundary without mutating main traversal,
     # counting additional unique objects reachable up to probe_limit.
-    pending: deque[models.Model] = deque(queue)
-    local_seen: Set[Tuple[str, object]] = set(seen)
+    # Unvisited queue objects count themselves, as in the count probe: the traversal skips
+    # forward FKs to visited objects, so the walk cannot rediscover them through those.
+    # local_seen is an overlay on top of seen rather than a copy of it.
+    local_seen: Set[Tuple[str, object]] = set()
+    pending: deque[Tuple[models.Model, int]] = deque()
     extra = 0
+    for obj, depth in queue:
+        key = (obj._meta.label_lower, obj.pk)
+        if key in seen or key in local_seen:
+            continue
+        if extra >= probe_limit:
+            return extra, True
+        local_seen.add(key)
+        extra += 1
+        pending.append((obj, depth))
     truncated = False
     while pending and extra < probe_limit:
-        obj = pending.popleft()
-        for rel in _iter_related_objects(obj, include_reverse):
+        obj, depth = pending.popleft()
+        for rel in _iter_related_objects(obj, include_reverse, seen, policy, depth):
             key = (rel._meta.label_lower, rel.pk)
-            if key in local_seen:
+            if key in seen or key in local_seen:
                 continue
             local_seen.add(key)
             extra += 1
             if extra >= probe_limit:
                 break
-            pending.append(rel)
+            pending.append((rel, depth + 1))
     if pending:
         truncated = True
     return extra, truncated
 
 
-def serialize_instances(instances: Iterable[models.Model], *, fmt: str) -> str:
-    return serializers.serialize(fmt, list(instances), use_natural_foreign_keys=False)
+def _in_cycle(
+    model: type[models.Model],
+    deps: dict[type[models.Model], set[type[models.Model]]],
+    among: set[type[models.Model]],
+) -> bool:
+    # Whether model depends on itself through models of among
+    seen: set[type[models.Model]] = set()
+    pending = list(deps[model] & among)
+    while pending:
+        current = pending.pop()
+        if current is model:
+            return True
+        if current not in seen:
+            seen.add(current)
+            pending.extend(deps[current] & among)
+    return False
+
+
+def sort_models_by_dependency(model_list: Iterable[type[models.Model]]) -> list[type[models.Model]]:
+    # Order models so forward FK/O2O targets come before the models that reference them.
+    # Ties keep the input order. When only cycles are left, the first model in input order
+    # that is part of one is placed on its own and the sort goes on, so models that merely
+    # depend on a cycle still come after it.
+    ordered_input = list(dict.fromkeys(model_list))
+    members = set(ordered_input)
+    deps: dict[type[models.Model], set[type[models.Model]]] = {}
+    for model in ordered_input:
+        targets = set()
+        for field in model._meta.concrete_fields:
+            if isinstance(field, ForeignKey):
+                target = field.remote_field.model._meta.concrete_model
+                for candidate in members:
+                    if candidate is not model and candidate._meta.concrete_model is target:
+                        targets.add(candidate)
+        deps[model] = targets
+    result: list[type[models.Model]] = []
+    placed: set[type[models.Model]] = set()
+    remaining = ordered_input
+    while remaining:
+        ready = [m for m in remaining if deps[m] <= placed]
+        if not ready:
+            unplaced = set(remaining)
+            ready = [next((m for m in remaining if _in_cycle(m, deps, unplaced)), remaining[0])]
+        result.extend(ready)
+        placed.update(ready)
+        remaining = [m for m in remaining if m not in placed]
+    return result
+
+
+def serialize_instances(
+    instances: Iterable[models.Model],
+    *,
+    fmt: str,
+    projection: Optional[FieldProjection] = None,
+) -> str:
+    return "".join(iter_serialized_instances(instances, fmt=fmt, projection=projection))
+
+
+def iter_serialized_instances(
+    instances: Iterable[models.Model],
+    *,
+    fmt: str,
+    projection: Optional[FieldProjection] = None,
+) -> Iterator[str]:
+    # Serialize chunk by chunk so neither the serializer's intermediate objects nor the
+    # full text is held at once; the concatenated chunks equal a single serialize() call.
+    # projection defaults to the one a Closure was built with.
+    if projection is None and isinstance(instances, Closure):
+        projection = instances.projection
+    if fmt not in ("json", "jsonl", "yaml"):
+        yield serializers.serialize(fmt, list(instances), use_natural_foreign_keys=False)
+        return
+    batch_size = _batch_size()
+    workers = _serialize_workers()
+    chunk_parts: Iterable[list[str]]
+    if workers > 1 and isinstance(instances, Closure) and len(instances) > batch_size:
+        from .parallel import iter_chunk_parts
+
+        chunk_parts = iter_chunk_parts(instances, fmt, workers=workers, batch_size=batch_size)
+    elif fmt != "yaml" and isinstance(instances, Closure) and _serializer() == "lenskit":
+        from .fastjson import serialize_keys
+
+        keys = instances.keys()
+        chunk_parts = (
+            [serialize_keys(fmt, chunk, instances.using, projection or FieldProjection())]
+            for chunk in iter(lambda: list(islice(keys, batch_size)), [])
+        )
+    else:
+        chunk_parts = (
+            list(_serialize_runs(fmt, chunk, projection))
+            for chunk in _chunked(instances, batch_size)
+        )
+    if fmt == "json":
+        yield "["
+        first = True
+        for parts in chunk_parts:
+            for part in parts:
+                body = part[1:-1]
+                if not body:
+                    # A chunk whose rows were all deleted since the traversal
+                    continue
+                yield body if first else ", " + body
+                first = False
+        yield "]"
+    elif fmt == "jsonl":
+        for parts in chunk_parts:
+            yield from parts
+    else:
+        # Block-style YAML sequences concatenate into one sequence
+        empty = True
+        for parts in chunk_parts:
+            yield from parts
+            empty = False
+        if empty:
+            yield serializers.serialize(fmt, [], use_natural_foreign_keys=False)
+
+
+def _serialize_runs(
+    fmt: str, chunk: list[models.Model], projection: Optional[FieldProjection]
+) -> Iterator[str]:
+    # The serializer's fields= option applies to every object of a call, so a projected
+    # chunk is serialized in runs of consecutive objects of the same model
+    if not projection:
+        yield serializers.serialize(fmt, chunk, use_natural_foreign_keys=False)
+        return
+    start = 0
+    for end in range(1, len(chunk) + 1):
+        if end < len(chunk) and type(chunk[end]) is type(chunk[start]):
+            continue
+        run = chunk[start:end]
+        yield serializers.serialize(
+            fmt,
+            run,
+            fields=projection.serialized_fields(type(run[0])),
+            use_natural_foreign_keys=False,
+        )
+        start = end
+
+
+COMPRESSIONS = ("gz", "bz2", "xz")
+
+
+def split_format(fmt: str) -> tuple[str, Optional[str]]:
+    # "json.gz" -> ("json", "gz"); the suffixes match what loaddata decompresses
+    base, _, compression = fmt.partition(".")
+    if compression and compression not in COMPRESSIONS:
+        raise ValueError(f"Unsupported fixture compression: {compression}")
+    return base, compression or None
+
+
+def _compressor(compression: str) -> Any:
+    if compression == "gz":
+        import zlib
+
+        # wbits=31 writes a gzip container (with a zero mtime, so output is reproducible)
+        return zlib.compressobj(9, zlib.DEFLATED, 31)
+    if compression == "bz2":
+        import bz2
+
+        return bz2.BZ2Compressor()
+    import lzma
+
+    return lzma.LZMACompressor(format=lzma.FORMAT_XZ)
+
+
+def iter_compressed(chunks: Iterable[str], compression: str) -> Iterator[bytes]:
+    compressor = _compressor(compression)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def iter_fixture_bytes(instances: Iterable[models.Model], *, fmt: str) -> Iterator[bytes]:
+    # Encoded (and, for e.g. "json.gz", incrementally compressed) serializer output
+    base, compression = split_format(fmt)
+    chunks = iter_serialized_instances(instances, fmt=base)
+    if compression is None:
+        return (chunk.encode("utf-8") for chunk in chunks)
+    return iter_compressed(chunks, compression)
+
+
+def _chunked(items: Iterable[models.Model], size: int) -> Iterator[list[models.Model]]:
+    chunk: list[models.Model] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _export_config(
+    *,
+    include_reverse: bool,
+    object_limit: int,
+    fmt: str,
+    dependency_order: bool,
+    field_projection: Optional[Mapping[str, FieldSpec]],
+    traversal_policy: Optional[Mapping[str, Any]],
+) -> ExportConfig:
+    fixtures = _fixtures_cfg()
+    return ExportConfig(
+        include_reverse=include_reverse,
+        object_limit=object_limit,
+        fmt=fmt,
+        dependency_order=dependency_order,
+        field_projection=json.dumps(
+            [fixtures.get("field_projection"), field_projection], sort_keys=True, default=str
+        ),
+        traversal_policy=json.dumps(
+            [fixtures.get("traversal_policy"), traversal_policy], sort_keys=True, default=str
+        ),
+    )
+
+
+def _export_closure(
+    queryset: models.QuerySet[models.Model],
+    config: ExportConfig,
+    field_projection: Optional[Mapping[str, FieldSpec]],
+    traversal_policy: Optional[Mapping[str, Any]],
+    stats: ExportStats,
+) -> Closure:
+    with stats.phase("traversal"):
+        closure = build_closure(
+            queryset,
+            include_reverse=config.include_reverse,
+            object_limit=config.object_limit,
+            projection=get_field_projection(field_projection),
+            policy=get_traversal_policy(traversal_policy),
+            stats=stats,
+        )
+    if config.dependency_order:
+        with stats.phase("ordering"):
+            closure = closure.by_dependency()
+    return closure
+
+
+def _prepare_export(
+    queryset: models.QuerySet[models.Model],
+    *,
+    include_reverse: bool,
+    object_limit: Optional[int],
+    fmt: str,
+    dependency_order: bool,
+    field_projection: Optional[Mapping[str, FieldSpec]],
+    traversal_policy: Optional[Mapping[str, Any]],
+    using: Optional[str],
+    stats: Optional[ExportStats],
+) -> tuple[models.QuerySet[models.Model], ExportConfig, ExportStats, Any]:
+    # Shared by the export entry points: the queryset on the export database, its config
+    # and stats, and the cache Selection (None without a cache)
+    if not fixtures_enabled():
+        raise PermissionError("Fixture export is disabled by configuration")
+    from .cache import get_export_cache
+
+    alias = export_database(using)
+    if alias is not None:
+        queryset = queryset.using(alias)
+    config = _export_config(
+        include_reverse=include_reverse,
+        object_limit=object_limit if object_limit is not None else _default_object_limit(),
+        fmt=fmt,
+        dependency_order=dependency_order,
+        field_projection=field_projection,
+        traversal_policy=traversal_policy,
+    )
+    stats = _start_stats(stats, queryset, fmt)
+    cache = get_export_cache()
+    selection = cache.selection(queryset, config) if cache is not None else None
+    return queryset, config, stats, selection
+
+
+@contextmanager
+def _export_reads(selection: Any, stats: ExportStats, using: str) -> Iterator[None]:
+    # The block reads in the export snapshot with its queries counted; cache entries are
+    # written once the snapshot is closed, and TooManyObjects is recorded in stats
+    try:
+        with _cache_writes(selection), stats.capture(using), export_snapshot(using):
+            yield
+    except TooManyObjects as e:
+        stats.error = str(e)
+        raise
+
+
+def export_closure(
+    queryset: models.QuerySet[models.Model],
+    *,
+    include_reverse: bool,
+    object_limit: Optional[int] = None,
+    dependency_order: bool = False,
+    field_projection: Optional[Mapping[str, FieldSpec]] = None,
+    traversal_policy: Optional[Mapping[str, Any]] = None,
+    using: Optional[str] = None,
+    stats: Optional[ExportStats] = None,
+) -> Closure:
+    # The closure export_queryset would serialize, for callers that serialize it in parts
+    # (the paged preview). Shares the closure cache; stats cover the traversal only.
+    queryset, config, stats, selection = _prepare_export(
+        queryset,
+        include_reverse=include_reverse,
+        object_limit=object_limit,
+        fmt="",
+        dependency_order=dependency_order,
+        field_projection=field_projection,
+        traversal_policy=traversal_policy,
+        using=using,
+        stats=stats,
+    )
+
+    def closure() -> Closure:
+        stats.cached = False
+        return _export_closure(queryset, config, field_projection, traversal_policy, stats)
+
+    try:
+        with _export_reads(selection, stats, queryset.db):
+            instances = closure() if selection is None else selection.closure(closure)
+        stats.objects = len(instances)
+        stats.per_model = dict(Counter(instances.per_model()).most_common())
+    finally:
+        report(stats, queryset.model)
+    return instances
 
 
 def export_queryset(
@@ -169,9 +1702,117 @@ def export_queryset(
     include_reverse: bool,
     object_limit: Optional[int] = None,
     fmt: str = "json",
-) -> str:
-    if not fixtures_enabled():
-        raise PermissionError("Fixture export is disabled by configuration")
-    limit = object_limit if object_limit is not None else _default_object_limit()
-    instances = build_closure(queryset, include_reverse=include_reverse, object_limit=limit)
-    return serialize_instances(instances, fmt=fmt)
+    dependency_order: bool = False,
+    field_projection: Optional[Mapping[str, FieldSpec]] = None,
+    traversal_policy: Optional[Mapping[str, Any]] = None,
+    using: Optional[str] = None,
+    stats: Optional[ExportStats] = None,
+    manifest: Optional[Manifest] = None,
+    since: Optional[Manifest] = None,
+) -> Union[str, bytes]:
+    # Compressed formats ("json.gz", ...) return bytes, plain formats return text.
+    # stats, when given, is filled in; it is logged and sent with export_finished either way.
+    # manifest, when given, is filled in with the versions of the exported objects; with
+    # since (an earlier manifest) only new and changed objects are written.
+    from .manifest import apply_manifest
+
+    queryset, config, stats, selection = _prepare_export(
+        queryset,
+        include_reverse=include_reverse,
+        object_limit=object_limit,
+        fmt=fmt,
+        dependency_order=dependency_order,
+        field_projection=field_projection,
+        traversal_policy=traversal_policy,
+        using=using,
+        stats=stats,
+    )
+
+    def closure() -> Closure:
+        return _export_closure(queryset, config, field_projection, traversal_policy, stats)
+
+    def render(instances: Closure) -> bytes:
+        if manifest is not None or since is not None:
+            with stats.phase("manifest"):
+                instances = apply_manifest(instances, manifest, since)
+        _record_closure(stats, instances)
+        with stats.phase("serialization"):
+            return b"".join(iter_fixture_bytes(instances, fmt=fmt))
+
+    try:
+        with _export_reads(selection, stats, queryset.db):
+            if selection is None:
+                data = render(closure())
+            elif manifest is not None or since is not None:
+                # Versions are read from the database each time; only the closure is cached
+                data = render(selection.closure(closure))
+            else:
+                data = selection.output(lambda: render(selection.closure(closure)), stats)
+        stats.bytes = len(data)
+    finally:
+        report(stats, queryset.model)
+    return data if split_format(fmt)[1] is not None else data.decode("utf-8")
+
+
+def stream_export_queryset(
+    queryset: models.QuerySet[models.Model],
+    *,
+    include_reverse: bool,
+    object_limit: Optional[int] = None,
+    fmt: str = "json",
+    dependency_order: bool = False,
+    field_projection: Optional[Mapping[str, FieldSpec]] = None,
+    traversal_policy: Optional[Mapping[str, Any]] = None,
+    using: Optional[str] = None,
+    stats: Optional[ExportStats] = None,
+) -> Iterator[bytes]:
+    # The closure is built eagerly, so TooManyObjects is raised before any output is
+    # produced. Its snapshot stays open for the re-fetch until the returned iterator is
+    # exhausted or closed; stats are reported and cache entries written after that.
+    queryset, config, stats, selection = _prepare_export(
+        queryset,
+        include_reverse=include_reverse,
+        object_limit=object_limit,
+        fmt=fmt,
+        dependency_order=dependency_order,
+        field_projection=field_projection,
+        traversal_policy=traversal_policy,
+        using=using,
+        stats=stats,
+    )
+
+    def closure() -> Closure:
+        return _export_closure(queryset, config, field_projection, traversal_policy, stats)
+
+    with ExitStack() as stack:
+        stack.callback(report, stats, queryset.model)
+        if selection is not None:
+            cached = selection.cached_bytes(stats)
+            if cached is not None:
+                return _ClosingStream(iter([cached]), stack.pop_all())
+        stack.enter_context(_export_reads(selection, stats, queryset.db))
+        instances = closure() if selection is None else selection.closure(closure)
+        _record_closure(stats, instances)
+        chunks = iter_fixture_bytes(instances, fmt=fmt)
+        # Closed before the snapshot if the consumer stops early
+        stack.callback(chunks.close)  # type: ignore[attr-defined]
+        if selection is not None:
+            chunks = selection.stream(chunks, stats)
+        return _ClosingStream(stats.timed(chunks), stack.pop_all())
+
+
+def _start_stats(
+    stats: Optional[ExportStats], queryset: models.QuerySet[models.Model], fmt: str
+) -> ExportStats:
+    stats = stats if stats is not None else ExportStats()
+    stats.cached = True
+    stats.model = queryset.model._meta.label
+    stats.fmt = fmt
+    return stats
+
+
+def _record_closure(stats: ExportStats, closure: Closure) -> None:
+    # Called once the output has to be produced, so the export is not a cache hit
+    stats.cached = False
+    stats.objects = len(closure)
+    stats.per_model = dict(Counter(closure.per_model()).most_common())
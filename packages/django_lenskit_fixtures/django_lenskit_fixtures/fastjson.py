@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils.encoding import is_protected_type
+
+from .exporter import FieldProjection, RelationEdge, _m2m_pairs, relation_plan
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised without the "fast" extra
+    orjson = None
+
+# Fixture JSON written straight from values_list() rows, for the "lenskit" serializer.
+# Objects have the shape and value formats of Django's json serializer (field order,
+# value_to_string() for non-primitive values, DjangoJSONEncoder for dates and decimals),
+# so the output loads with loaddata; orjson writes compact separators.
+
+# Django's json and jsonl serializers differ in their item separator
+_encoders = {
+    "json": DjangoJSONEncoder(ensure_ascii=False),
+    "jsonl": DjangoJSONEncoder(ensure_ascii=False, separators=(",", ": ")),
+}
+
+
+def _dumps(fmt: str, obj: Dict[str, Any]) -> str:
+    encoder = _encoders[fmt]
+    if orjson is not None:
+        # Dates, times and decimals go through DjangoJSONEncoder to keep Django's formats
+        return orjson.dumps(
+            obj, default=encoder.default, option=orjson.OPT_PASSTHROUGH_DATETIME
+        ).decode("utf-8")
+    return encoder.encode(obj)
+
+
+class _Row:
+    # Stands in for a model instance in Field.value_to_string(), which reads one attribute
+    pass
+
+
+def _converter(field: models.Field[Any, Any]) -> Callable[[Any], Any]:
+    # Same rule as Django's python serializer: primitives pass through, everything else
+    # becomes field.value_to_string()
+    row = _Row()
+    attname = field.attname
+
+    def convert(value: Any) -> Any:
+        if is_protected_type(value):
+            return value
+        row.__dict__[attname] = value
+        return field.value_to_string(row)
+
+    return convert
+
+
+def _model_rows(
+    model: type[models.Model],
+    pks: list[object],
+    using: Optional[str],
+    projection: FieldProjection,
+) -> Dict[object, Dict[str, Any]]:
+    concrete = model._meta.concrete_model
+    selected = projection.serialized_fields(model)
+    fields = [
+        f
+        for f in concrete._meta.local_fields
+        if f.serialize and (selected is None or f.name in selected)
+    ]
+    local = set(concrete._meta.local_many_to_many)
+    many = [
+        edge
+        for edge in relation_plan(concrete, False).through
+        if edge.field in local
+        and edge.field.serialize
+        and (selected is None or edge.field.name in selected)
+    ]
+    pk_field = concrete._meta.pk
+    convert_pk = _converter(pk_field)
+    converters = [_converter(f) for f in fields]
+    names = [f.name for f in fields]
+    label = str(model._meta)
+
+    objects: Dict[object, Dict[str, Any]] = {}
+    rows = (
+        model._base_manager.db_manager(using)
+        .filter(pk__in=pks)
+        .values_list(pk_field.attname, *(f.attname for f in fields))
+    )
+    for pk, *values in rows:
+        objects[pk] = {
+            "model": label,
+            "pk": convert_pk(pk),
+            "fields": {name: conv(v) for name, conv, v in zip(names, converters, values)},
+        }
+    for edge in many:
+        name = edge.field.name
+        for obj in objects.values():
+            obj["fields"][name] = []
+        for source, target in _through_rows(edge, list(objects), using):
+            objects[source]["fields"][name].append(target)
+    return objects
+
+
+def _through_rows(
+    edge: RelationEdge, pks: list[object], using: Optional[str]
+) -> Iterable[Tuple[object, Any]]:
+    # One query on the through table per chunk instead of one per object; values are
+    # ordered by target pk
+    if not pks:
+        return
+    convert = _converter(edge.field.related_model._meta.pk)
+    for source_pk, target_pk in _m2m_pairs(edge, pks, using):
+        yield source_pk, convert(target_pk)
+
+
+def serialize_keys(
+    fmt: str,
+    keys: list[Tuple[type[models.Model], object]],
+    using: Optional[str],
+    projection: FieldProjection,
+) -> str:
+    """Serialize the objects behind (model, pk) keys as "json" or "jsonl", in key order.
+
+    Rows are read per model with values_list() and many-to-many values from the through
+    tables in bulk; no model instances are built. Rows deleted since the keys were
+    collected are skipped.
+    """
+    by_model: Dict[type[models.Model], list[object]] = {}
+    for model, pk in keys:
+        by_model.setdefault(model, []).append(pk)
+    loaded = {model: _model_rows(model, pks, using, projection) for model, pks in by_model.items()}
+    parts = []
+    for model, pk in keys:
+        obj = loaded[model].get(pk)
+        if obj is not None:
+            parts.append(_dumps(fmt, obj))
+    if fmt == "jsonl":
+        return "".join(part + "\n" for part in parts)
+    return "[" + ", ".join(parts) + "]"
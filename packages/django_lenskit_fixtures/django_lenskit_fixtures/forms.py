@@ -1,18 +1,62 @@
 from __future__ import annotations
 
+from typing import Any
+
 from django import forms
 
+from .exporter import get_traversal_policy
+
+
+def split_names(value: str) -> list[str]:
+    return [name.strip() for name in value.replace("\n", ",").split(",") if name.strip()]
+
 
 class FixtureExportForm(forms.Form):
     FORMAT_CHOICES = (
         ("json", "JSON"),
+        ("json.gz", "JSON (gzip)"),
+        ("json.bz2", "JSON (bzip2)"),
+        ("json.xz", "JSON (xz)"),
+        ("jsonl", "JSON Lines"),
+        ("jsonl.gz", "JSON Lines (gzip)"),
+        ("jsonl.bz2", "JSON Lines (bzip2)"),
+        ("jsonl.xz", "JSON Lines (xz)"),
         ("yaml", "YAML"),
+        ("yaml.gz", "YAML (gzip)"),
+        ("yaml.bz2", "YAML (bzip2)"),
+        ("yaml.xz", "YAML (xz)"),
     )
 
     fmt = forms.ChoiceField(choices=FORMAT_CHOICES, initial="json")
     include_reverse = forms.BooleanField(required=False, initial=False)
+    dependency_order = forms.BooleanField(required=False, initial=False)
     object_limit = forms.IntegerField(min_value=1, initial=5000)
+    max_depth = forms.IntegerField(required=False, min_value=0)
+    deny_relations = forms.CharField(required=False)
+    stop_at = forms.CharField(required=False)
 
     def clean_object_limit(self) -> int:
         value = int(self.cleaned_data["object_limit"])
         return max(1, value)
+
+    def clean_deny_relations(self) -> list[str]:
+        return split_names(self.cleaned_data.get("deny_relations") or "")
+
+    def clean_stop_at(self) -> list[str]:
+        return split_names(self.cleaned_data.get("stop_at") or "")
+
+    def clean(self) -> dict[str, Any]:
+        cleaned = super().clean()
+        try:
+            get_traversal_policy(self.traversal_policy())
+        except ValueError as e:
+            raise forms.ValidationError(str(e)) from e
+        return cleaned
+
+    def traversal_policy(self) -> dict[str, Any]:
+        # Per-export additions to the "traversal_policy" setting
+        return {
+            "max_depth": self.cleaned_data.get("max_depth"),
+            "deny": self.cleaned_data.get("deny_relations") or [],
+            "stop_at": self.cleaned_data.get("stop_at") or [],
+        }
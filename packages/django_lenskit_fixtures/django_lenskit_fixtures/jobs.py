@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import stat
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Any, Optional, Union
+
+from django.apps import apps as django_apps
+from django.db import connections, models
+
+from .exporter import (
+    TooManyObjects,
+    _fixtures_cfg,
+    build_closure,
+    export_database,
+    export_snapshot,
+    fixtures_enabled,
+    get_traversal_policy,
+    iter_fixture_bytes,
+)
+
+# Job state lives in small JSON files next to the output, so any worker process on the
+# same host can report status or serve the download; no broker or database table needed.
+
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+_pending = 0
+# Files written for jobs and previews (job_dir may be shared with other files)
+_JOB_FILE = re.compile(r"^[0-9a-f]{32}\.(status\.json|out|preview\.json)(\.tmp)?$")
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+def _jobs_cfg() -> tuple[int, int, int]:
+    fixtures = _fixtures_cfg()
+    defaults = {"job_workers": 2, "job_max_pending": 8, "job_ttl": 3600}
+    values = []
+    for name, default in defaults.items():
+        try:
+            values.append(max(1, int(fixtures.get(name, default))))
+        except Exception:
+            values.append(default)
+    return values[0], values[1], values[2]
+
+
+def job_dir() -> str:
+    # Fixtures can hold user data: the directory is created private to the process's user.
+    # The default one sits in the shared temp directory, where another user could have
+    # created it (or a symlink) first: it must be a directory owned by this user, and
+    # access for others left by earlier versions is removed.
+    configured = _fixtures_cfg().get("job_dir")
+    path = str(configured or os.path.join(tempfile.gettempdir(), "django_lenskit_fixtures"))
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if not configured and hasattr(os, "getuid"):
+        info = os.lstat(path)
+        if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid():
+            raise PermissionError(
+                f"{path} is not a directory owned by this user; set the job_dir setting"
+            )
+        if info.st_mode & (stat.S_IRWXG | stat.S_IRWXO):
+            os.chmod(path, 0o700)
+    return path
+
+
+def open_private(path: str, mode: str = "w") -> IO[Any]:
+    # Job and preview files are readable by their owner only, whatever the umask
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    if "b" in mode:
+        return os.fdopen(fd, mode)
+    return os.fdopen(fd, mode, encoding="utf-8")
+
+
+def _status_path(job_id: str) -> str:
+    return os.path.join(job_dir(), f"{job_id}.status.json")
+
+
+def _output_path(job_id: str) -> str:
+    return os.path.join(job_dir(), f"{job_id}.out")
+
+
+def _write_status(job_id: str, status: dict[str, Any]) -> None:
+    path = _status_path(job_id)
+    tmp = f"{path}.tmp"
+    with open_private(tmp) as f:
+        json.dump(status, f)
+    os.replace(tmp, path)
+
+
+def get_job(job_id: str) -> Optional[dict[str, Any]]:
+    # Job ids are uuid4 hex strings; anything else never touches the filesystem
+    try:
+        job_id = uuid.UUID(hex=job_id).hex
+    except ValueError:
+        return None
+    try:
+        with open(_status_path(job_id), encoding="utf-8") as f:
+            status: dict[str, Any] = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return status
+
+
+def job_output_path(job_id: str) -> str:
+    return _output_path(uuid.UUID(hex=job_id).hex)
+
+
+def _get_executor(workers: int) -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="lenskit-export")
+    return _executor
+
+
+def _cleanup_expired(ttl: int) -> None:
+    cutoff = time.time() - ttl
+    directory = job_dir()
+    for name in os.listdir(directory):
+        if not _JOB_FILE.match(name):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            continue
+
+
+def submit_export(
+    model_label: str,
+    pks: Union[list[Any], models.QuerySet[Any]],
+    *,
+    include_reverse: bool,
+    object_limit: int,
+    fmt: str,
+    filename: str,
+    owner_id: Optional[int] = None,
+    dependency_order: bool = False,
+    traversal_policy: Optional[dict[str, Any]] = None,
+    using: Optional[str] = None,
+) -> str:
+    global _pending
+    if not fixtures_enabled():
+        raise PermissionError("Fixture export is disabled by configuration")
+    workers, max_pending, ttl = _jobs_cfg()
+    with _lock:
+        if _pending >= max_pending:
+            raise JobQueueFull("Too many fixture exports are queued; try again later.")
+        _pending += 1
+    try:
+        _cleanup_expired(ttl)
+        job_id = uuid.uuid4().hex
+        _write_status(
+            job_id,
+            {
+                "id": job_id,
+                "state": "queued",
+                "owner_id": owner_id,
+                "filename": filename,
+                "level": 0,
+                "objects": 0,
+                "bytes_written": 0,
+                "error": None,
+            },
+        )
+        _get_executor(workers).submit(
+            _run_in_worker,
+            job_id,
+            model_label,
+            pks,
+            include_reverse=include_reverse,
+            object_limit=object_limit,
+            fmt=fmt,
+            dependency_order=dependency_order,
+            traversal_policy=traversal_policy,
+            using=using,
+        )
+    except Exception:
+        # The job never reached the executor, which releases the slot when a job ends
+        with _lock:
+            _pending -= 1
+        raise
+    return job_id
+
+
+def _run_export_job(
+    job_id: str,
+    model_label: str,
+    pks: Union[list[Any], models.QuerySet[Any]],
+    *,
+    include_reverse: bool,
+    object_limit: int,
+    fmt: str,
+    dependency_order: bool = False,
+    traversal_policy: Optional[dict[str, Any]] = None,
+    using: Optional[str] = None,
+) -> None:
+    status = get_job(job_id) or {"id": job_id}
+    status.update(state="running", level=0, objects=0, bytes_written=0, error=None)
+    _write_status(job_id, status)
+    last_write = time.monotonic()
+
+    def on_level(depth: int, collected: int) -> None:
+        status.update(level=depth, objects=collected)
+        _write_status(job_id, status)
+
+    try:
+        model = django_apps.get_model(model_label)
+        roots = model._default_manager.using(export_database(using))
+        if isinstance(pks, models.QuerySet):
+            # A server-side selection is applied as a subquery, never loaded as a pk list
+            pks = pks.using(roots.db).values("pk")
+        queryset = roots.filter(pk__in=pks)
+        with export_snapshot(queryset.db):
+            instances = build_closure(
+                queryset,
+                include_reverse=include_reverse,
+                object_limit=object_limit,
+                on_level=on_level,
+                policy=get_traversal_policy(traversal_policy),
+            )
+            if dependency_order:
+                instances = instances.by_dependency()
+            status.update(objects=len(instances), state="serializing")
+            _write_status(job_id, status)
+            with open_private(_output_path(job_id), "wb") as f:
+                for data in iter_fixture_bytes(instances, fmt=fmt):
+                    f.write(data)
+                    status["bytes_written"] += len(data)
+                    if time.monotonic() - last_write >= 0.5:
+                        last_write = time.monotonic()
+                        _write_status(job_id, status)
+        status["state"] = "done"
+    except TooManyObjects as e:
+        status.update(state="failed", error=str(e))
+    except Exception as e:
+        status.update(state="failed", error=f"Export failed: {e}")
+    _write_status(job_id, status)
+
+
+def _run_in_worker(job_id: str, *args: Any, **kwargs: Any) -> None:
+    global _pending
+    try:
+        _run_export_job(job_id, *args, **kwargs)
+    finally:
+        # Worker threads open their own connections; don't leak them between jobs
+        connections.close_all()
+        with _lock:
+            _pending -= 1
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import bz2
+import gzip
+import lzma
+from collections import Counter
+from typing import IO, Any, Iterable
+
+from django.core import serializers
+from django.core.management.color import no_style
+from django.core.serializers.base import DeserializedObject
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+
+from .exporter import sort_models_by_dependency
+
+_OPENERS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+
+
+def open_jsonl(path: str) -> IO[str]:
+    for suffix, opener in _OPENERS.items():
+        if path.endswith(suffix):
+            stream: IO[str] = opener(path, "rt", encoding="utf-8")
+            return stream
+    return open(path, encoding="utf-8")
+
+
+def load_jsonl(
+    lines: Iterable[str],
+    *,
+    using: str = DEFAULT_DB_ALIAS,
+    batch_size: int = 500,
+    ignore_conflicts: bool = False,
+) -> Counter[str]:
+    # Stream a JSON Lines fixture into the database with bulk_create. At most batch_size
+    # objects per model are buffered; whenever one buffer fills, every buffer is flushed in
+    # FK dependency order. Constraint checks are deferred until the end, like loaddata.
+    # Unlike loaddata, Model.save() and pre/post_save signals are not called.
+    counts: Counter[str] = Counter()
+    buffers: dict[type[models.Model], list[DeserializedObject]] = {}
+    touched: set[type[models.Model]] = set()
+    connection = connections[using]
+
+    def flush() -> None:
+        for model in sort_models_by_dependency(list(buffers)):
+            items = buffers.pop(model)
+            _insert(
+                model, items, using=using, batch_size=batch_size, ignore_conflicts=ignore_conflicts
+            )
+            counts[model._meta.label_lower] += len(items)
+            touched.add(model)
+
+    with transaction.atomic(using=using):
+        with connection.constraint_checks_disabled():
+            for deserialized in serializers.deserialize("jsonl", lines, using=using):
+                model = type(deserialized.object)
+                buffer = buffers.setdefault(model, [])
+                buffer.append(deserialized)
+                if len(buffer) >= batch_size:
+                    flush()
+            flush()
+        if touched:
+            connection.check_constraints(table_names=[m._meta.db_table for m in touched])
+            sequence_sql = connection.ops.sequence_reset_sql(no_style(), list(touched))
+            if sequence_sql:
+                with connection.cursor() as cursor:
+                    for sql in sequence_sql:
+                        cursor.execute(sql)
+    return counts
+
+
+def _insert(
+    model: type[models.Model],
+    items: list[DeserializedObject],
+    *,
+    using: str,
+    batch_size: int,
+    ignore_conflicts: bool,
+) -> None:
+    if model._meta.parents:
+        # bulk_create can't write multi-table inherited rows
+        for item in items:
+            item.save(using=using)
+        return
+    model._base_manager.using(using).bulk_create(
+        [item.object for item in items], batch_size=batch_size, ignore_conflicts=ignore_conflicts
+    )
+    rows: dict[type[models.Model], list[models.Model]] = {}
+    for item in items:
+        for name, target_pks in (item.m2m_data or {}).items():
+            field: Any = model._meta.get_field(name)
+            through = field.remote_field.through
+            source = through._meta.get_field(field.m2m_field_name()).attname
+            target = through._meta.get_field(field.m2m_reverse_field_name()).attname
+            rows.setdefault(through, []).extend(
+                through(**{source: item.object.pk, target: pk}) for pk in target_pks
+            )
+    for through, through_rows in rows.items():
+        through._base_manager.using(using).bulk_create(
+            through_rows, batch_size=batch_size, ignore_conflicts=ignore_conflicts
+        )
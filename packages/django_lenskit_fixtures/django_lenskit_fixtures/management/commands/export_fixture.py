@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import codecs
+import time
+from collections import Counter
+from typing import IO, Any, Optional
+
+from django.apps import apps as django_apps
+from django.core.exceptions import FieldError, ValidationError
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from ...exporter import (
+    TooManyObjects,
+    _default_object_limit,
+    build_closure,
+    export_database,
+    export_snapshot,
+    fixtures_enabled,
+    get_field_projection,
+    get_traversal_policy,
+    iter_fixture_bytes,
+    split_format,
+)
+from ...forms import FixtureExportForm
+from ...manifest import Manifest, apply_manifest
+
+
+class Command(BaseCommand):  # type: ignore[misc]
+    help = (
+        "Export a relation-complete fixture for the selected objects, streamed to a file. "
+        "Traversal statistics are written to stderr."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("model", help="Root model as app_label.ModelName")
+        parser.add_argument("--pks", dest="pks", help="Comma-separated primary keys")
+        parser.add_argument(
+            "--filter",
+            dest="filters",
+            action="append",
+            default=[],
+            metavar="LOOKUP=VALUE",
+            help="Queryset filter, e.g. --filter created__gte=2024-01-01 (repeatable)",
+        )
+        parser.add_argument(
+            "--all", dest="all", action="store_true", help="Start from every row of the model"
+        )
+        parser.add_argument(
+            "--reverse",
+            dest="include_reverse",
+            action="store_true",
+            help="Also follow reverse FK/M2M/O2O relations",
+        )
+        parser.add_argument(
+            "--dependency-order",
+            dest="dependency_order",
+            action="store_true",
+            help="Order output so FK targets precede the objects referencing them",
+        )
+        parser.add_argument(
+            "--fields",
+            dest="include_fields",
+            action="append",
+            default=[],
+            metavar="MODEL:FIELD,...",
+            help="Only export these fields of a model, e.g. --fields blog.Post:title,author",
+        )
+        parser.add_argument(
+            "--exclude-fields",
+            dest="exclude_fields",
+            action="append",
+            default=[],
+            metavar="MODEL:FIELD,...",
+            help="Leave these fields of a model out, e.g. --exclude-fields blog.Post:body",
+        )
+        parser.add_argument(
+            "--max-depth",
+            dest="max_depth",
+            type=int,
+            help="Only follow relations this many hops from the roots",
+        )
+        parser.add_argument(
+            "--deny",
+            dest="deny",
+            action="append",
+            default=[],
+            metavar="APP.MODEL.ACCESSOR",
+            help="Never follow this relation (repeatable)",
+        )
+        parser.add_argument(
+            "--stop-at",
+            dest="stop_at",
+            action="append",
+            default=[],
+            metavar="APP.MODEL",
+            help="Export objects of this model without traversing further (repeatable)",
+        )
+        parser.add_argument(
+            "--limit", dest="limit", type=int, help="Object cap (default: settings)"
+        )
+        parser.add_argument(
+            "--format",
+            dest="fmt",
+            default="json",
+            choices=[value for value, _label in FixtureExportForm.FORMAT_CHOICES],
+            help="Output format",
+        )
+        parser.add_argument("--output", dest="output", help="Write to this path (default: stdout)")
+        parser.add_argument(
+            "--manifest",
+            dest="manifest",
+            nargs="?",
+            const="",
+            metavar="PATH",
+            help="Write a manifest of object versions (default path: OUTPUT.manifest.json)",
+        )
+        parser.add_argument(
+            "--since",
+            dest="since",
+            metavar="PATH",
+            help="Earlier manifest: export only new and changed objects and record the "
+            "objects that left the export in the manifest's deleted list",
+        )
+        parser.add_argument(
+            "--database",
+            dest="database",
+            help='Database alias to read from (default: the "database" setting, else default)',
+        )
+
+    def handle(self, *args: str, **options: Any) -> None:
+        if not fixtures_enabled():
+            raise CommandError("Fixture export is disabled by configuration")
+        try:
+            model = django_apps.get_model(options["model"])
+        except (LookupError, ValueError) as e:
+            raise CommandError(f"Unknown model {options['model']!r}") from e
+
+        qs = model._default_manager.using(export_database(options["database"])).all()
+        pks_arg: Optional[str] = options.get("pks")
+        filters: list[str] = options["filters"]
+        if not (pks_arg or filters or options["all"]):
+            raise CommandError("Select roots with --pks, --filter or --all")
+        if pks_arg:
+            qs = qs.filter(pk__in=[s.strip() for s in pks_arg.split(",") if s.strip()])
+        for item in filters:
+            lookup, sep, value = item.partition("=")
+            if not sep or not lookup:
+                raise CommandError(f"Invalid --filter {item!r}; expected LOOKUP=VALUE")
+            try:
+                qs = qs.filter(**{lookup: value})
+                # Values are converted when the query is compiled (e.g. a malformed UUID)
+                qs.query.get_compiler(using=qs.db).as_sql()
+            except (FieldError, ValidationError, ValueError, TypeError) as e:
+                raise CommandError(f"Invalid --filter {item!r}: {e}") from e
+
+        projection: dict[str, dict[str, list[str]]] = {}
+        for key, values in (
+            ("include", options["include_fields"]),
+            ("exclude", options["exclude_fields"]),
+        ):
+            for item in values:
+                label, sep, names = item.partition(":")
+                if not sep or not names:
+                    raise CommandError(
+                        f"Invalid field selection {item!r}; expected MODEL:FIELD,..."
+                    )
+                try:
+                    label = django_apps.get_model(label)._meta.label
+                except (LookupError, ValueError) as e:
+                    raise CommandError(f"Unknown model {label!r}") from e
+                fields = [n.strip() for n in names.split(",") if n.strip()]
+                projection.setdefault(label, {}).setdefault(key, []).extend(fields)
+
+        try:
+            policy = get_traversal_policy(
+                {
+                    "max_depth": options["max_depth"],
+                    "deny": options["deny"],
+                    "stop_at": options["stop_at"],
+                }
+            )
+        except ValueError as e:
+            raise CommandError(str(e)) from e
+
+        fmt: str = options["fmt"]
+        output: Optional[str] = options.get("output")
+        if split_format(fmt)[1] is not None and output in (None, "-"):
+            raise CommandError("Compressed formats need --output")
+        manifest_path: Optional[str] = options["manifest"]
+        if manifest_path == "":
+            if output in (None, "-"):
+                raise CommandError("--manifest without a path needs --output")
+            manifest_path = f"{output}.manifest.json"
+        since: Optional[Manifest] = None
+        if options["since"]:
+            try:
+                with open(options["since"], encoding="utf-8") as f:
+                    since = Manifest.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Cannot read manifest {options['since']!r}: {e}") from e
+        manifest = Manifest() if manifest_path is not None or since is not None else None
+        limit = options["limit"] if options["limit"] is not None else _default_object_limit()
+        verbosity = int(options.get("verbosity", 1))
+
+        def on_level(depth: int, collected: int) -> None:
+            if verbosity >= 2:
+                self.stderr.write(f"level {depth}: {collected} objects")
+
+        # One read-only snapshot covers the traversal and the re-fetch while writing
+        with export_snapshot(qs.db):
+            started = time.monotonic()
+            try:
+                instances = build_closure(
+                    qs,
+                    include_reverse=bool(options["include_reverse"]),
+                    object_limit=limit,
+                    on_level=on_level,
+                    projection=get_field_projection(projection),
+                    policy=policy,
+                )
+            except (TooManyObjects, ValueError) as e:
+                raise CommandError(str(e)) from e
+            if options["dependency_order"]:
+                instances = instances.by_dependency()
+            if manifest is not None:
+                try:
+                    instances = apply_manifest(instances, manifest, since)
+                except ValueError as e:
+                    raise CommandError(str(e)) from e
+            traversed = time.monotonic()
+
+            written = 0
+            to_file = output not in (None, "-")
+            # Plain formats on stdout go through self.stdout (call_command(stdout=...)): as
+            # bytes when it wraps a binary buffer, else decoded to text
+            stream: Optional[IO[bytes]] = (
+                open(output, "wb") if to_file else getattr(self.stdout._out, "buffer", None)
+            )
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            try:
+                for data in iter_fixture_bytes(instances, fmt=fmt):
+                    if stream is not None:
+                        stream.write(data)
+                    else:
+                        self.stdout.write(decoder.decode(data), ending="")
+                    written += len(data)
+                if stream is not None:
+                    stream.flush()
+                else:
+                    self.stdout.write(decoder.decode(b"", final=True), ending="")
+                    self.stdout.flush()
+            finally:
+                if to_file and stream is not None:
+                    stream.close()
+            finished = time.monotonic()
+        if manifest is not None and manifest_path is not None:
+            with open(manifest_path, "w", encoding="utf-8") as f:
+                manifest.dump(f)
+        if verbosity >= 1:
+            per_model = Counter(instances.per_model())
+            for label, count in per_model.most_common():
+                self.stderr.write(f"[{label}] {count}")
+            self.stderr.write(
+                f"Exported {len(instances)} objects, {written} bytes "
+                f"(traversal {traversed - started:.2f}s, serialization {finished - traversed:.2f}s)"
+            )
+            if since is not None and manifest is not None:
+                deleted = sum(len(pks) for pks in manifest.deleted.values())
+                self.stderr.write(
+                    f"Delta: {len(instances)} new or changed of {len(manifest)}, {deleted} deleted"
+                )
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import DEFAULT_DB_ALIAS
+
+from ...loader import load_jsonl, open_jsonl
+
+
+class Command(BaseCommand):  # type: ignore[misc]
+    help = (
+        "Load JSON Lines fixtures (optionally .gz/.bz2/.xz) line by line with bulk_create. "
+        "Model.save() and save signals are not called."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("fixtures", nargs="+", help="Paths to .jsonl fixture files")
+        parser.add_argument(
+            "--database",
+            dest="database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database alias to load into",
+        )
+        parser.add_argument(
+            "--batch-size",
+            dest="batch_size",
+            type=int,
+            default=500,
+            help="Objects buffered per model before a bulk insert",
+        )
+        parser.add_argument(
+            "--ignore-conflicts",
+            dest="ignore_conflicts",
+            action="store_true",
+            help="Skip rows that already exist instead of failing",
+        )
+
+    def handle(self, *args: str, **options: Any) -> None:
+        batch_size: int = max(1, int(options["batch_size"]))
+        for path in options["fixtures"]:
+            try:
+                stream = open_jsonl(path)
+            except OSError as e:
+                raise CommandError(f"Cannot open fixture {path}: {e}") from e
+            with stream:
+                counts = load_jsonl(
+                    stream,
+                    using=options["database"],
+                    batch_size=batch_size,
+                    ignore_conflicts=bool(options["ignore_conflicts"]),
+                )
+            for label, count in sorted(counts.items()):
+                self.stdout.write(f"[{label}] {count}")
+            self.stdout.write(
+                self.style.SUCCESS(f"Loaded {sum(counts.values())} objects from {path}")
+            )
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+from .exporter import Closure, _batch_size, _fixtures_cfg
+from .fastjson import _converter, _model_rows
+
+# A manifest records a version for every (model, pk) of an export. Given the manifest of an
+# earlier export, a delta export writes only the objects whose version changed (or that are
+# new) and lists the objects that left the closure, so a refresh job can load the delta and
+# delete the rest. Versions are a hash of the serialized object, or for models listed in
+# the "manifest_version_fields" setting the value of a field such as updated_at, which is
+# read without loading the rows.
+
+_VERSION = 1
+
+
+class Manifest:
+    """Versions of the objects of one export, by model label and pk text.
+
+    Pass an empty instance to export_queryset(manifest=...) to have it filled in, and an
+    earlier one as since=... to export a delta. After a delta export ``deleted`` lists the
+    objects of ``since`` that are not in the new closure (deleted, or no longer reachable).
+    """
+
+    def __init__(
+        self,
+        objects: Optional[Dict[str, Dict[str, str]]] = None,
+        deleted: Optional[Dict[str, List[str]]] = None,
+    ) -> None:
+        self.objects: Dict[str, Dict[str, str]] = objects or {}
+        self.deleted: Dict[str, List[str]] = deleted or {}
+
+    def __len__(self) -> int:
+        return sum(len(versions) for versions in self.objects.values())
+
+    def version(self, label: str, pk: object) -> Optional[str]:
+        return self.objects.get(label, {}).get(str(pk))
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"version": _VERSION, "objects": self.objects, "deleted": self.deleted}
+
+    @classmethod
+    def from_dict(cls, data: Any) -> Manifest:
+        if not isinstance(data, dict) or data.get("version") != _VERSION:
+            raise ValueError("Not a fixture manifest (or written by another version)")
+        return cls(dict(data.get("objects") or {}), dict(data.get("deleted") or {}))
+
+    def dump(self, fp: IO[str]) -> None:
+        json.dump(self.as_dict(), fp, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, fp: IO[str]) -> Manifest:
+        try:
+            data = json.load(fp)
+        except ValueError as e:
+            raise ValueError("Not a fixture manifest") from e
+        return cls.from_dict(data)
+
+
+def _version_fields() -> Dict[str, str]:
+    configured = _fixtures_cfg().get("manifest_version_fields")
+    if not isinstance(configured, dict):
+        return {}
+    return {label.lower(): name for label, name in configured.items()}
+
+
+def _version_field(model: type[models.Model]) -> Optional[models.Field[Any, Any]]:
+    name = _version_fields().get(model._meta.label_lower)
+    if name is None:
+        return None
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist as e:
+        raise ValueError(f"Unknown manifest version field {model._meta.label}.{name}") from e
+    if not getattr(field, "concrete", False) or field.many_to_many:
+        raise ValueError(f"Manifest version field {model._meta.label}.{name} is not a column")
+    return field
+
+
+def _versions(
+    model: type[models.Model], pks: List[object], closure: Closure
+) -> Iterator[Tuple[object, str]]:
+    field = _version_field(model)
+    if field is not None:
+        convert = _converter(field)
+        rows = (
+            model._base_manager.db_manager(closure.using)
+            .filter(pk__in=pks)
+            .values_list(model._meta.pk.attname, field.attname)
+        )
+        for pk, value in rows:
+            yield pk, f"{field.name}:{convert(value)}"
+        return
+    # The serialized form, as written to the fixture (field projection included)
+    rows = _model_rows(model, pks, closure.using, closure.projection)
+    for pk, obj in rows.items():
+        text = json.dumps(obj["fields"], cls=DjangoJSONEncoder, sort_keys=True)
+        yield pk, hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def apply_manifest(
+    closure: Closure, manifest: Optional[Manifest], since: Optional[Manifest]
+) -> Closure:
+    """Record the closure's versions in manifest and return what to write.
+
+    Without since this is the whole closure. With since it is the objects whose version
+    differs from since, in closure order; since's objects missing from the closure go to
+    manifest.deleted. Rows deleted since the traversal are left out of both.
+    """
+    if manifest is None:
+        manifest = Manifest()
+    manifest.objects, manifest.deleted = {}, {}
+    keys = list(closure.keys())
+    by_model: Dict[type[models.Model], List[object]] = {}
+    for model, pk in keys:
+        by_model.setdefault(model, []).append(pk)
+    batch_size = _batch_size()
+    current: Dict[Tuple[type[models.Model], object], str] = {}
+    for model, pks in by_model.items():
+        versions = manifest.objects.setdefault(model._meta.label_lower, {})
+        for start in range(0, len(pks), batch_size):
+            for pk, version in _versions(model, pks[start : start + batch_size], closure):
+                current[(model, pk)] = versions[str(pk)] = version
+
+    if since is None:
+        return closure
+    delta = Closure(using=closure.using, projection=closure.projection)
+    for model, pk in keys:
+        version = current.get((model, pk))
+        if version is not None and version != since.version(model._meta.label_lower, pk):
+            delta.append(model, pk)
+    for label, versions in since.objects.items():
+        gone = [pk for pk in versions if pk not in manifest.objects.get(label, {})]
+        if gone:
+            manifest.deleted[label] = gone
+    return delta
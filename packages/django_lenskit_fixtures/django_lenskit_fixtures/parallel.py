@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import atexit
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Iterator, Optional
+
+from django.apps import apps as django_apps
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from .exporter import Closure, FieldProjection, _serialize_runs, _serializer
+from .fastjson import serialize_keys
+
+# Serialization of large closures in worker processes. The closure is cut into the same
+# batch_size chunks the serial path uses; each worker re-fetches the rows of its chunk and
+# returns the serialized parts, which the parent emits in chunk order, so the output is
+# byte-identical to serializing in the calling process.
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_lock = threading.Lock()
+
+
+def _init_worker() -> None:
+    # Spawned workers start from a fresh interpreter (DJANGO_SETTINGS_MODULE is inherited)
+    import django
+
+    django.setup()
+
+
+def _get_serializer_pool(workers: int) -> Executor:
+    # One pool per process, rebuilt when the "serialize_workers" setting changes; chunks
+    # already submitted to the old pool still complete
+    global _pool, _pool_workers
+    with _lock:
+        if _pool is not None and _pool_workers != workers:
+            _pool.shutdown(wait=False)
+            _pool = None
+        if _pool is None:
+            # spawn: forking a process that holds open database connections is unsafe
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+            _pool_workers = workers
+        return _pool
+
+
+@atexit.register
+def _shutdown_serializer_pool() -> None:
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+def _export_snapshot_id(using: str) -> Optional[str]:
+    # PostgreSQL can hand the parent's snapshot to other sessions; elsewhere workers read
+    # the committed state of the database
+    connection = connections[using]
+    if connection.vendor != "postgresql" or not connection.in_atomic_block:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_export_snapshot()")
+        row = cursor.fetchone()
+    return str(row[0])
+
+
+def serialize_chunk(
+    fmt: str,
+    keys: list[tuple[str, Any]],
+    using: Optional[str],
+    projection_spec: dict[str, Any],
+    snapshot_id: Optional[str] = None,
+) -> list[str]:
+    # Runs in a worker: rebuild the chunk as a Closure and serialize it like the serial path
+    projection = FieldProjection(projection_spec)
+    closure = Closure(using=using, projection=projection)
+    for label, pk in keys:
+        closure.append(django_apps.get_model(label), pk)
+
+    def serialize() -> list[str]:
+        if fmt != "yaml" and _serializer() == "lenskit":
+            return [serialize_keys(fmt, list(closure.keys()), using, projection)]
+        return list(_serialize_runs(fmt, list(closure), projection))
+
+    if snapshot_id is None:
+        return serialize()
+    alias = using or DEFAULT_DB_ALIAS
+    with transaction.atomic(using=alias):
+        with connections[alias].cursor() as cursor:
+            cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+            cursor.execute("SET TRANSACTION SNAPSHOT %s", [snapshot_id])
+        return serialize()
+
+
+def iter_chunk_parts(
+    closure: Closure, fmt: str, *, workers: int, batch_size: int
+) -> Iterator[list[str]]:
+    # Serialized parts per batch_size chunk of the closure, in closure order. At most
+    # workers * 2 chunks are in flight, so memory stays bounded by the window.
+    executor = _get_serializer_pool(workers)
+    using = closure.using or DEFAULT_DB_ALIAS
+    snapshot_id = _export_snapshot_id(using)
+    keys = ((model._meta.label, pk) for model, pk in closure.keys())
+    in_flight: deque[Future[list[str]]] = deque()
+    try:
+        while True:
+            while len(in_flight) < workers * 2:
+                chunk = list(islice(keys, batch_size))
+                if not chunk:
+                    break
+                in_flight.append(
+                    executor.submit(
+                        serialize_chunk,
+                        fmt,
+                        chunk,
+                        closure.using,
+                        closure.projection._spec,
+                        snapshot_id,
+                    )
+                )
+            if not in_flight:
+                return
+            yield in_flight.popleft().result()
+    finally:
+        for future in in_flight:
+            future.cancel()
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import json
+import os
+import uuid
+from typing import Any, Optional
+
+from django.apps import apps as django_apps
+
+from .exporter import Closure, FieldProjection, _fixtures_cfg, serialize_instances
+from .jobs import _cleanup_expired, _jobs_cfg, job_dir, open_private
+
+# A preview keeps the computed closure (model labels and pks, no rows) in a JSON file in
+# job_dir, so later pages are serialized from it without traversing again. Files expire
+# with the job files after job_ttl seconds.
+
+
+def _preview_cfg() -> tuple[int, int]:
+    fixtures = _fixtures_cfg()
+    defaults = {"preview_page_objects": 100, "preview_max_chars": 100_000}
+    values = []
+    for name, default in defaults.items():
+        try:
+            values.append(max(1, int(fixtures.get(name, default))))
+        except Exception:
+            values.append(default)
+    return values[0], values[1]
+
+
+def _preview_path(preview_id: str) -> str:
+    return os.path.join(job_dir(), f"{preview_id}.preview.json")
+
+
+def save_preview(closure: Closure, *, fmt: str, owner_id: Optional[int]) -> dict[str, Any]:
+    # Returns the saved state; its "id" addresses later pages
+    _cleanup_expired(_jobs_cfg()[2])
+    preview_id = uuid.uuid4().hex
+    labels: dict[str, int] = {}
+    keys = []
+    for model, pk in closure.keys():
+        index = labels.setdefault(model._meta.label, len(labels))
+        # Integer pks are stored as is; others (UUIDs, strings) as text
+        keys.append([index, pk if isinstance(pk, int) else str(pk)])
+    state = {
+        "id": preview_id,
+        "owner_id": owner_id,
+        "fmt": fmt,
+        "using": closure.using,
+        "projection": closure.projection._spec,
+        "models": list(labels),
+        "keys": keys,
+    }
+    path = _preview_path(preview_id)
+    tmp = f"{path}.tmp"
+    with open_private(tmp) as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+    return state
+
+
+def load_preview(preview_id: str) -> Optional[dict[str, Any]]:
+    # Preview ids are uuid4 hex strings; anything else never touches the filesystem
+    try:
+        preview_id = uuid.UUID(hex=preview_id).hex
+    except ValueError:
+        return None
+    try:
+        with open(_preview_path(preview_id), encoding="utf-8") as f:
+            state: dict[str, Any] = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state
+
+
+def preview_page(state: dict[str, Any], page: int) -> dict[str, Any]:
+    """Serialize one page of a saved preview.
+
+    Pages hold preview_page_objects objects in visiting order and are serialized as a
+    standalone fixture in the preview's format; text beyond preview_max_chars is cut off.
+    """
+    page_objects, max_chars = _preview_cfg()
+    total = len(state["keys"])
+    pages = max(1, -(-total // page_objects))
+    page = min(max(0, page), pages - 1)
+    models_ = [django_apps.get_model(label) for label in state["models"]]
+    closure = Closure(using=state["using"], projection=FieldProjection(state["projection"]))
+    for index, pk in state["keys"][page * page_objects : (page + 1) * page_objects]:
+        model = models_[index]
+        closure.append(model, model._meta.pk.to_python(pk))
+    text = serialize_instances(closure, fmt=state["fmt"])
+    return {
+        "page": page,
+        "pages": pages,
+        "objects": total,
+        "text": text[:max_chars],
+        "truncated": len(text) > max_chars,
+    }
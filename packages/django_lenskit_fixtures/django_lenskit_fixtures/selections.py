@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import copy
+import uuid
+from typing import Any, Optional
+
+from django.apps import apps as django_apps
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.sites import all_sites
+from django.core.exceptions import SuspiciousOperation
+from django.db import models
+from django.http import HttpRequest, QueryDict
+
+# Admin selections are kept in the session under a token, so export_action never puts pks
+# in a URL. "Select all N matching" stores the changelist's lookup parameters and is
+# resolved into the changelist queryset when the export runs; an explicit selection stores
+# the checked pks, which the action POST already carries (or, for callers that do not
+# post checkboxes, the pks of the queryset they pass).
+
+_SESSION_KEY = "django_lenskit_fixtures_selections"
+# Older selections of a session are dropped
+_MAX_SELECTIONS = 20
+
+
+class Selection:
+    def __init__(
+        self, model: type[models.Model], queryset: models.QuerySet[Any], pks: Optional[list[str]]
+    ) -> None:
+        self.model = model
+        self.queryset = queryset
+        # None for "all matching" selections, which are never materialized as pks
+        self.pks = pks
+
+    @property
+    def label(self) -> str:
+        if self.pks is None:
+            return "all objects matching the changelist filters"
+        return ",".join(self.pks)
+
+
+def store_selection(request: HttpRequest, modeladmin: Any, queryset: models.QuerySet[Any]) -> str:
+    entry: dict[str, Any] = {"model": queryset.model._meta.label}
+    if request.POST.get("select_across") == "1":
+        entry.update(site=modeladmin.admin_site.name, params=request.GET.urlencode())
+    else:
+        pks = request.POST.getlist(ACTION_CHECKBOX_NAME)
+        if not pks:
+            pks = [str(pk) for pk in queryset.values_list("pk", flat=True)]
+        if not pks:
+            raise ValueError("No objects selected")
+        entry["pks"] = pks
+    token = uuid.uuid4().hex
+    selections = dict(request.session.get(_SESSION_KEY, {}))
+    selections[token] = entry
+    for old in list(selections)[:-_MAX_SELECTIONS]:
+        del selections[old]
+    request.session[_SESSION_KEY] = selections
+    return token
+
+
+def resolve_selection(request: HttpRequest, token: str) -> Selection:
+    entry = request.session.get(_SESSION_KEY, {}).get(token)
+    if entry is None:
+        raise ValueError("Unknown or expired selection")
+    try:
+        model = django_apps.get_model(entry["model"])
+    except (LookupError, ValueError) as e:
+        raise ValueError("Invalid model parameter") from e
+    if "pks" in entry:
+        return Selection(model, model._default_manager.filter(pk__in=entry["pks"]), entry["pks"])
+
+    site = next((s for s in all_sites if s.name == entry["site"]), None)
+    modeladmin = site._registry.get(model) if site is not None else None
+    if modeladmin is None or not modeladmin.has_view_or_change_permission(request):
+        raise ValueError("Selection is no longer available")
+    # Rebuild the changelist the action ran on, with the stored filters, search and ordering
+    changelist_request = copy.copy(request)
+    changelist_request.GET = QueryDict(entry["params"])
+    try:
+        changelist = modeladmin.get_changelist_instance(changelist_request)
+    except (IncorrectLookupParameters, SuspiciousOperation) as e:
+        raise ValueError("Selection filters are no longer valid") from e
+    return Selection(model, changelist.get_queryset(changelist_request), None)
@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent after every export_queryset / stream_export_queryset call (including ones that raised
+# TooManyObjects) with sender=<root model> and stats=<ExportStats>
+export_finished = Signal()
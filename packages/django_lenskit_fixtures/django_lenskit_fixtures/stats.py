@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import dataclasses
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from django.db import connections
+from django.db.models import Model
+
+from .signals import export_finished
+
+logger = logging.getLogger("django_lenskit_fixtures")
+
+
+@dataclass
+class PhaseStats:
+    seconds: float = 0.0
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+@dataclass
+class ExportStats:
+    """Where an export spent its time.
+
+    Pass an instance to export_queryset(stats=...) or stream_export_queryset(stats=...) to
+    have it filled in. Phases ("traversal", "probe", "ordering", "manifest",
+    "serialization") are timed exclusively: time and queries of the probe are not also
+    counted under traversal.
+    Queries are counted with connection.execute_wrapper() on the export's database, so
+    queries of serialization worker processes are not included.
+    """
+
+    model: str = ""
+    fmt: str = ""
+    objects: int = 0
+    bytes: int = 0
+    cached: bool = False
+    error: Optional[str] = None
+    phases: Dict[str, PhaseStats] = field(default_factory=dict)
+    # Objects per model label, and objects added per BFS level (level 0 are the roots)
+    per_model: Dict[str, int] = field(default_factory=dict)
+    per_level: List[int] = field(default_factory=list)
+    _stack: List[List[Any]] = field(default_factory=list, repr=False)
+
+    @property
+    def seconds(self) -> float:
+        return sum(p.seconds for p in self.phases.values())
+
+    @property
+    def queries(self) -> int:
+        return sum(p.queries for p in self.phases.values())
+
+    @property
+    def db_seconds(self) -> float:
+        return sum(p.db_seconds for p in self.phases.values())
+
+    def _current(self) -> PhaseStats:
+        name = self._stack[-1][0] if self._stack else "other"
+        return self.phases.setdefault(name, PhaseStats())
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        now = time.perf_counter()
+        if self._stack:
+            # Pause the enclosing phase
+            outer = self._stack[-1]
+            self._current().seconds += now - outer[1]
+        self._stack.append([name, now])
+        self.phases.setdefault(name, PhaseStats())
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            self._current().seconds += now - self._stack[-1][1]
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1][1] = now
+
+    def _execute(
+        self, execute: Callable[..., Any], sql: str, params: Any, many: bool, context: Any
+    ) -> Any:
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            current = self._current()
+            current.queries += 1
+            current.db_seconds += time.perf_counter() - started
+
+    @contextmanager
+    def capture(self, using: str) -> Iterator[None]:
+        # Count the queries run on this connection (in this thread) while the block runs
+        with connections[using].execute_wrapper(self._execute):
+            yield
+
+    def timed(self, chunks: Iterator[bytes], name: str = "serialization") -> Iterator[bytes]:
+        # Time only the work of producing each chunk, not the consumer's time in between
+        iterator = iter(chunks)
+        while True:
+            with self.phase(name):
+                chunk = next(iterator, None)
+            if chunk is None:
+                return
+            self.bytes += len(chunk)
+            yield chunk
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = {f.name: getattr(self, f.name) for f in dataclasses.fields(self) if f.repr}
+        data["phases"] = {name: dataclasses.asdict(p) for name, p in self.phases.items()}
+        data.update(seconds=self.seconds, queries=self.queries, db_seconds=self.db_seconds)
+        return data
+
+
+def report(stats: ExportStats, sender: type[Model]) -> None:
+    # Log the stats and send export_finished; the structured form is in the record's "stats"
+    logger.info(
+        "Fixture export of %s (%s): %d objects, %d bytes, %d queries (%.3fs in the database), "
+        "%.3fs%s",
+        stats.model,
+        stats.fmt,
+        stats.objects,
+        stats.bytes,
+        stats.queries,
+        stats.db_seconds,
+        stats.seconds,
+        f", failed: {stats.error}" if stats.error else " (cached)" if stats.cached else "",
+        extra={"stats": stats.as_dict()},
+    )
+    export_finished.send(sender=sender, stats=stats)
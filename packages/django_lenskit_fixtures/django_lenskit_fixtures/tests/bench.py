@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from collections import deque
+from typing import Any, Callable, Optional, Sequence
+
+from django.db import DEFAULT_DB_ALIAS
+
+from django_lenskit_fixtures import exporter
+from django_lenskit_fixtures.stats import ExportStats
+
+from .graphs import GraphSpec, make_graph
+
+# Exporter benchmarks on synthetic graphs (tests/graphs.py). Each benchmark records the
+# best wall time of --repeat runs, the queries it issued and their database time, and the
+# peak of Python allocations (tracemalloc, measured in a separate run because tracing
+# slows everything down). Results are written as JSON; --baseline prints the ratio to an
+# earlier results file. probe_walk loads instances one object at a time and is slow on
+# large graphs; pick benchmarks with --benchmark.
+#
+#   DJANGO_SETTINGS_MODULE=django_lenskit_fixtures.tests.settings \
+#       python -m django_lenskit_fixtures.tests.bench --sizes 1000,10000 --output bench.json
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+BENCHMARKS = ("build_closure", "probe_walk", "probe_count", "serialize_instances")
+
+# No caps or budgets: the benchmarks measure complete traversals
+_SETTINGS = {
+    "enabled": True,
+    "default_object_limit": 10**9,
+    "excess_probe_queries": 10**9,
+    "excess_probe_seconds": 10**9,
+}
+
+
+def _measure(run: Callable[[], Any], *, repeat: int, memory: bool) -> dict[str, Any]:
+    best: Optional[ExportStats] = None
+    for _ in range(max(1, repeat)):
+        stats = ExportStats()
+        with stats.capture(DEFAULT_DB_ALIAS), stats.phase("run"):
+            run()
+        if best is None or stats.seconds < best.seconds:
+            best = stats
+    assert best is not None
+    result: dict[str, Any] = {
+        "seconds": best.seconds,
+        "queries": best.queries,
+        "db_seconds": best.db_seconds,
+        "peak_bytes": None,
+    }
+    if memory:
+        tracemalloc.start()
+        try:
+            run()
+            result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def run_benchmarks(
+    spec: GraphSpec,
+    *,
+    benchmarks: Sequence[str] = BENCHMARKS,
+    fmt: str = "json",
+    repeat: int = 1,
+    memory: bool = True,
+) -> list[dict[str, Any]]:
+    # Builds the graph for spec and runs the benchmarks on it
+    from django.test import override_settings
+
+    root = make_graph(spec)
+    results = []
+    with override_settings(ADMIN_LENSKIT={"fixtures": _SETTINGS}):
+        closure = exporter.build_closure([root], include_reverse=True, object_limit=10**9)
+        cases: dict[str, Callable[[], Any]] = {
+            "build_closure": lambda: exporter.build_closure(
+                [root], include_reverse=True, object_limit=10**9
+            ),
+            "probe_walk": lambda: exporter._probe_excess(deque([(root, 0)]), True, set(), 10**9),
+            "probe_count": lambda: exporter._probe_excess_counts(
+                deque([(root, 0)]), True, set(), 10**9
+            ),
+            "serialize_instances": lambda: exporter.serialize_instances(closure, fmt=fmt),
+        }
+        for name in benchmarks:
+            measured = _measure(cases[name], repeat=repeat, memory=memory)
+            results.append(
+                {"benchmark": name, "graph": spec.as_dict(), "closure": len(closure), **measured}
+            )
+    return results
+
+
+def _environment() -> dict[str, Any]:
+    import django
+    from django.db import connection
+
+    return {
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": connection.vendor,
+        "machine": platform.machine(),
+        "started": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def _key(result: dict[str, Any]) -> str:
+    return json.dumps([result["benchmark"], result["graph"]], sort_keys=True)
+
+
+def _print(results: list[dict[str, Any]], baseline: Optional[dict[str, Any]]) -> None:
+    previous = {_key(r): r for r in (baseline or {}).get("results", [])}
+    for r in results:
+        peak = r["peak_bytes"]
+        line = (
+            f"{r['benchmark']:<20} {r['graph']['objects']:>8} nodes {r['closure']:>8} objects "
+            f"{r['seconds']:>9.3f}s {r['queries']:>6} queries "
+            f"{'-' if peak is None else f'{peak / 2**20:.1f}MiB':>9}"
+        )
+        old = previous.get(_key(r))
+        if old is not None and old["seconds"]:
+            line += f"  x{r['seconds'] / old['seconds']:.2f} time, {old['queries']} queries before"
+        print(line)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Fixture exporter benchmarks")
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(n) for n in DEFAULT_SIZES),
+        help="Comma-separated node counts (default: %(default)s)",
+    )
+    parser.add_argument("--fan-out", type=int, default=4)
+    parser.add_argument("--cycles", type=float, default=0.1)
+    parser.add_argument("--m2m-density", type=float, default=1.0)
+    parser.add_argument("--hubs", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--benchmark", dest="benchmarks", action="append", choices=BENCHMARKS, default=[]
+    )
+    parser.add_argument("--format", dest="fmt", default="json")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--no-memory", dest="memory", action="store_false")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", help="Earlier results file to compare with")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "django_lenskit_fixtures.tests.settings")
+    import django
+
+    django.setup()
+    from django.core.management import call_command
+
+    # The test settings use in-memory SQLite without migrations for the test app
+    call_command("migrate", run_syncdb=True, verbosity=0)
+    environment = _environment()
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        spec = GraphSpec(
+            objects=size,
+            fan_out=args.fan_out,
+            cycles=args.cycles,
+            m2m_density=args.m2m_density,
+            hubs=args.hubs,
+            seed=args.seed,
+        )
+        measured = run_benchmarks(
+            spec,
+            benchmarks=args.benchmarks or BENCHMARKS,
+            fmt=args.fmt,
+            repeat=args.repeat,
+            memory=args.memory,
+        )
+        _print(measured, baseline)
+        results.extend(measured)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
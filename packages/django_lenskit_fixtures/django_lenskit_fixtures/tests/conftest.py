@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+import pytest
+from django.apps import apps as django_apps
+from django.db import models
+
+# Small Root / Item graphs shared by the tests. make_graph(...) creates `roots` roots
+# (named from `name`) owning `items` items each (labelled from `label`; n numbers the
+# root, m the item). The first `m2m` items of each root are also added to Root.items, and
+# profile=True gives every root a RootProfile. Tests using it need the django_db mark.
+
+
+@dataclass
+class Graph:
+    roots: list[models.Model]
+    items: list[models.Model] = field(default_factory=list)
+
+    @property
+    def root(self) -> models.Model:
+        return self.roots[0]
+
+    @property
+    def queryset(self) -> models.QuerySet[Any]:
+        # A fresh queryset of the roots on each access
+        return type(self.root).objects.filter(pk__in=[r.pk for r in self.roots])
+
+
+@pytest.fixture
+def make_graph() -> Callable[..., Graph]:
+    def make(
+        *,
+        roots: int = 1,
+        items: int = 3,
+        m2m: int = 0,
+        profile: bool = False,
+        name: str = "R{n}",
+        label: str = "i{m}",
+    ) -> Graph:
+        Root = django_apps.get_model("fixtures_testapp", "Root")
+        Item = django_apps.get_model("fixtures_testapp", "Item")
+        RootProfile = django_apps.get_model("fixtures_testapp", "RootProfile")
+        graph = Graph(roots=[])
+        for n in range(1, roots + 1):
+            r = Root.objects.create(name=name.format(n=n))
+            owned = [
+                Item.objects.create(root=r, label=label.format(n=n, m=m)) for m in range(items)
+            ]
+            r.items.add(*owned[:m2m])
+            if profile:
+                RootProfile.objects.create(root=r, notes="p")
+            graph.roots.append(r)
+            graph.items.extend(owned)
+        return graph
+
+    return make
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import math
+import random
+from dataclasses import dataclass
+from typing import Any
+
+from django.apps import apps as django_apps
+from django.db import models
+
+# Synthetic object graphs on the testapp's BenchNode / BenchHub models, for the benchmarks
+# (tests/bench.py). Node 1 is the root of a tree built with the parent FK; a closure of the
+# root with reverse relations reaches every node. Rows are written with bulk_create and
+# explicit ids, and a seeded RNG places the extra edges, so a spec always builds the same
+# graph.
+
+
+@dataclass(frozen=True)
+class GraphSpec:
+    # Number of BenchNode rows
+    objects: int = 1000
+    # Children per node; the tree's depth follows from objects and fan_out (fan_out=1
+    # builds a single chain)
+    fan_out: int = 4
+    # Share of nodes whose "back" FK points to a random earlier node (forward cycles)
+    cycles: float = 0.0
+    # Average number of "links" M2M rows per node
+    m2m_density: float = 0.0
+    # Nodes are spread round-robin over this many hubs (0: no hubs)
+    hubs: int = 0
+    seed: int = 0
+
+    @property
+    def depth(self) -> int:
+        if self.fan_out <= 1:
+            return max(0, self.objects - 1)
+        # Levels of a complete fan_out-ary tree holding objects nodes, minus the root level
+        return max(0, math.ceil(math.log(self.objects * (self.fan_out - 1) + 1, self.fan_out)) - 1)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "objects": self.objects,
+            "fan_out": self.fan_out,
+            "depth": self.depth,
+            "cycles": self.cycles,
+            "m2m_density": self.m2m_density,
+            "hubs": self.hubs,
+            "seed": self.seed,
+        }
+
+
+def clear_graph() -> None:
+    BenchNode = django_apps.get_model("fixtures_testapp", "BenchNode")
+    BenchHub = django_apps.get_model("fixtures_testapp", "BenchHub")
+    BenchNode.links.through.objects.all().delete()
+    # One DELETE statement; the collector would walk the whole tree through "children"
+    BenchNode.objects.all()._raw_delete(BenchNode.objects.db)
+    BenchHub.objects.all()._raw_delete(BenchHub.objects.db)
+
+
+def make_graph(spec: GraphSpec, *, batch_size: int = 2000) -> models.Model:
+    # Replaces any existing benchmark graph and returns the root node
+    BenchNode = django_apps.get_model("fixtures_testapp", "BenchNode")
+    BenchHub = django_apps.get_model("fixtures_testapp", "BenchHub")
+    Link = BenchNode.links.through
+    clear_graph()
+    rng = random.Random(spec.seed)
+    fan_out = max(1, spec.fan_out)
+
+    BenchHub.objects.bulk_create(
+        [BenchHub(id=n, name=f"hub {n}") for n in range(1, spec.hubs + 1)],
+        batch_size=batch_size,
+    )
+    nodes = []
+    for n in range(1, spec.objects + 1):
+        back = rng.randint(1, n - 1) if n > 1 and rng.random() < spec.cycles else None
+        nodes.append(
+            BenchNode(
+                id=n,
+                parent_id=(n - 2) // fan_out + 1 if n > 1 else None,
+                hub_id=(n - 1) % spec.hubs + 1 if spec.hubs else None,
+                back_id=back,
+                label=f"node {n}",
+            )
+        )
+    BenchNode.objects.bulk_create(nodes, batch_size=batch_size)
+
+    pairs: set[tuple[int, int]] = set()
+    wanted = min(int(spec.objects * spec.m2m_density), spec.objects * (spec.objects - 1))
+    while len(pairs) < wanted:
+        source, target = rng.randint(1, spec.objects), rng.randint(1, spec.objects)
+        if source != target:
+            pairs.add((source, target))
+    Link.objects.bulk_create(
+        [Link(from_benchnode_id=s, to_benchnode_id=t) for s, t in sorted(pairs)],
+        batch_size=batch_size,
+    )
+    return BenchNode.objects.get(pk=1)
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import pytest
+from django.apps import apps as django_apps
+
+from django_lenskit_fixtures.tests.bench import BENCHMARKS, run_benchmarks
+from django_lenskit_fixtures.tests.graphs import GraphSpec, make_graph
+
+
+@pytest.mark.django_db
+def test_make_graph_builds_the_spec_deterministically() -> None:
+    BenchNode = django_apps.get_model("fixtures_testapp", "BenchNode")
+    spec = GraphSpec(objects=50, fan_out=3, cycles=0.5, m2m_density=2.0, hubs=4, seed=7)
+    root = make_graph(spec)
+    assert root.parent_id is None
+    assert BenchNode.objects.count() == 50
+    assert BenchNode.links.through.objects.count() == 100
+    assert set(BenchNode.objects.values_list("hub_id", flat=True)) == {1, 2, 3, 4}
+    assert BenchNode.objects.filter(children__isnull=False).distinct().count() == 17
+    backs = list(BenchNode.objects.order_by("pk").values_list("back_id", flat=True))
+    assert all(b is None or b < n for n, b in enumerate(backs, start=1))
+
+    # The same spec replaces the graph with an identical one
+    links = set(BenchNode.links.through.objects.values_list("from_benchnode", "to_benchnode"))
+    make_graph(spec)
+    assert BenchNode.objects.count() == 50
+    assert (
+        set(BenchNode.links.through.objects.values_list("from_benchnode", "to_benchnode")) == links
+    )
+    assert spec.depth == 4 and GraphSpec(objects=5, fan_out=1).depth == 4
+
+
+@pytest.mark.django_db
+def test_run_benchmarks_reports_every_benchmark() -> None:
+    spec = GraphSpec(objects=30, cycles=0.2, m2m_density=1.0, hubs=2)
+    results = run_benchmarks(spec)
+    assert [r["benchmark"] for r in results] == list(BENCHMARKS)
+    for r in results:
+        assert r["closure"] == 32
+        assert r["graph"]["objects"] == 30
+        assert r["queries"] > 0 and r["seconds"] > 0 and r["peak_bytes"] > 0
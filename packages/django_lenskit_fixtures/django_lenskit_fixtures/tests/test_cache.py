@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+from django.apps import apps as django_apps
+from django.core.cache import cache as default_cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from django_lenskit_fixtures import exporter
+from django_lenskit_fixtures.exporter import (
+    TooManyObjects,
+    export_queryset,
+    stream_export_queryset,
+)
+
+
+@pytest.fixture
+def cache_settings():
+    default_cache.clear()
+    with override_settings(ADMIN_LENSKIT={"fixtures": {"enabled": True, "cache_alias": "default"}}):
+        yield
+    default_cache.clear()
+
+
+def _item_queries(ctx: CaptureQueriesContext) -> list[str]:
+    return [q["sql"] for q in ctx.captured_queries if "fixtures_testapp_item" in q["sql"]]
+
+
+@pytest.mark.django_db
+def test_preview_then_download_reuses_cached_output(make_graph, cache_settings) -> None:
+    r = make_graph().root
+    Root = type(r)
+    qs = Root.objects.filter(pk=r.pk)
+
+    preview = export_queryset(qs, include_reverse=True, object_limit=100)
+    with CaptureQueriesContext(connection) as ctx:
+        download = b"".join(stream_export_queryset(qs, include_reverse=True, object_limit=100))
+    assert download.decode("utf-8") == preview
+    # The entry is found from the selection's SQL; not even its pks are read
+    assert not ctx.captured_queries
+
+
+@pytest.mark.django_db
+def test_closure_is_shared_across_formats(make_graph, cache_settings) -> None:
+    r = make_graph().root
+    qs = type(r).objects.filter(pk=r.pk)
+    export_queryset(qs, include_reverse=True, object_limit=100)
+    with CaptureQueriesContext(connection) as ctx:
+        data = export_queryset(qs, include_reverse=True, object_limit=100, fmt="jsonl")
+    assert len(data.splitlines()) == 4
+    # Rows are re-fetched for serialization, but relations are not traversed again
+    assert not any('"fixtures_testapp_item"."root_id" IN' in sql for sql in _item_queries(ctx))
+
+
+@pytest.mark.django_db
+def test_writes_to_involved_models_invalidate_entries(make_graph, cache_settings) -> None:
+    graph = make_graph()
+    r, items = graph.root, graph.items
+    Item = type(items[0])
+    qs = type(r).objects.filter(pk=r.pk)
+
+    first = json.loads(export_queryset(qs, include_reverse=True, object_limit=100))
+    Item.objects.create(root=r, label="new")
+    second = json.loads(export_queryset(qs, include_reverse=True, object_limit=100))
+    assert len(second) == len(first) + 1
+
+    r.items.add(items[0])
+    third = json.loads(export_queryset(qs, include_reverse=True, object_limit=100))
+    root = next(o for o in third if o["model"] == "fixtures_testapp.root")
+    assert root["fields"]["items"] == [items[0].pk]
+
+    items[1].delete()
+    fourth = json.loads(export_queryset(qs, include_reverse=True, object_limit=100))
+    assert len(fourth) == len(third) - 1
+
+
+@pytest.mark.django_db
+def test_direct_writes_to_a_through_model_invalidate_entries(cache_settings) -> None:
+    Playlist = django_apps.get_model("fixtures_testapp", "Playlist")
+    Track = django_apps.get_model("fixtures_testapp", "Track")
+    PlaylistEntry = django_apps.get_model("fixtures_testapp", "PlaylistEntry")
+    playlist = Playlist.objects.create(name="P")
+    tracks = [Track.objects.create(title=f"t{n}") for n in range(2)]
+    PlaylistEntry.objects.create(playlist=playlist, track=tracks[0])
+
+    def exported_tracks():
+        qs = Playlist.objects.filter(pk=playlist.pk)
+        data = json.loads(export_queryset(qs, include_reverse=False, object_limit=100))
+        return {o["pk"] for o in data if o["model"] == "fixtures_testapp.track"}
+
+    assert exported_tracks() == {tracks[0].pk}
+    # post_save / post_delete of the through model, no m2m_changed
+    PlaylistEntry.objects.create(playlist=playlist, track=tracks[1])
+    assert exported_tracks() == {tracks[0].pk, tracks[1].pk}
+    PlaylistEntry.objects.filter(track=tracks[0]).delete()
+    assert exported_tracks() == {tracks[1].pk}
+
+
+@pytest.mark.django_db
+def test_too_many_objects_is_cached(make_graph, cache_settings) -> None:
+    r = make_graph().root
+    qs = type(r).objects.filter(pk=r.pk)
+    with pytest.raises(TooManyObjects):
+        export_queryset(qs, include_reverse=True, object_limit=2)
+    with CaptureQueriesContext(connection) as ctx:
+        with pytest.raises(TooManyObjects) as ei:
+            stream_export_queryset(qs, include_reverse=True, object_limit=2, fmt="json.gz")
+    assert ei.value.collected == 4
+    assert not ctx.captured_queries
+
+
+@pytest.mark.django_db
+def test_outputs_over_max_bytes_are_not_stored(make_graph) -> None:
+    r = make_graph().root
+    qs = type(r).objects.filter(pk=r.pk)
+    default_cache.clear()
+    cfg = {"enabled": True, "cache_alias": "default", "cache_max_bytes": 10}
+    with override_settings(ADMIN_LENSKIT={"fixtures": cfg}):
+        export_queryset(qs, include_reverse=True, object_limit=100)
+        with CaptureQueriesContext(connection) as ctx:
+            export_queryset(qs, include_reverse=True, object_limit=100)
+    assert _item_queries(ctx)
+    default_cache.clear()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_cache_writes_run_outside_the_read_only_snapshot(make_graph, monkeypatch) -> None:
+    caches = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "db": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "lenskit_cache",
+        },
+    }
+    snapshot = exporter.export_snapshot
+    open_snapshots = []
+
+    def tracked(using):
+        with snapshot(using):
+            open_snapshots.append(using)
+            try:
+                yield
+            finally:
+                open_snapshots.pop()
+
+    monkeypatch.setattr(exporter, "export_snapshot", exporter.contextmanager(tracked))
+    writes_inside = []
+
+    def record(execute, sql, params, many, context):
+        if open_snapshots and sql.lstrip().split(None, 1)[0].upper() != "SELECT":
+            writes_inside.append(sql)
+        return execute(sql, params, many, context)
+
+    r = make_graph().root
+    qs = type(r).objects.filter(pk=r.pk)
+    cfg = {"enabled": True, "cache_alias": "db"}
+    with override_settings(CACHES=caches, ADMIN_LENSKIT={"fixtures": cfg}):
+        call_command("createcachetable", verbosity=0)
+        with connection.execute_wrapper(record), CaptureQueriesContext(connection) as ctx:
+            preview = export_queryset(qs, include_reverse=True, object_limit=100, fmt="jsonl")
+            download = b"".join(stream_export_queryset(qs, include_reverse=True, object_limit=100))
+            # Served from the entry the stream stored
+            again = b"".join(stream_export_queryset(qs, include_reverse=True, object_limit=100))
+    assert len(preview.splitlines()) == 4
+    assert again == download and len(json.loads(download)) == 4
+    assert any("lenskit_cache" in q["sql"] and "INSERT" in q["sql"] for q in ctx.captured_queries)
+    assert writes_inside == []
+
+
+@pytest.mark.django_db
+def test_filtered_selections_follow_writes_to_the_models_they_read(
+    make_graph, cache_settings
+) -> None:
+    r = make_graph().root
+    Root = type(r)
+    RootProfile = django_apps.get_model("fixtures_testapp", "RootProfile")
+    other = Root.objects.create(name="R2")
+    RootProfile.objects.create(root=r, notes="x")
+
+    def export():
+        # The selection depends on RootProfile rows, which a closure of Root without
+        # reverse relations never reaches
+        qs = Root.objects.filter(profile__notes="x")
+        return json.loads(export_queryset(qs, include_reverse=False, object_limit=100))
+
+    assert {o["pk"] for o in export()} == {str(r.pk)}
+    RootProfile.objects.create(root=other, notes="x")
+    assert {o["pk"] for o in export()} == {str(r.pk), str(other.pk)}
+
+
+@pytest.mark.django_db
+def test_receivers_are_only_connected_for_models_of_cached_exports(make_graph) -> None:
+    from django.db.models.signals import post_delete, post_save
+
+    BenchHub = django_apps.get_model("fixtures_testapp", "BenchHub")
+    BenchNode = django_apps.get_model("fixtures_testapp", "BenchNode")
+    hub = BenchHub.objects.create(name="h")
+    BenchNode.objects.bulk_create([BenchNode(hub=hub, label=f"n{n}") for n in range(3)])
+    # No receiver: the cascade deletes the nodes without loading them
+    assert not post_delete.has_listeners(BenchNode)
+    with CaptureQueriesContext(connection) as ctx:
+        hub.delete()
+    assert not any('"label"' in q["sql"] for q in ctx.captured_queries)
+
+    r = make_graph().root
+    Root = type(r)
+    with override_settings(ADMIN_LENSKIT={"fixtures": {"enabled": True, "cache_alias": "default"}}):
+        export_queryset(Root.objects.filter(pk=r.pk), include_reverse=True, object_limit=100)
+    default_cache.clear()
+    assert post_save.has_listeners(Root) and post_delete.has_listeners(Root.items.through)
+    assert not post_delete.has_listeners(BenchNode)
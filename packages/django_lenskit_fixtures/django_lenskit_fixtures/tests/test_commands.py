@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import json
+from io import StringIO
+
+import pytest
+from django.apps import apps as django_apps
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+
+
+def _make_graph():
+    Root = django_apps.get_model("fixtures_testapp", "Root")
+    Item = django_apps.get_model("fixtures_testapp", "Item")
+    r = Root.objects.create(name="R1")
+    Root.objects.create(name="R2")
+    for n in range(3):
+        Item.objects.create(root=r, label=f"i{n}")
+    return r
+
+
+@pytest.mark.django_db
+def test_export_fixture_writes_file_and_reports_stats(tmp_path) -> None:
+    r = _make_graph()
+    path = tmp_path / "out.json"
+    err = StringIO()
+    call_command(
+        "export_fixture",
+        "fixtures_testapp.Root",
+        "--pks",
+        str(r.pk),
+        "--reverse",
+        "--output",
+        str(path),
+        stderr=err,
+    )
+    parsed = json.loads(path.read_text())
+    assert len(parsed) == 4
+    assert "[fixtures_testapp.item] 3" in err.getvalue()
+    assert "Exported 4 objects" in err.getvalue()
+
+
+@pytest.mark.django_db
+def test_export_fixture_filter_to_stdout(capsysbinary) -> None:
+    _make_graph()
+    call_command(
+        "export_fixture", "fixtures_testapp.Root", "--filter", "name=R2", stderr=StringIO()
+    )
+    parsed = json.loads(capsysbinary.readouterr().out)
+    assert [o["fields"]["name"] for o in parsed] == ["R2"]
+
+    out = StringIO()
+    call_command(
+        "export_fixture",
+        "fixtures_testapp.Root",
+        "--filter",
+        "name=R2",
+        "--format",
+        "jsonl",
+        stdout=out,
+        stderr=StringIO(),
+    )
+    assert [json.loads(line)["fields"]["name"] for line in out.getvalue().splitlines()] == ["R2"]
+
+
+@pytest.mark.django_db
+def test_export_fixture_errors() -> None:
+    r = _make_graph()
+    with pytest.raises(CommandError, match="--pks, --filter or --all"):
+        call_command("export_fixture", "fixtures_testapp.Root")
+    with pytest.raises(CommandError, match="Unknown model"):
+        call_command("export_fixture", "nope.Missing", "--all")
+    with pytest.raises(CommandError, match="Invalid --filter 'nope=1'"):
+        call_command("export_fixture", "fixtures_testapp.Root", "--filter", "nope=1")
+    with pytest.raises(CommandError, match="Invalid --filter 'pk=x'"):
+        call_command("export_fixture", "fixtures_testapp.Root", "--filter", "pk=x")
+    with pytest.raises(CommandError, match="Invalid --filter 'name__nope=R1'"):
+        call_command("export_fixture", "fixtures_testapp.Root", "--filter", "name__nope=R1")
+    with pytest.raises(CommandError, match="exceeded"):
+        call_command(
+            "export_fixture",
+            "fixtures_testapp.Root",
+            "--pks",
+            str(r.pk),
+            "--reverse",
+            "--limit",
+            "1",
+        )
+    with pytest.raises(CommandError, match="--output"):
+        call_command("export_fixture", "fixtures_testapp.Root", "--all", "--format", "json.gz")
+    with override_settings(ADMIN_LENSKIT={"fixtures": {"enabled": False}}):
+        with pytest.raises(CommandError, match="disabled"):
+            call_command("export_fixture", "fixtures_testapp.Root", "--all")
+
+
+@pytest.mark.django_db
+def test_export_fixture_field_selection(capsysbinary) -> None:
+    r = _make_graph()
+    call_command(
+        "export_fixture",
+        "fixtures_testapp.Root",
+        "--pks",
+        str(r.pk),
+        "--reverse",
+        "--exclude-fields",
+        "fixtures_testapp.Item:label",
+        stderr=StringIO(),
+    )
+    parsed = json.loads(capsysbinary.readouterr().out)
+    items = [o for o in parsed if o["model"] == "fixtures_testapp.item"]
+    assert len(items) == 3 and all("label" not in o["fields"] for o in items)
+    with pytest.raises(CommandError, match="Unknown fields"):
+        call_command(
+            "export_fixture",
+            "fixtures_testapp.Root",
+            "--all",
+            "--fields",
+            "fixtures_testapp.Root:nope",
+            stderr=StringIO(),
+        )
+
+
+@pytest.mark.django_db
+def test_export_fixture_manifest_and_delta(tmp_path) -> None:
+    r = _make_graph()
+    path = tmp_path / "out.json"
+    args = ["export_fixture", "fixtures_testapp.Root", "--pks", str(r.pk), "--reverse"]
+    call_command(*args, "--output", str(path), "--manifest", stderr=StringIO())
+    manifest = json.loads((tmp_path / "out.json.manifest.json").read_text())
+    assert sum(len(v) for v in manifest["objects"].values()) == 4
+
+    item = r.items_fk.order_by("pk").first()
+    item.label = "changed"
+    item.save()
+    r.items_fk.order_by("pk").last().delete()
+    err = StringIO()
+    call_command(
+        *args,
+        "--output",
+        str(tmp_path / "delta.json"),
+        "--since",
+        str(tmp_path / "out.json.manifest.json"),
+        "--manifest",
+        str(tmp_path / "delta.manifest.json"),
+        stderr=err,
+    )
+    assert [o["pk"] for o in json.loads((tmp_path / "delta.json").read_text())] == [item.pk]
+    delta_manifest = json.loads((tmp_path / "delta.manifest.json").read_text())
+    assert len(delta_manifest["deleted"]["fixtures_testapp.item"]) == 1
+    assert "Delta: 1 new or changed of 3, 1 deleted" in err.getvalue()
+
+    with pytest.raises(CommandError):
+        call_command(*args, "--manifest", stderr=StringIO())
+    with pytest.raises(CommandError):
+        call_command(*args, "--since", str(path), stderr=StringIO())
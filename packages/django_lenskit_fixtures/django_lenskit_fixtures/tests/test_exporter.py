@@ -175,3 +175,673 @@ def test_default_object_limit_when_config_not_dict() -> None:
     with _ov(ADMIN_LENSKIT=None, DEBUG=True):
         data = export_queryset(Root.objects.filter(pk=r.pk), include_reverse=False, fmt="json")
         assert '"fixtures_testapp.root"' in data or "fixtures_testapp.root" in data
+
+
+@pytest.mark.django_db
+def test_build_closure_query_count_does_not_scale_with_objects() -> None:
+    Root = django_apps.get_model("fixtures_testapp", "Root")
+    Item = django_apps.get_model("fixtures_testapp", "Item")
+    RootProfile = django_apps.get_model("fixtures_testapp", "RootProfile")
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from django_lenskit_fixtures.exporter import build_closure
+
+    roots = [Root.objects.create(name=f"R{n}") for n in range(5)]
+    for r in roots:
+        items = [Item.objects.create(root=r, label=f"{r.name}-{n}") for n in range(10)]
+        r.items.add(*items)
+        RootProfile.objects.create(root=r, notes="p")
+
+    with CaptureQueriesContext(connection) as ctx:
+        result = build_closure(Root.objects.all(), include_reverse=True, object_limit=1000)
+    assert len(result) == 5 + 50 + 5
+    # Levels x relations, not objects: a per-object walk would issue hundreds of queries
+    assert len(ctx.captured_queries) <= 20
+
+
+@pytest.mark.django_db
+def test_build_closure_matches_per_object_bfs_order() -> None:
+    Root = django_apps.get_model("fixtures_testapp", "Root")
+    Item = django_apps.get_model("fixtures_testapp", "Item")
+    RootProfile = django_apps.get_model("fixtures_testapp", "RootProfile")
+    from collections import deque
+
+    from django_lenskit_fixtures import exporter as _exp
+
+    r1 = Root.objects.create(name="R1")
+    r2 = Root.objects.create(name="R2")
+    i1 = Item.objects.create(root=r1, label="i1")
+    i2 = Item.objects.create(root=r2, label="i2")
+    r1.items.add(i1, i2)
+    r2.items.add(i1)
+    RootProfile.objects.create(root=r2, notes="p")
+
+    queue = deque(Root.objects.order_by("name"))
+    seen: set = set()
+    expected = []
+    while queue:
+        obj = queue.popleft()
+        key = (obj._meta.label_lower, obj.pk)
+        if key in seen:
+            continue
+        seen.add(key)
+        expected.append(key)
+        queue.extend(_exp._iter_related_objects(obj, include_reverse=True))
+
+    result = _exp.build_closure(
+        Root.objects.order_by("name"), include_reverse=True, object_limit=100
+    )
+    assert [(o._meta.label_lower, o.pk) for o in result] == expected
+
+
+@pytest.mark.django_db
+def test_build_closure_loads_shared_fk_targets_once() -> None:
+    Root = django_apps.get_model("fixtures_testapp", "Root")
+    Item = django_apps.get_model("fixtures_testapp", "Item")
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from django_lenskit_fixtures.exporter import build_closure
+
+    r = Root.objects.create(name="R1")
+    for n in range(20):
+        Item.objects.create(root=r, label=f"i{n}")
+
+    with CaptureQueriesContext(connection) as ctx:
+        result = build_closure(Item.objects.all(), include_reverse=False, object_limit=100)
+    assert [o._meta.label_lower for o in result].count("fixtures_testapp.root") == 1
+    root_selects = [
+        q["sql"]
+        for q in ctx.captured_queries
+        if 'FROM "fixtures_testapp_root"' in q["sql"] and "INNER JOIN" not in q["sql"]
+    ]
+    assert len(root_selects) == 1
+
+
+@pytest.mark.django_db
+def test_build_closure_skips_fk_targets_already_collected() -> None:
+    Root = django_apps.get_model("fixtures_testapp", "Root")
+    RootProfile = django_apps.get_model("fixtures_testapp", "RootProfile")
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from django_lenskit_fixtures.exporter import build_closure
+
+    r = Root.objects.create(name="R1")
+    RootProfile.objects.create(root=r, notes="p")
+    profile = RootProfile.objects.get()
+
+    with CaptureQueriesContext(connection) as ctx:
+        result = build_closure([r, profile], include_reverse=False, object_limit=100)
+    assert len(result) == 2
+    # The profile's root is already part of the closure, so it is skipped by its raw id
+    assert not any('FROM "fixtures_testapp_root"' in q["sql"] for q in ctx.captured_queries)
+
+
+@pytest.mark.django_db
+def test_build_closure_resolves_m2m_edges_from_the_through_table() -> None:
+    Root = django_apps.get_model("fixtures_testapp", "Root")
+    Item = django_apps.get_model("fixtures_testapp", "Item")
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from django_lenskit_fixtures.exporter import build_closure
+
+    owner = Root.objects.create(name="owner")
+    items = [Item.objects.create(root=owner, label=f"i{n}") for n in range(6)]
+    roots = [Root.objects.create(name=f"R{n}") for n in range(10)]
+    for n, r in enumerate(roots):
+        r.items.add(*items[n % 3 : n % 3 + 3])
+
+    with CaptureQueriesContext(connection) as ctx:
+        result = build_closure(roots, include_reverse=False, object_limit=100)
+    assert len(result) == 10 + 5 + 1
+    through = [q["sql"] for q in ctx.captured_queries if "root_items" in q["sql"]]
+    # One query per level holding roots (the ten roots, then the items' owner), without a
+    # join with the item table
+    assert len(through) == 2 and not any("JOIN" in sql for sql in through)
+
+    # Targets that are already collected are skipped by pk and never loaded
+    with CaptureQueriesContext(connection) as ctx:
+        result = build_closure([*items, *roots], include_reverse=False, object_limit=100)
+    assert len(result) == 6 + 10 + 1
+    assert not any('FROM "fixtures_testapp_item"' in q["sql"] for q in ctx.captured_queries)
+
+
+@pytest.mark.django_db
+def test_serialization_skips_through_tables_of_projected_out_m2m_fields() -> None:
+    Root = django_apps.get_model("fixtures_testapp", "Root")
+    Item = django_apps.get_model("fixtures_testapp", "Item")
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from django_lenskit_fixtures.exporter import (
+        build_closure,
+        get_field_projection,
+        serialize_instances,
+    )
+
+    r = Root.objects.create(name="R1")
+    r.items.add(*[Item.objects.create(root=r, label=f"i{n}") for n in range(3)])
+    projection = get_field_projection({"fixtures_testapp.Root": {"exclude": ["items"]}})
+    closure = build_closure([r], include_reverse=False, object_limit=100, projection=projection)
+    with CaptureQueriesContext(connection) as ctx:
+        data = json.loads(serialize_instances(closure, fmt="json"))
+    assert len(data) == 4
+    assert "items" not in data[0]["fields"]
+    assert not any("root_items" in q["sql"] for q in ctx.captured_queries)
+
+
+@pytest.mark.django_db
+def test_generic_relations_are_followed_in_bulk() -> None:
+    Root = django_apps.get_model("fixtures_testapp", "Root")
+    Item = django_apps.get_model("fixtures_testapp", "Item")
+    Article = django_apps.get_model("fixtures_testapp", "Article")
+    Tag = django_apps.get_model("fixtures_testapp", "Tag")
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from django_lenskit_fixtures.exporter import build_closure, estimate_closure
+
+    r = Root.objects.create(name="R1")
+    items = [Item.objects.create(root=r, label=f"i{n}") for n in range(3)]
+    articles = [Article.objects.create(title=f"a{n}") for n in range(5)]
+    for n, article in enumerate(articles):
+        Tag.objects.create(content_object=article, label=f"article {n}")
+        Tag.objects.create(content_object=items[n % 3], label=f"item {n}")
+    Tag.objects.create(content_object=r, label="root")
+    dangling = Item.objects.create(root=r, label="gone")
+    Tag.objects.create(content_object=dangling, label="dangling")
+    dangling.delete()
+
+    # GenericRelation: one query for the tags of every article
+    qs = Article.objects.all()
+    with CaptureQueriesContext(connection) as ctx:
+        closure = build_closure(qs, include_reverse=True, object_limit=1000)
+    per_model = closure.per_model()
+    assert per_model["fixtures_testapp.article"] == 5
+    tag_selects = [q for q in ctx.captured_queries if 'FROM "fixtures_testapp_tag"' in q["sql"]]
+    assert per_model["fixtures_testapp.tag"] == 5 and len(tag_selects) == 1
+    estimate = estimate_closure(qs, include_reverse=True, object_limit=1000)
+    assert estimate.total == len(closure) and estimate.per_model == per_model
+
+    # GenericForeignKey: one query per target model, UUID and integer pks alike
+    with CaptureQueriesContext(connection) as ctx:
+        closure = build_closure(Tag.objects.all(), include_reverse=False, object_limit=1000)
+    assert {k: v for k, v in closure.per_model().items() if k != "contenttypes.contenttype"} == {
+        "fixtures_testapp.tag": 12,
+        "fixtures_testapp.article": 5,
+        "fixtures_testapp.item": 3,
+        "fixtures_testapp.root": 1,
+    }
+    for table in ("article", "item", "root"):
+        sql = [q for q in ctx.captured_queries if f'FROM "fixtures_testapp_{table}"' in q["sql"]]
+        assert len(sql) == 1, table
+
+    for mode in ("count", "walk"):
+        cfg = {"enabled": True, "excess_probe_mode": mode}
+        with override_settings(ADMIN_LENSKIT={"fixtures": cfg}):
+            with pytest.raises(TooManyObjects) as ei:
+                export_queryset(Tag.objects.all(), include_reverse=False, object_limit=2)
+        assert ei.value.collected == len(closure) and not ei.value.at_least
+
+    # Targets already collected are skipped by their content type and id
+    with CaptureQueriesContext(connection) as ctx:
+        build_closure([*articles, *Tag.objects.all()], include_reverse=False, object_limit=1000)
+    assert not any('FROM "fixtures_testapp_article"' in q["sql"] for q in ctx.captured_queries)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("fmt", ["json", "yaml"])
+def test_chunked_serialization_matches_single_serialize_call(fmt: str) -> None:
+    Root = django_apps.get_model("fixtures_testapp", "Root")
+    Item = django_apps.get_model("fixtures_testapp", "Item")
+    from django.core import serializers
+
+    from django_lenskit_fixtures.exporter import (
+        build_closure,
+        iter_serialized_instances,
+        serialize_instances,
+    )
+
+    r = Root.objects.create(name="R1")
+    items = [Item.objects.create(root=r, label=f"i{n}") for n in range(5)]
+    r.items.add(*items)
+    instances = build_closure(Root.objects.all(), include_reverse=True, object_limit=100)
+    expected = serializers.serialize(fmt, instances, use_natural_foreign_keys=False)
+
+    with override_settings(ADMIN_LENSKIT={"fixtures": {"enabled": True, "batch_size": 2}}):
+        chunks = list(iter_serialized_instances(instances, fmt=fmt))
+        assert len(chunks) > 2
+        assert "".join(chunks) == expected
+        assert serialize_instances(instances, fmt=fmt) == expected
+    assert serialize_instances([], fmt=fmt) == serializers.serialize(fmt, [])
+
+
+def test_relation_plan_is_cached_and_cleared_when_models_change() -> None:
+    Root = django_apps.get_model("fixtures_testapp", "Root")
+    from django.db import models
+    from django.test.utils import isolate_apps
+
+    from django_lenskit_fixtures.exporter import relation_plan
+
+    plan = relation_plan(Root, True)
+    assert relation_plan(Root, True) is plan
+    assert relation_plan(Root, False) is not plan
+    kinds = {edge.accessor: edge.kind for edge in plan.edges}
+    assert kinds == {
+        "items_fk": "reverse_fk",
+        "profile": "reverse_o2o",
+        "items": "m2m",
+    }
+    assert {edge.accessor for edge in relation_plan(Root, False).edges} == {"items"}
+
+    with isolate_apps("django_lenskit_fixtures.tests.testapp"):
+
+        class Extra(models.Model):
+            class Meta:
+                app_label = "fixtures_testapp"
+
+    assert relation_plan(Root, True) is not plan
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("mode", ["count", "walk"])
+def test_excess_probe_modes_report_full_closure_size(make_graph, mode: str) -> None:
+    qs = make_graph(items=5, m2m=5, profile=True).queryset
+    with override_settings(
+        ADMIN_LENSKIT={"fixtures": {"enabled": True, "excess_probe_mode": mode}}
+    ):
+        with pytest.raises(TooManyObjects) as ei:
+            export_queryset(qs, include_reverse=True, object_limit=2)
+    # Root + 5 items + profile
+    assert ei.value.collected == 7
+    assert not ei.value.at_least
+
+
+@pytest.mark.django_db
+def test_count_probe_never_loads_instances(make_graph) -> None:
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    make_graph(items=5, m2m=5, profile=True)
+    Item = django_apps.get_model("fixtures_testapp", "Item")
+    from django_lenskit_fixtures import exporter as _exp
+
+    item = Item.objects.first()
+    with CaptureQueriesContext(connection) as ctx:
+        extra, truncated = _exp._probe_excess_counts(
+            _exp.deque([(item, 0)]), include_reverse=True, seen=set(), probe_limit=100
+        )
+    # The item itself, its root, the four sibling items and the profile
+    assert (extra, truncated) == (7, False)
+    # Only pk columns are selected by the probe
+    assert ctx.captured_queries
+    assert not any('"label"' in q["sql"] or '"notes"' in q["sql"] for q in ctx.captured_queries)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("probe", ["_probe_excess", "_probe_excess_counts"])
+def test_probes_count_unvisited_queue_objects(make_graph, probe: str) -> None:
+    from django_lenskit_fixtures import exporter as _exp
+
+    qs = make_graph(items=5, m2m=5, profile=True).queryset
+    r = qs.get()
+    Item = django_apps.get_model("fixtures_testapp", "Item")
+    queued = [(item, 1) for item in Item.objects.order_by("pk")] + [(r.profile, 1)]
+    extra, truncated = getattr(_exp, probe)(
+        _exp.deque(queued),
+        include_reverse=True,
+        seen={("fixtures_testapp.root", r.pk)},
+        probe_limit=100,
+    )
+    # Nothing lies beyond the queue; its five items and the profile count themselves
+    assert (extra, truncated) == (6, False)
+
+
+@pytest.mark.django_db
+def test_count_probe_stops_at_query_budget(make_graph) -> None:
+    qs = make_graph(items=5, m2m=5, profile=True).queryset
+    with override_settings(
+        ADMIN_LENSKIT={"fixtures": {"enabled": True, "excess_probe_queries": 0}}
+    ):
+        with pytest.raises(TooManyObjects) as ei:
+            export_queryset(qs, include_reverse=True, object_limit=1)
+    assert ei.value.at_least
+    assert "at least" in str(ei.value)
+
+
+@pytest.mark.django_db
+def test_estimate_closure_matches_export_without_loading_rows(make_graph) -> None:
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from django_lenskit_fixtures.exporter import build_closure, estimate_closure
+
+    qs = make_graph(items=5, m2m=5, profile=True).queryset
+    with CaptureQueriesContext(connection) as ctx:
+        estimate = estimate_closure(qs, include_reverse=True, object_limit=100)
+    assert not any('"name"' in q["sql"] or '"label"' in q["sql"] for q in ctx.captured_queries)
+    closure = build_closure(qs, include_reverse=True, object_limit=100)
+    assert estimate.total == len(closure) and not estimate.at_least
+    assert estimate.per_model == {
+        "fixtures_testapp.item": 5,
+        "fixtures_testapp.root": 1,
+        "fixtures_testapp.rootprofile": 1,
+    }
+
+    # The walk stops once the cap plus probe headroom is reached
+    with override_settings(ADMIN_LENSKIT={"fixtures": {"enabled": True, "excess_probe_limit": 2}}):
+        capped = estimate_closure(qs, include_reverse=True, object_limit=1)
+    assert (capped.total, capped.at_least) == (3, True)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("compression,module", [("gz", "gzip"), ("bz2", "bz2"), ("xz", "lzma")])
+def test_compressed_formats_round_trip(make_graph, compression: str, module: str) -> None:
+    import importlib
+
+    from django_lenskit_fixtures.exporter import (
+        build_closure,
+        iter_fixture_bytes,
+        serialize_instances,
+    )
+
+    qs = make_graph(items=5, m2m=5, profile=True).queryset
+    fmt = f"json.{compression}"
+    with override_settings(ADMIN_LENSKIT={"fixtures": {"enabled": True, "batch_size": 2}}):
+        data = export_queryset(qs, include_reverse=True, object_limit=100, fmt=fmt)
+        instances = build_closure(qs, include_reverse=True, object_limit=100)
+        chunks = list(iter_fixture_bytes(instances, fmt=fmt))
+    assert isinstance(data, bytes)
+    assert b"".join(chunks) == data
+    text = importlib.import_module(module).decompress(data).decode("utf-8")
+    assert text == serialize_instances(instances, fmt="json")
+
+
+@pytest.mark.django_db
+def test_gzip_fixture_is_loadable_with_loaddata(make_graph, tmp_path) -> None:
+    from django.core.management import call_command
+
+    Root = django_apps.get_model("fixtures_testapp", "Root")
+    Item = django_apps.get_model("fixtures_testapp", "Item")
+    qs = make_graph(items=5, m2m=5, profile=True).queryset
+    data = export_queryset(qs, include_reverse=True, object_limit=100, fmt="json.gz")
+    path = tmp_path / "snapshot.json.gz"
+    path.write_bytes(data)
+    Root.objects.all().delete()
+    assert not Item.objects.exists()
+    call_command("loaddata", str(path), verbosity=0)
+    assert Item.objects.count() == 5
+    assert Root.objects.get().items.count() == 5
+
+
+def test_split_format_rejects_unknown_compression() -> None:
+    from django_lenskit_fixtures.exporter import split_format
+
+    assert split_format("json") == ("json", None)
+    assert split_format("yaml.xz") == ("yaml", "xz")
+    with pytest.raises(ValueError):
+        split_format("json.zip")
+
+
+def test_pk_set_uses_bitmap_for_dense_ints_and_falls_back_otherwise() -> None:
+    from django_lenskit_fixtures.exporter import _PkSet
+
+    pks = _PkSet()
+    for pk in range(1, 1001):
+        pks.add(pk)
+    pks.add(10**15)
+    pks.add("a")
+    pks.add(-1)
+    pks.add(5)
+    assert len(pks) == 1003
+    assert 1 in pks and 1000 in pks and 10**15 in pks and "a" in pks and -1 in pks
+    assert 0 not in pks and 1001 not in pks and True not in pks
+    # Dense ids live in the bitmap, the sparse id does not inflate it
+    assert len(pks._bits) < 200
+    assert pks._other == {10**15, "a", -1}
+
+
+@pytest.mark.django_db
+def test_closure_keeps_keys_and_refetches_instances_in_chunks() -> None:
+    Root = django_apps.get_model("fixtures_testapp", "Root")
+    Item = django_apps.get_model("fixtures_testapp", "Item")
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from django_lenskit_fixtures.exporter import Closure, build_closure
+
+    r = Root.objects.create(name="R1")
+    items = [Item.objects.create(root=r, label=f"I{i}") for i in range(5)]
+    r.items.add(*items[:2])
+
+    closure = build_closure([r], include_reverse=True, object_limit=100)
+    assert isinstance(closure, Closure)
+    assert len(closure) == 6
+    assert closure.per_model() == {"fixtures_testapp.root": 1, "fixtures_testapp.item": 5}
+    keys = list(closure.keys())
+    assert keys[0] == (Root, r.pk)
+
+    with override_settings(ADMIN_LENSKIT={"fixtures": {"batch_size": 4}}):
+        with CaptureQueriesContext(connection) as ctx:
+            objs = list(closure)
+    assert [(type(o), o.pk) for o in objs] == keys
+    assert objs[0] is not r
+    # Two chunks: each loads its rows per model, plus Root.items for the serializer
+    assert len(ctx.captured_queries) == 4
+    assert {o.pk for o in objs[0]._prefetched_objects_cache["items"]} == {
+        items[0].pk,
+        items[1].pk,
+    }
+
+
+@pytest.mark.django_db
+def test_dependency_order_puts_fk_targets_first() -> None:
+    Root = django_apps.get_model("fixtures_testapp", "Root")
+    Item = django_apps.get_model("fixtures_testapp", "Item")
+    RootProfile = django_apps.get_model("fixtures_testapp", "RootProfile")
+    r = Root.objects.create(name="R1")
+    i1 = Item.objects.create(root=r, label="I1")
+    i2 = Item.objects.create(root=r, label="I2")
+    RootProfile.objects.create(root=r, notes="p")
+
+    qs = Item.objects.filter(pk__in=[i2.pk, i1.pk]).order_by("-pk")
+    bfs = json.loads(export_queryset(qs, include_reverse=True, object_limit=100))
+    ordered = json.loads(
+        export_queryset(qs, include_reverse=True, object_limit=100, dependency_order=True)
+    )
+    assert bfs[0]["model"] == "fixtures_testapp.item"
+    assert [o["model"] for o in ordered] == [
+        "fixtures_testapp.root",
+        "fixtures_testapp.item",
+        "fixtures_testapp.item",
+        "fixtures_testapp.rootprofile",
+    ]
+    # Within a model the visiting order is kept
+    assert [o["pk"] for o in ordered[1:3]] == [i2.pk, i1.pk]
+    assert sorted(map(json.dumps, bfs)) == sorted(map(json.dumps, ordered))
+
+
+@pytest.mark.django_db
+def test_dependency_order_places_self_referencing_parents_first() -> None:
+    Category = django_apps.get_model("fixtures_testapp", "Category")
+    top = Category.objects.create(name="top")
+    mid = Category.objects.create(name="mid", parent=top)
+    leaf = Category.objects.create(name="leaf", parent=mid)
+    # In a two-row cycle the link that closes the cycle is ignored
+    a = Category.objects.create(name="a")
+    b = Category.objects.create(name="b", parent=a)
+    Category.objects.filter(pk=a.pk).update(parent=b)
+
+    from django_lenskit_fixtures.exporter import build_closure
+
+    closure = build_closure(
+        Category.objects.filter(pk__in=[leaf.pk, b.pk]).order_by("-name"),
+        include_reverse=False,
+        object_limit=100,
+    )
+    assert [pk for _m, pk in closure.keys()] == [leaf.pk, b.pk, mid.pk, a.pk, top.pk]
+    ordered = [pk for _m, pk in closure.by_dependency().keys()]
+    assert ordered == [top.pk, mid.pk, leaf.pk, a.pk, b.pk]
+
+
+@pytest.mark.django_db
+def test_field_projection_defers_and_omits_excluded_fields() -> None:
+    Root = django_apps.get_model("fixtures_testapp", "Root")
+    Item = django_apps.get_model("fixtures_testapp", "Item")
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    r = Root.objects.create(name="R1")
+    Item.objects.create(root=r, label="I1")
+
+    cfg = {"enabled": True, "field_projection": {"fixtures_testapp.Root": {"exclude": ["name"]}}}
+    with override_settings(ADMIN_LENSKIT={"fixtures": cfg}):
+        with CaptureQueriesContext(connection) as ctx:
+            data = export_queryset(
+                Item.objects.all(),
+                include_reverse=False,
+                object_limit=100,
+                # Per-export entries replace the configured entry for that model
+                field_projection={"fixtures_testapp.item": {"include": ["root"]}},
+            )
+    parsed = {o["model"]: o for o in json.loads(data)}
+    assert parsed["fixtures_testapp.root"]["fields"] == {"items": []}
+    assert parsed["fixtures_testapp.item"]["fields"] == {"root": str(r.pk)}
+    sql = " ".join(q["sql"] for q in ctx.captured_queries)
+    assert '"name"' not in sql and '"label"' not in sql
+
+
+def test_field_projection_rejects_unknown_fields() -> None:
+    Root = django_apps.get_model("fixtures_testapp", "Root")
+    from django_lenskit_fixtures.exporter import FieldProjection
+
+    projection = FieldProjection({"fixtures_testapp.root": {"exclude": ["nope"]}})
+    with pytest.raises(ValueError, match="nope"):
+        projection.serialized_fields(Root)
+
+
+@pytest.mark.django_db
+def test_traversal_policy_prunes_relations_without_querying_them(make_graph) -> None:
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from django_lenskit_fixtures.exporter import TraversalPolicy, build_closure
+
+    qs = make_graph(items=5, m2m=5, profile=True).queryset
+
+    def labels(policy: TraversalPolicy) -> list[str]:
+        closure = build_closure(qs, include_reverse=True, object_limit=100, policy=policy)
+        return sorted(label for label in closure.per_model())
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert labels(TraversalPolicy(deny=["fixtures_testapp.root.items_fk"])) == [
+            "fixtures_testapp.item",
+            "fixtures_testapp.root",
+            "fixtures_testapp.rootprofile",
+        ]
+    assert not any('"fixtures_testapp_item"."root_id" IN' in q["sql"] for q in ctx.captured_queries)
+
+    assert labels(TraversalPolicy(max_depth=0)) == ["fixtures_testapp.root"]
+    assert labels(TraversalPolicy(stop_at=["fixtures_testapp.Root"])) == ["fixtures_testapp.root"]
+    assert labels(TraversalPolicy(allow=["fixtures_testapp.root.profile"])) == [
+        "fixtures_testapp.root",
+        "fixtures_testapp.rootprofile",
+    ]
+    # Items are reached through Root.items at depth 0, but not followed any further
+    closure = build_closure(
+        qs,
+        include_reverse=True,
+        object_limit=100,
+        policy=TraversalPolicy(relation_max_depth={"fixtures_testapp.item.root": 0}),
+    )
+    assert len(closure) == 7
+
+
+@pytest.mark.django_db
+def test_traversal_policy_applies_to_probe_and_estimate(make_graph) -> None:
+    from django_lenskit_fixtures.exporter import estimate_closure
+
+    qs = make_graph(items=5, m2m=5, profile=True).queryset
+    policy = {"deny": ["fixtures_testapp.root.items", "fixtures_testapp.root.items_fk"]}
+    with pytest.raises(TooManyObjects) as ei:
+        export_queryset(qs, include_reverse=True, object_limit=1, traversal_policy=policy)
+    assert (ei.value.collected, ei.value.at_least) == (2, False)
+    estimate = estimate_closure(qs, include_reverse=True, traversal_policy=policy)
+    assert estimate.per_model == {"fixtures_testapp.root": 1, "fixtures_testapp.rootprofile": 1}
+
+
+def test_traversal_policy_rejects_unknown_names() -> None:
+    from django_lenskit_fixtures.exporter import get_traversal_policy
+
+    with pytest.raises(ValueError, match="Unknown relation"):
+        get_traversal_policy({"deny": ["fixtures_testapp.root.nope"]})
+    with pytest.raises(ValueError, match="Unknown model"):
+        get_traversal_policy({"stop_at": ["fixtures_testapp.Nope"]})
+    with override_settings(
+        ADMIN_LENSKIT={"fixtures": {"traversal_policy": {"deny": ["fixtures_testapp.item.root"]}}}
+    ):
+        policy = get_traversal_policy({"deny": ["fixtures_testapp.root.items"], "max_depth": 2})
+    assert policy.deny == {"fixtures_testapp.item.root", "fixtures_testapp.root.items"}
+    assert policy.max_depth == 2
+
+
+@pytest.mark.django_db(databases=["default", "replica"])
+def test_exports_read_from_the_configured_database() -> None:
+    Root = django_apps.get_model("fixtures_testapp", "Root")
+    Item = django_apps.get_model("fixtures_testapp", "Item")
+    from django_lenskit_fixtures.exporter import estimate_closure, stream_export_queryset
+
+    r = Root.objects.using("replica").create(name="on-replica")
+    Item.objects.using("replica").create(root=r, label="I1")
+    Item.objects.using("replica").create(root=r, label="I2")
+    r.items.add(*Item.objects.using("replica").all())
+
+    qs = Root.objects.filter(pk=r.pk)
+    assert json.loads(export_queryset(qs, include_reverse=True, object_limit=100)) == []
+
+    cfg = {"enabled": True, "database": "replica", "excess_probe_limit": 1000}
+    with override_settings(ADMIN_LENSKIT={"fixtures": cfg}):
+        data = json.loads(export_queryset(qs, include_reverse=True, object_limit=100))
+        assert estimate_closure(qs, include_reverse=True).total == 3
+        with pytest.raises(TooManyObjects) as ei:
+            export_queryset(qs, include_reverse=True, object_limit=1)
+    assert len(data) == 3
+    assert ei.value.collected == 3
+
+    streamed = b"".join(
+        stream_export_queryset(qs, include_reverse=True, object_limit=100, using="replica")
+    )
+    assert json.loads(streamed) == data
+
+
+@pytest.mark.django_db(transaction=True)
+def test_stream_export_holds_a_snapshot_until_the_stream_ends(make_graph) -> None:
+    from django.db import connection
+
+    from django_lenskit_fixtures.exporter import stream_export_queryset
+
+    qs = make_graph(items=5, m2m=5, profile=True).queryset
+    chunks = stream_export_queryset(qs, include_reverse=True, object_limit=100)
+    # The closure and the re-fetch read the same snapshot
+    assert connection.in_atomic_block
+    first = next(chunks)
+    assert connection.in_atomic_block
+    assert json.loads(first + b"".join(chunks))
+    assert not connection.in_atomic_block
+
+    chunks = stream_export_queryset(qs, include_reverse=True, object_limit=100)
+    next(chunks)
+    chunks.close()
+    assert not connection.in_atomic_block
+
+    chunks = stream_export_queryset(qs, include_reverse=True, object_limit=100)
+    chunks.close()
+    assert not connection.in_atomic_block
+
+    with override_settings(ADMIN_LENSKIT={"fixtures": {"enabled": True, "snapshot": False}}):
+        chunks = stream_export_queryset(qs, include_reverse=True, object_limit=100)
+        assert not connection.in_atomic_block
+        chunks.close()
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import datetime
+import decimal
+import json
+
+import pytest
+from django.apps import apps as django_apps
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from django_lenskit_fixtures import fastjson
+from django_lenskit_fixtures.exporter import build_closure, export_queryset, serialize_instances
+
+
+@pytest.fixture
+def measurements(make_graph):
+    # Three roots with items and a Measurement each (non-ASCII text, decimals, JSON)
+    Measurement = django_apps.get_model("fixtures_testapp", "Measurement")
+    graph = make_graph(roots=3, m2m=2, name="Røot {n}", label="I{n}-{m}")
+    for n, r in enumerate(graph.roots):
+        Measurement.objects.create(
+            root=r,
+            taken_at=datetime.datetime(
+                2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc
+            ),
+            day=datetime.date(2024, 5, 1) if n else None,
+            value=decimal.Decimal("12.500"),
+            payload={"n": n, "tags": ["a", "ß"]},
+        )
+    return Measurement.objects.all()
+
+
+def _export(qs, fmt, serializer):
+    cfg = {"enabled": True, "batch_size": 4, "serializer": serializer}
+    with override_settings(ADMIN_LENSKIT={"fixtures": cfg}):
+        return export_queryset(qs, include_reverse=True, object_limit=100, fmt=fmt)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("fmt", ["json", "jsonl"])
+def test_lenskit_serializer_matches_django_serializer(measurements, fmt, mocker) -> None:
+    qs = measurements
+    expected = _export(qs, fmt, "django")
+    # With the stdlib encoder the text is identical; orjson only changes separators
+    mocker.patch.object(fastjson, "orjson", None)
+    assert _export(qs, fmt, "lenskit") == expected
+    mocker.stopall()
+    if fastjson.orjson is not None:
+        fast = _export(qs, fmt, "lenskit")
+        if fmt == "json":
+            assert json.loads(fast) == json.loads(expected)
+        else:
+            assert [json.loads(line) for line in fast.splitlines()] == [
+                json.loads(line) for line in expected.splitlines()
+            ]
+
+
+@pytest.mark.django_db
+def test_lenskit_serializer_queries_per_model_not_per_object(measurements) -> None:
+    qs = measurements
+    with override_settings(ADMIN_LENSKIT={"fixtures": {"enabled": True, "serializer": "lenskit"}}):
+        closure = build_closure(qs, include_reverse=True, object_limit=100)
+        with CaptureQueriesContext(connection) as ctx:
+            serialize_instances(closure, fmt="json")
+    # One values_list() per model (measurement, root, item) plus the Root.items through table
+    assert len(ctx.captured_queries) == 4
+
+
+@pytest.mark.django_db
+def test_lenskit_serializer_output_loads_with_loaddata(measurements, tmp_path) -> None:
+    Root = django_apps.get_model("fixtures_testapp", "Root")
+    Measurement = django_apps.get_model("fixtures_testapp", "Measurement")
+    qs = measurements
+    path = tmp_path / "fast.json"
+    path.write_text(_export(qs, "json", "lenskit"), encoding="utf-8")
+    Root.objects.all().delete()
+    assert not Measurement.objects.exists()
+    call_command("loaddata", str(path), verbosity=0)
+    assert Root.objects.count() == 3
+    assert sum(r.items.count() for r in Root.objects.all()) == 6
+    m = Measurement.objects.get(day__isnull=True)
+    assert m.value == decimal.Decimal("12.500") and m.payload["tags"] == ["a", "ß"]
+    assert timezone.is_aware(m.taken_at)
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import datetime
+import decimal
+import io
+import json
+
+import pytest
+from django.apps import apps as django_apps
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from django_lenskit_fixtures.exporter import export_queryset
+from django_lenskit_fixtures.manifest import Manifest
+from django_lenskit_fixtures.stats import ExportStats
+
+
+def _export(qs, **kwargs):
+    with override_settings(ADMIN_LENSKIT={"fixtures": {"enabled": True}}):
+        return json.loads(export_queryset(qs, include_reverse=True, object_limit=100, **kwargs))
+
+
+@pytest.mark.django_db
+def test_delta_export_writes_changed_objects_and_lists_deletions(make_graph) -> None:
+    Item = django_apps.get_model("fixtures_testapp", "Item")
+    graph = make_graph(items=4, m2m=1)
+    r, items = graph.root, graph.items
+    qs = type(r).objects.filter(pk=r.pk)
+    first = Manifest()
+    full = _export(qs, manifest=first)
+    assert len(full) == len(first) == 5
+    assert set(first.objects) == {"fixtures_testapp.root", "fixtures_testapp.item"}
+    assert first.deleted == {}
+
+    # Nothing changed: an empty fixture
+    unchanged = Manifest()
+    assert _export(qs, manifest=unchanged, since=first) == []
+    assert unchanged.objects == first.objects and unchanged.deleted == {}
+
+    items[1].label = "changed"
+    items[1].save()
+    added = Item.objects.create(root=r, label="new")
+    deleted_pk = items[2].pk
+    items[2].delete()
+    # An M2M change is a change of the object holding the field
+    r.items.add(items[3])
+
+    second = Manifest()
+    stats = ExportStats()
+    delta = _export(qs, manifest=second, since=first, stats=stats)
+    assert {(o["model"], o["pk"]) for o in delta} == {
+        ("fixtures_testapp.root", str(r.pk)),
+        ("fixtures_testapp.item", items[1].pk),
+        ("fixtures_testapp.item", added.pk),
+    }
+    assert second.deleted == {"fixtures_testapp.item": [str(deleted_pk)]}
+    assert len(second) == 5
+    assert stats.objects == 3 and "manifest" in stats.phases
+
+
+@pytest.mark.django_db
+def test_version_fields_are_compared_without_loading_rows() -> None:
+    Root = django_apps.get_model("fixtures_testapp", "Root")
+    Measurement = django_apps.get_model("fixtures_testapp", "Measurement")
+    r = Root.objects.create(name="R1")
+    taken_at = datetime.datetime(2024, 5, 1, 12, 0, tzinfo=datetime.timezone.utc)
+    m = Measurement.objects.create(root=r, taken_at=taken_at, value=decimal.Decimal("1.5"))
+    qs = Measurement.objects.all()
+    cfg = {
+        "enabled": True,
+        "manifest_version_fields": {"fixtures_testapp.Measurement": "taken_at"},
+    }
+    first = Manifest()
+    with override_settings(ADMIN_LENSKIT={"fixtures": cfg}):
+        with CaptureQueriesContext(connection) as ctx:
+            export_queryset(qs, include_reverse=False, object_limit=10, manifest=first)
+        assert first.version("fixtures_testapp.measurement", m.pk).startswith("taken_at:")
+        versions = [q["sql"] for q in ctx.captured_queries if '"taken_at"' in q["sql"]]
+        assert any('"value"' not in sql for sql in versions)
+
+        # Only the version field counts
+        Measurement.objects.filter(pk=m.pk).update(value=decimal.Decimal("2.5"))
+        delta = json.loads(export_queryset(qs, include_reverse=False, object_limit=10, since=first))
+        assert delta == []
+        Measurement.objects.filter(pk=m.pk).update(taken_at=taken_at + datetime.timedelta(1))
+        delta = json.loads(export_queryset(qs, include_reverse=False, object_limit=10, since=first))
+        assert [o["pk"] for o in delta] == [m.pk]
+
+    cfg["manifest_version_fields"] = {"fixtures_testapp.Measurement": "missing"}
+    with override_settings(ADMIN_LENSKIT={"fixtures": cfg}):
+        with pytest.raises(ValueError, match="missing"):
+            export_queryset(qs, include_reverse=False, object_limit=10, manifest=Manifest())
+
+
+def test_manifest_round_trips_and_rejects_other_files() -> None:
+    manifest = Manifest({"app.model": {"1": "abc"}}, {"app.model": ["2"]})
+    buf = io.StringIO()
+    manifest.dump(buf)
+    buf.seek(0)
+    loaded = Manifest.load(buf)
+    assert loaded.as_dict() == manifest.as_dict()
+    assert loaded.version("app.model", 1) == "abc"
+    with pytest.raises(ValueError):
+        Manifest.load(io.StringIO("[]"))
+    with pytest.raises(ValueError):
+        Manifest.load(io.StringIO("not json"))
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import pickle
+from concurrent.futures import Future
+
+import pytest
+from django.apps import apps as django_apps
+from django.test import override_settings
+
+from django_lenskit_fixtures import parallel
+from django_lenskit_fixtures.exporter import export_queryset
+
+
+class _InlineExecutor:
+    def __init__(self) -> None:
+        self.calls = []
+
+    def submit(self, fn, *args, **kwargs):
+        # Arguments cross a process boundary in production; make sure they pickle
+        args, kwargs = pickle.loads(pickle.dumps((args, kwargs)))
+        self.calls.append(args)
+        future: Future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+@pytest.fixture
+def inline_pool(mocker):
+    executor = _InlineExecutor()
+    mocker.patch.object(parallel, "_get_serializer_pool", return_value=executor)
+    return executor
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("fmt", ["json", "jsonl", "yaml"])
+@pytest.mark.parametrize("projection", [None, {"fixtures_testapp.item": {"exclude": ["label"]}}])
+def test_parallel_serialization_is_byte_identical(make_graph, inline_pool, fmt, projection) -> None:
+    Root = django_apps.get_model("fixtures_testapp", "Root")
+    make_graph(roots=4, m2m=2, label="I{n}-{m}")
+    cfg = {"enabled": True, "batch_size": 3}
+
+    def export() -> str:
+        return export_queryset(
+            Root.objects.all(),
+            include_reverse=True,
+            object_limit=100,
+            fmt=fmt,
+            field_projection=projection,
+        )
+
+    with override_settings(ADMIN_LENSKIT={"fixtures": cfg}):
+        serial = export()
+    assert not inline_pool.calls
+    with override_settings(ADMIN_LENSKIT={"fixtures": {**cfg, "serialize_workers": 2}}):
+        assert export() == serial
+    # 16 objects in chunks of 3, each labelled by model for the worker
+    assert len(inline_pool.calls) == 6
+    assert inline_pool.calls[0][1][0][0] == "fixtures_testapp.Root"
+
+
+@pytest.mark.django_db
+def test_small_closures_are_serialized_in_process(make_graph, inline_pool) -> None:
+    Root = django_apps.get_model("fixtures_testapp", "Root")
+    make_graph(roots=4, m2m=2, label="I{n}-{m}")
+    cfg = {"enabled": True, "serialize_workers": 4}
+    with override_settings(ADMIN_LENSKIT={"fixtures": cfg}):
+        export_queryset(Root.objects.all(), include_reverse=True, object_limit=100)
+    assert not inline_pool.calls
+
+
+def test_serializer_pool_follows_the_worker_count(mocker) -> None:
+    executor = mocker.patch.object(parallel, "ProcessPoolExecutor")
+    executor.side_effect = lambda **kwargs: mocker.Mock(max_workers=kwargs["max_workers"])
+    mocker.patch.object(parallel, "_pool", None)
+    first = parallel._get_serializer_pool(2)
+    assert parallel._get_serializer_pool(2) is first
+    second = parallel._get_serializer_pool(4)
+    assert second.max_workers == 4
+    first.shutdown.assert_called_once_with(wait=False)
+    # What runs at interpreter exit
+    parallel._shutdown_serializer_pool()
+    second.shutdown.assert_called_once_with(wait=True, cancel_futures=True)
+    assert parallel._pool is None
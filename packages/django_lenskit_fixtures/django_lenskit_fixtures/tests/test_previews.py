@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+from django.apps import apps as django_apps
+from django.contrib.auth.models import User
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from django_lenskit_fixtures import exporter
+
+
+@pytest.fixture
+def preview_settings(tmp_path):
+    cfg = {"enabled": True, "job_dir": str(tmp_path), "preview_page_objects": 2}
+    with override_settings(ADMIN_LENSKIT={"fixtures": cfg}):
+        yield cfg
+
+
+def _post_preview(client: Client, roots):
+    pks = ",".join(str(r.pk) for r in roots)
+    url = (
+        reverse("django_lenskit_fixtures:export_config") + f"?model=fixtures_testapp.root&pks={pks}"
+    )
+    resp = client.post(url, {"fmt": "json", "object_limit": 100})
+    assert resp.status_code == 200
+    return resp
+
+
+@pytest.mark.django_db
+def test_preview_shows_first_page_and_serves_later_pages_without_traversing(
+    preview_settings, mocker
+) -> None:
+    Root = django_apps.get_model("fixtures_testapp", "Root")
+    roots = [Root.objects.create(name=f"R{n}") for n in range(5)]
+    client = Client()
+    client.force_login(User.objects.create_user(username="p1", password="p", is_staff=True))
+
+    resp = _post_preview(client, roots)
+    context = resp.context
+    preview = context["preview"]
+    assert (preview["page"], preview["pages"], preview["objects"]) == (0, 3, 5)
+    first = json.loads(context["data"])
+    assert len(first) == 2
+    assert b"<td>fixtures_testapp.root</td><td>5</td>" in resp.content
+
+    # Later pages come from the saved closure
+    mocker.patch.object(exporter, "build_closure", side_effect=AssertionError("traversed"))
+    url = reverse("django_lenskit_fixtures:preview_page", args=[preview["id"]])
+    pages = [client.get(url, {"page": n}).json() for n in range(3)]
+    assert pages[0]["text"] == context["data"]
+    names = [o["fields"]["name"] for p in pages for o in json.loads(p["text"])]
+    assert sorted(names) == [f"R{n}" for n in range(5)]
+    # Out-of-range pages are clamped
+    assert client.get(url, {"page": 99}).json()["page"] == 2
+
+    other = Client()
+    other.force_login(User.objects.create_user(username="p2", password="p", is_staff=True))
+    assert other.get(url).status_code == 404
+    assert (
+        client.get(reverse("django_lenskit_fixtures:preview_page", args=["nope"])).status_code
+        == 404
+    )
+
+
+@pytest.mark.django_db
+def test_preview_text_is_bounded(preview_settings) -> None:
+    Root = django_apps.get_model("fixtures_testapp", "Root")
+    roots = [Root.objects.create(name="x" * 200) for _ in range(2)]
+    client = Client()
+    client.force_login(User.objects.create_user(username="p3", password="p", is_staff=True))
+    with override_settings(
+        ADMIN_LENSKIT={"fixtures": {**preview_settings, "preview_max_chars": 100}}
+    ):
+        context = _post_preview(client, roots).context
+    assert len(context["data"]) == 100
+    assert context["preview"]["truncated"]
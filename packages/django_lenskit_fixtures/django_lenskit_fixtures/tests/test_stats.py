@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import logging
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from django_lenskit_fixtures.exporter import (
+    TooManyObjects,
+    export_queryset,
+    stream_export_queryset,
+)
+from django_lenskit_fixtures.signals import export_finished
+from django_lenskit_fixtures.stats import ExportStats
+
+
+@pytest.fixture
+def received():
+    calls = []
+
+    def receiver(sender, stats, **kwargs):
+        calls.append((sender, stats))
+
+    export_finished.connect(receiver)
+    yield calls
+    export_finished.disconnect(receiver)
+
+
+@pytest.mark.django_db
+def test_export_stats_count_queries_phases_and_levels(make_graph, received, caplog) -> None:
+    qs = make_graph(items=5, m2m=5, profile=True).queryset
+    stats = ExportStats()
+    with override_settings(ADMIN_LENSKIT={"fixtures": {"enabled": True}}):
+        with CaptureQueriesContext(connection) as ctx, caplog.at_level(logging.INFO):
+            data = export_queryset(
+                qs, include_reverse=True, object_limit=100, dependency_order=True, stats=stats
+            )
+    assert stats.objects == 7
+    assert stats.per_model == {
+        "fixtures_testapp.item": 5,
+        "fixtures_testapp.root": 1,
+        "fixtures_testapp.rootprofile": 1,
+    }
+    # The root, then its items and profile
+    assert stats.per_level == [1, 6]
+    assert set(stats.phases) == {"traversal", "ordering", "serialization"}
+    assert stats.queries == len(ctx.captured_queries)
+    assert stats.phases["traversal"].queries > 0 and stats.phases["serialization"].queries > 0
+    assert stats.bytes == len(data.encode("utf-8"))
+    assert not stats.cached and stats.error is None
+
+    assert received == [(qs.model, stats)]
+    (record,) = [r for r in caplog.records if r.name == "django_lenskit_fixtures"]
+    assert record.stats["queries"] == stats.queries
+    assert "7 objects" in record.getMessage()
+
+
+@pytest.mark.django_db
+def test_export_stats_report_probe_cost_on_too_many_objects(make_graph, received) -> None:
+    qs = make_graph(items=5, m2m=5, profile=True).queryset
+    stats = ExportStats()
+    with override_settings(ADMIN_LENSKIT={"fixtures": {"enabled": True}}):
+        with pytest.raises(TooManyObjects) as ei:
+            export_queryset(qs, include_reverse=True, object_limit=2, stats=stats)
+    assert stats.error == str(ei.value)
+    assert stats.phases["probe"].queries > 0
+    assert "serialization" not in stats.phases
+    assert received == [(qs.model, stats)]
+
+
+@pytest.mark.django_db
+def test_stream_stats_are_reported_when_the_stream_ends(make_graph, received) -> None:
+    qs = make_graph(items=5, m2m=5, profile=True).queryset
+    stats = ExportStats()
+    with override_settings(ADMIN_LENSKIT={"fixtures": {"enabled": True}}):
+        chunks = stream_export_queryset(qs, include_reverse=True, object_limit=100, stats=stats)
+        assert received == []
+        data = b"".join(chunks)
+    assert received == [(qs.model, stats)]
+    assert stats.bytes == len(data)
+    assert stats.objects == 7 and stats.phases["serialization"].queries > 0
+
+
+@pytest.mark.django_db
+def test_cached_exports_are_marked(make_graph, received) -> None:
+    qs = make_graph(items=5, m2m=5, profile=True).queryset
+    cfg = {"enabled": True, "cache_alias": "default"}
+    cache.clear()
+    with override_settings(ADMIN_LENSKIT={"fixtures": cfg}):
+        export_queryset(qs, include_reverse=True, object_limit=100)
+        export_queryset(qs, include_reverse=True, object_limit=100)
+        b"".join(stream_export_queryset(qs, include_reverse=True, object_limit=100))
+    cache.clear()
+    first, second, third = (stats for _sender, stats in received)
+    assert not first.cached and second.cached and third.cached
+    assert "traversal" not in second.phases
+    # Hits report the counts of the export that stored the entry
+    for hit in (second, third):
+        assert (hit.objects, hit.per_model) == (first.objects, first.per_model)
+    assert first.objects == 7
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import json
+
 import pytest
 from django.apps import apps as django_apps
+from django.contrib import admin
 from django.contrib.auth.models import User
-from django.test import Client
+from django.test import Client, RequestFactory
 from django.urls import reverse
 
 from django_lenskit_fixtures.views import export_action
@@ -112,6 +115,29 @@ def test_export_config_view_post_download_response_headers() -> None:
     assert resp.status_code == 200
     cd = resp.headers.get("Content-Disposition", "")
     assert "attachment;" in cd and "_fixture.json" in cd
+    assert resp.streaming
+    body = b"".join(resp.streaming_content)
+    assert b'"fixtures_testapp.root"' in body
+
+
+@pytest.mark.django_db
+def test_export_config_view_download_too_many_objects_shows_error() -> None:
+    Root = django_apps.get_model("fixtures_testapp", "Root")
+    Item = django_apps.get_model("fixtures_testapp", "Item")
+    r = Root.objects.create(name="R1")
+    Item.objects.create(root=r, label="i1")
+    client = Client()
+    user = User.objects.create_user(username="u8", password="p", is_staff=True)
+    client.force_login(user)
+    model_label = f"{Root._meta.app_label}.{Root._meta.model_name}"
+    url = reverse("django_lenskit_fixtures:export_config")
+    resp = client.post(
+        url + f"?model={model_label}&pks={r.pk}",
+        {"fmt": "json", "include_reverse": "on", "object_limit": 1, "download": "1"},
+    )
+    assert resp.status_code == 200
+    assert not resp.streaming
+    assert b"exceeded" in resp.content
 
 
 @pytest.mark.django_db
@@ -139,3 +165,202 @@ def test_invalid_params_return_400() -> None:
     Root = django_apps.get_model("fixtures_testapp", "Root")
     model_label = f"{Root._meta.app_label}.{Root._meta.model_name}"
     assert client.get(url, {"model": model_label, "pks": ""}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_estimate_view_reports_models_and_relations() -> None:
+    Root = django_apps.get_model("fixtures_testapp", "Root")
+    Item = django_apps.get_model("fixtures_testapp", "Item")
+    r = Root.objects.create(name="R1")
+    for n in range(3):
+        Item.objects.create(root=r, label=f"i{n}")
+    client = Client()
+    user = User.objects.create_user(username="u9", password="p", is_staff=True)
+    client.force_login(user)
+    model_label = f"{Root._meta.app_label}.{Root._meta.model_name}"
+    url = reverse("django_lenskit_fixtures:estimate")
+
+    data = client.get(
+        url, {"model": model_label, "pks": str(r.pk), "rev": "1", "limit": "2"}
+    ).json()
+    assert data["total"] == 4
+    assert data["exceeds_limit"] is True
+    assert {"model": "fixtures_testapp.item", "count": 3} in data["models"]
+    assert data["relations"][0] == {"relation": "fixtures_testapp.root.items_fk", "count": 3}
+
+    data = client.get(url, {"model": model_label, "pks": str(r.pk)}).json()
+    assert data["total"] == 1 and data["exceeds_limit"] is False
+
+    assert client.get(url, {"model": "invalid", "pks": "1"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_export_config_view_download_compressed_uses_double_extension() -> None:
+    import gzip
+
+    Root = django_apps.get_model("fixtures_testapp", "Root")
+    r = Root.objects.create(name="R1")
+    client = Client()
+    user = User.objects.create_user(username="u10", password="p", is_staff=True)
+    client.force_login(user)
+    model_label = f"{Root._meta.app_label}.{Root._meta.model_name}"
+    url = reverse("django_lenskit_fixtures:export_config")
+    resp = client.post(
+        url + f"?model={model_label}&pks={r.pk}",
+        {"fmt": "json.gz", "object_limit": 100, "download": "1"},
+    )
+    assert 'filename="root_fixture.json.gz"' in resp.headers["Content-Disposition"]
+    body = gzip.decompress(b"".join(resp.streaming_content))
+    assert b'"fixtures_testapp.root"' in body
+
+    # Generate previews the uncompressed text
+    resp = client.post(
+        url + f"?model={model_label}&pks={r.pk}", {"fmt": "json.gz", "object_limit": 100}
+    )
+    assert b"fixtures_testapp.root" in resp.content
+
+
+@pytest.mark.django_db
+def test_export_config_view_applies_traversal_options() -> None:
+    Root = django_apps.get_model("fixtures_testapp", "Root")
+    Item = django_apps.get_model("fixtures_testapp", "Item")
+    r = Root.objects.create(name="R1")
+    Item.objects.create(root=r, label="I1")
+    client = Client()
+    client.force_login(User.objects.create_user(username="u9", password="p", is_staff=True))
+    url = (
+        reverse("django_lenskit_fixtures:export_config")
+        + f"?model=fixtures_testapp.root&pks={r.pk}"
+    )
+
+    resp = client.post(
+        url,
+        {
+            "fmt": "json",
+            "include_reverse": "on",
+            "object_limit": 100,
+            "deny_relations": "fixtures_testapp.root.items_fk",
+        },
+    )
+    assert resp.status_code == 200
+    assert b"fixtures_testapp.root" in resp.content
+    assert b"fixtures_testapp.item" not in resp.content
+
+    resp = client.post(
+        url,
+        {"fmt": "json", "object_limit": 100, "deny_relations": "fixtures_testapp.root.nope"},
+    )
+    assert b"Unknown relation in traversal policy" in resp.content
+
+    resp = client.get(
+        reverse("django_lenskit_fixtures:estimate"),
+        {"model": "fixtures_testapp.root", "pks": str(r.pk), "rev": "1", "max_depth": "0"},
+    )
+    assert resp.json()["total"] == 1
+
+
+@pytest.mark.django_db
+def test_export_config_view_shows_export_stats() -> None:
+    Root = django_apps.get_model("fixtures_testapp", "Root")
+    r = Root.objects.create(name="R1")
+    client = Client()
+    client.force_login(User.objects.create_user(username="u10", password="p", is_staff=True))
+    url = (
+        reverse("django_lenskit_fixtures:export_config")
+        + f"?model=fixtures_testapp.root&pks={r.pk}"
+    )
+
+    resp = client.post(url, {"fmt": "json", "object_limit": 100})
+    stats = resp.context["stats"]
+    assert stats.objects == 1 and stats.queries > 0
+    assert b"Export stats: 1 objects" in resp.content
+    assert b"<td>traversal</td>" in resp.content
+
+
+# A changelist the action can run on; all_sites only holds live sites, so keep a reference
+selection_site = admin.AdminSite(name="lenskit_selection_test")
+selection_site.register(
+    django_apps.get_model("fixtures_testapp", "Root"),
+    list_filter=["name"],
+    search_fields=["name"],
+    actions=[export_action],
+)
+
+
+def _run_action(client: Client, user: User, query: str, data: dict) -> str:
+    # Run export_action as the changelist would, with the test client's session
+    Root = django_apps.get_model("fixtures_testapp", "Root")
+    modeladmin = selection_site._registry[Root]
+    request = RequestFactory().post(f"/admin/fixtures_testapp/root/?{query}", data)
+    request.user = user
+    request.session = client.session
+    queryset = modeladmin.get_changelist_instance(request).get_queryset(request)
+    resp = export_action(modeladmin, request, queryset)
+    request.session.save()
+    return resp["Location"]
+
+
+@pytest.mark.django_db
+def test_export_action_keeps_explicit_selection_on_the_server() -> None:
+    Root = django_apps.get_model("fixtures_testapp", "Root")
+    roots = [Root.objects.create(name=f"R{n}") for n in range(3)]
+    user = User.objects.create_superuser(username="s1", password="p")
+    client = Client()
+    client.force_login(user)
+
+    chosen = [str(roots[0].pk), str(roots[2].pk)]
+    location = _run_action(client, user, "", {"_selected_action": chosen})
+    assert "selection=" in location and "pks" not in location
+
+    resp = client.post(location, {"fmt": "json", "object_limit": 100})
+    assert {o["pk"] for o in json.loads(resp.context["data"])} == set(chosen)
+    assert resp.context["selection_label"] == ",".join(chosen)
+
+
+@pytest.mark.django_db
+def test_export_action_without_checkboxes_stores_the_queryset_pks() -> None:
+    Root = django_apps.get_model("fixtures_testapp", "Root")
+    roots = [Root.objects.create(name=f"R{n}") for n in range(3)]
+    user = User.objects.create_superuser(username="s4", password="p")
+    client = Client()
+    client.force_login(user)
+
+    # A caller passing its own queryset, with no checkbox list in the POST
+    location = _run_action(client, user, "q=R1", {})
+    resp = client.post(location, {"fmt": "json", "object_limit": 100})
+    assert [o["pk"] for o in json.loads(resp.context["data"])] == [str(roots[1].pk)]
+
+    modeladmin = selection_site._registry[Root]
+    request = RequestFactory().post("/admin/fixtures_testapp/root/", {})
+    request.user = user
+    request.session = client.session
+    resp = export_action(modeladmin, request, Root.objects.none())
+    assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+def test_export_action_select_all_resolves_changelist_filters() -> None:
+    Root = django_apps.get_model("fixtures_testapp", "Root")
+    a1, a2 = Root.objects.create(name="A1"), Root.objects.create(name="A2")
+    Root.objects.create(name="B1")
+    user = User.objects.create_superuser(username="s2", password="p")
+    client = Client()
+    client.force_login(user)
+
+    location = _run_action(
+        client, user, "q=A", {"select_across": "1", "_selected_action": [str(a1.pk)]}
+    )
+    resp = client.get(location)
+    assert b"all objects matching the changelist filters" in resp.content
+
+    resp = client.post(location, {"fmt": "json", "object_limit": 100})
+    assert {o["pk"] for o in json.loads(resp.context["data"])} == {str(a1.pk), str(a2.pk)}
+    estimate = client.get(
+        reverse("django_lenskit_fixtures:estimate") + "?" + resp.context["selection_query"]
+    )
+    assert estimate.json()["total"] == 2
+
+    # Tokens belong to the session that created them
+    other = Client()
+    other.force_login(User.objects.create_superuser(username="s3", password="p"))
+    assert other.get(location).status_code == 400
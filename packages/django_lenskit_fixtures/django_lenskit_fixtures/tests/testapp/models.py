@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import uuid
 
+from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
+from django.contrib.contenttypes.models import ContentType
 from django.db import models
 
 
@@ -23,5 +25,66 @@ class RootProfile(models.Model):
     notes = models.TextField(blank=True, default="")
 
 
+class Category(models.Model):
+    parent = models.ForeignKey(
+        "self", null=True, blank=True, on_delete=models.CASCADE, related_name="children"
+    )
+    name = models.CharField(max_length=100)
+
+
+class Measurement(models.Model):
+    # Values the serializers format specially (dates, decimals, JSON); no reverse accessor,
+    # so exports starting from Root don't change
+    root = models.ForeignKey(Root, on_delete=models.CASCADE, related_name="+")
+    taken_at = models.DateTimeField()
+    day = models.DateField(null=True)
+    value = models.DecimalField(max_digits=8, decimal_places=3)
+    payload = models.JSONField(default=dict)
+
+
+class Tag(models.Model):
+    # Generic relation to any object; object_id is text so it holds UUID and integer pks
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, related_name="+")
+    object_id = models.CharField(max_length=64)
+    content_object = GenericForeignKey("content_type", "object_id")
+    label = models.CharField(max_length=50)
+
+
+class Article(models.Model):
+    title = models.CharField(max_length=100)
+    tags = GenericRelation(Tag)
+
+
+class BenchHub(models.Model):
+    # Synthetic benchmark graphs (tests/graphs.py): nodes share hubs, so reverse relations
+    # of a hub fan in from many nodes
+    name = models.CharField(max_length=50)
+
+
+class BenchNode(models.Model):
+    parent = models.ForeignKey("self", null=True, on_delete=models.CASCADE, related_name="children")
+    hub = models.ForeignKey(BenchHub, null=True, on_delete=models.CASCADE, related_name="nodes")
+    # Points to an earlier node, closing a cycle through the tree
+    back = models.ForeignKey("self", null=True, on_delete=models.SET_NULL, related_name="+")
+    label = models.CharField(max_length=50)
+    links = models.ManyToManyField("self", symmetrical=False, related_name="linked_from")
+
+
+class Track(models.Model):
+    title = models.CharField(max_length=50)
+
+
+class Playlist(models.Model):
+    # M2M with an explicit through model, whose rows can be written directly
+    name = models.CharField(max_length=50)
+    tracks = models.ManyToManyField(Track, through="PlaylistEntry", related_name="playlists")
+
+
+class PlaylistEntry(models.Model):
+    playlist = models.ForeignKey(Playlist, on_delete=models.CASCADE, related_name="+")
+    track = models.ForeignKey(Track, on_delete=models.CASCADE, related_name="+")
+    position = models.IntegerField(default=0)
+
+
 # Also a forward M2M from Root to Item
 Root.add_to_class("items", models.ManyToManyField(Item, related_name="roots_m2m"))
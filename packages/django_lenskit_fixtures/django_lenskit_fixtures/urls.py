@@ -3,10 +3,28 @@ from __future__ import annotations
 from django.contrib import admin
 from django.urls import path
 
-from .views import export_config_view
+from .views import (
+    estimate_view,
+    export_config_view,
+    job_download_view,
+    job_status_view,
+    preview_page_view,
+)
 
 app_name = "django_lenskit_fixtures"
 
 urlpatterns = [
     path("fixtures/export/", admin.site.admin_view(export_config_view), name="export_config"),
+    path("fixtures/estimate/", admin.site.admin_view(estimate_view), name="estimate"),
+    path(
+        "fixtures/preview/<str:preview_id>/",
+        admin.site.admin_view(preview_page_view),
+        name="preview_page",
+    ),
+    path("fixtures/jobs/<str:job_id>/", admin.site.admin_view(job_status_view), name="job_status"),
+    path(
+        "fixtures/jobs/<str:job_id>/download/",
+        admin.site.admin_view(job_download_view),
+        name="job_download",
+    ),
 ]
@@ -1,15 +1,36 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Optional
+from urllib.parse import urlencode
 
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.contenttypes.models import ContentType
-from django.http import HttpRequest, HttpResponse, HttpResponseBadRequest, HttpResponseRedirect
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpRequest,
+    HttpResponseBadRequest,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.http.response import HttpResponseBase
 from django.shortcuts import render
 from django.urls import reverse
 
-from .exporter import TooManyObjects, export_queryset, fixtures_enabled
-from .forms import FixtureExportForm
+from .exporter import (
+    TooManyObjects,
+    estimate_closure,
+    export_closure,
+    fixtures_enabled,
+    split_format,
+    stream_export_queryset,
+)
+from .forms import FixtureExportForm, split_names
+from .jobs import JobQueueFull, get_job, job_output_path, submit_export
+from .previews import load_preview, preview_page, save_preview
+from .selections import Selection, resolve_selection, store_selection
+from .stats import ExportStats
 
 
 def _parse_model(model_label: str):
@@ -24,24 +45,48 @@ def _parse_model(model_label: str):
         return None
 
 
-@staff_member_required
-def export_config_view(request: HttpRequest) -> HttpResponse:
-    if not fixtures_enabled():
-        return HttpResponseBadRequest("Fixture export is disabled")
-
-    model_label = request.GET.get("model")
-    pks_csv = request.GET.get("pks", "")
+def _parse_selection(request: HttpRequest) -> Selection:
+    # A server-side selection token (from export_action), or model and pks parameters
+    params = request.GET
+    token = params.get("selection")
+    if token:
+        return resolve_selection(request, token)
+    model_label = params.get("model")
+    pks_csv = params.get("pks", "")
     if not model_label:
-        return HttpResponseBadRequest("Missing model parameter")
+        raise ValueError("Missing model parameter")
 
     model = _parse_model(model_label)
     if model is None:
-        return HttpResponseBadRequest("Invalid model parameter")
+        raise ValueError("Invalid model parameter")
 
     ids: list[str] = [s.strip() for s in pks_csv.split(",") if s.strip()]
     if not ids:
-        return HttpResponseBadRequest("Invalid pks parameter")
-    pks: list[Any] = ids
+        raise ValueError("Invalid pks parameter")
+    return Selection(model, model._default_manager.filter(pk__in=ids), ids)
+
+
+def _selection_context(request: HttpRequest, selection: Selection) -> dict[str, Any]:
+    params = {k: request.GET[k] for k in ("selection", "model", "pks") if k in request.GET}
+    return {
+        "model_label": selection.model._meta.label_lower,
+        "selection_label": selection.label,
+        # Identifies the selection for the estimate endpoint
+        "selection_query": urlencode(params),
+    }
+
+
+@staff_member_required
+def export_config_view(request: HttpRequest) -> HttpResponseBase:
+    if not fixtures_enabled():
+        return HttpResponseBadRequest("Fixture export is disabled")
+
+    try:
+        selection = _parse_selection(request)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    model = selection.model
+    selected = _selection_context(request, selection)
 
     default_limit = request.GET.get("limit")
     form_initial = {
@@ -60,42 +105,91 @@ def export_config_view(request: HttpRequest) -> HttpResponse:
             fmt = form.cleaned_data["fmt"]
             include_reverse = form.cleaned_data["include_reverse"]
             object_limit = form.cleaned_data["object_limit"]
-            qs = model._default_manager.filter(pk__in=pks)
-            try:
-                data = export_queryset(
-                    qs,
-                    include_reverse=include_reverse,
-                    object_limit=object_limit,
-                    fmt=fmt,
+            dependency_order = form.cleaned_data["dependency_order"]
+            traversal_policy = form.traversal_policy()
+            filename = f"{model._meta.model_name}_fixture.{fmt}"
+            if request.POST.get("background"):
+                job_id: Optional[str] = None
+                error: Optional[str] = None
+                try:
+                    job_id = submit_export(
+                        model._meta.label,
+                        selection.pks if selection.pks is not None else selection.queryset,
+                        include_reverse=include_reverse,
+                        object_limit=object_limit,
+                        fmt=fmt,
+                        dependency_order=dependency_order,
+                        traversal_policy=traversal_policy,
+                        filename=filename,
+                        owner_id=request.user.pk,
+                    )
+                except JobQueueFull as e:
+                    error = str(e)
+                return render(
+                    request,
+                    "admin_lenskit/fixture_export.html",
+                    {
+                        "form": form,
+                        **selected,
+                        "error": error,
+                        "data": None,
+                        "job_id": job_id,
+                    },
                 )
+            qs = selection.queryset
+            download = bool(request.POST.get("download"))
+            stats = ExportStats()
+            try:
+                if download:
+                    chunks = stream_export_queryset(
+                        qs,
+                        include_reverse=include_reverse,
+                        object_limit=object_limit,
+                        fmt=fmt,
+                        dependency_order=dependency_order,
+                        traversal_policy=traversal_policy,
+                    )
+                else:
+                    closure = export_closure(
+                        qs,
+                        include_reverse=include_reverse,
+                        object_limit=object_limit,
+                        dependency_order=dependency_order,
+                        traversal_policy=traversal_policy,
+                        stats=stats,
+                    )
             except TooManyObjects as e:
                 return render(
                     request,
                     "admin_lenskit/fixture_export.html",
                     {
                         "form": form,
-                        "model_label": model_label,
-                        "pks_csv": pks_csv,
+                        **selected,
                         "error": str(e),
                         "data": None,
+                        "stats": stats,
                     },
                 )
-            response = render(
+            if download:
+                response = StreamingHttpResponse(chunks, content_type="application/octet-stream")
+                response["Content-Disposition"] = f'attachment; filename="{filename}"'
+                return response
+            # The preview shows the first page of the uncompressed text; later pages are
+            # serialized on demand from the saved closure (preview_page_view)
+            state = save_preview(closure, fmt=split_format(fmt)[0], owner_id=request.user.pk)
+            preview = preview_page(state, 0)
+            return render(
                 request,
                 "admin_lenskit/fixture_export.html",
                 {
                     "form": form,
-                    "model_label": model_label,
-                    "pks_csv": pks_csv,
+                    **selected,
                     "error": None,
-                    "data": data,
+                    "data": preview["text"],
+                    "preview": {"id": state["id"], **preview},
+                    "stats": stats,
                 },
             )
-            if request.POST.get("download"):
-                filename = f"{model._meta.model_name}_fixture.{fmt}"
-                response = HttpResponse(data, content_type="application/octet-stream")
-                response["Content-Disposition"] = f'attachment; filename="{filename}"'
-            return response
     else:
         form = FixtureExportForm(initial=form_initial)
 
@@ -104,19 +198,124 @@ def export_config_view(request: HttpRequest) -> HttpResponse:
         "admin_lenskit/fixture_export.html",
         {
             "form": form,
-            "model_label": model_label,
-            "pks_csv": pks_csv,
+            **selected,
             "error": None,
             "data": None,
         },
     )
 
 
+@staff_member_required
+def estimate_view(request: HttpRequest) -> JsonResponse:
+    if not fixtures_enabled():
+        return JsonResponse({"error": "Fixture export is disabled"}, status=400)
+    try:
+        selection = _parse_selection(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    try:
+        object_limit: Optional[int] = max(1, int(request.GET.get("limit", "")))
+    except ValueError:
+        object_limit = None
+    try:
+        max_depth: Optional[int] = max(0, int(request.GET.get("max_depth", "")))
+    except ValueError:
+        max_depth = None
+
+    try:
+        estimate = estimate_closure(
+            selection.queryset,
+            include_reverse=bool(request.GET.get("rev")),
+            object_limit=object_limit,
+            traversal_policy={
+                "max_depth": max_depth,
+                "deny": split_names(request.GET.get("deny_relations", "")),
+                "stop_at": split_names(request.GET.get("stop_at", "")),
+            },
+        )
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    return JsonResponse(
+        {
+            "total": estimate.total,
+            "at_least": estimate.at_least,
+            "object_limit": estimate.object_limit,
+            "exceeds_limit": estimate.total > estimate.object_limit,
+            "models": [
+                {"model": label, "count": count} for label, count in estimate.per_model.items()
+            ],
+            "relations": [
+                {"relation": name, "count": count}
+                for name, count in list(estimate.per_relation.items())[:10]
+            ],
+        }
+    )
+
+
+def _owned(request: HttpRequest, state: Optional[dict[str, Any]]) -> Optional[dict[str, Any]]:
+    if state is None:
+        return None
+    owner_id = state.get("owner_id")
+    if owner_id is not None and owner_id != request.user.pk and not request.user.is_superuser:
+        return None
+    return state
+
+
+def _owned_job(request: HttpRequest, job_id: str) -> Optional[dict[str, Any]]:
+    return _owned(request, get_job(job_id))
+
+
+@staff_member_required
+def preview_page_view(request: HttpRequest, preview_id: str) -> JsonResponse:
+    state = _owned(request, load_preview(preview_id))
+    if state is None:
+        return JsonResponse({"error": "Unknown or expired preview"}, status=404)
+    try:
+        page = int(request.GET.get("page", "0"))
+    except ValueError:
+        return JsonResponse({"error": "Invalid page"}, status=400)
+    return JsonResponse(preview_page(state, page))
+
+
+@staff_member_required
+def job_status_view(request: HttpRequest, job_id: str) -> JsonResponse:
+    status = _owned_job(request, job_id)
+    if status is None:
+        return JsonResponse({"error": "Unknown export job"}, status=404)
+    payload = {k: v for k, v in status.items() if k != "owner_id"}
+    if status.get("state") == "done":
+        payload["download_url"] = reverse(
+            "django_lenskit_fixtures:job_download", kwargs={"job_id": job_id}
+        )
+    return JsonResponse(payload)
+
+
+@staff_member_required
+def job_download_view(request: HttpRequest, job_id: str) -> HttpResponseBase:
+    status = _owned_job(request, job_id)
+    if status is None or status.get("state") != "done":
+        raise Http404("Export job not found or not finished")
+    return FileResponse(
+        open(job_output_path(job_id), "rb"),
+        as_attachment=True,
+        filename=status.get("filename") or "fixture",
+        content_type="application/octet-stream",
+    )
+
+
 def export_action(modeladmin, request: HttpRequest, queryset):
+    url = reverse("django_lenskit_fixtures:export_config")
+    if request is not None and hasattr(request, "session"):
+        # The selection stays on the server; "select all" is not even materialized as pks
+        try:
+            token = store_selection(request, modeladmin, queryset)
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+        return HttpResponseRedirect(f"{url}?{urlencode({'selection': token})}")
+    # Without a session (called outside the admin) the pks go in the URL
     ids = ",".join(str(pk) for pk in queryset.values_list("pk", flat=True))
     model = queryset.model
     label = f"{model._meta.app_label}.{model._meta.model_name}"
-    url = reverse("django_lenskit_fixtures:export_config")
     return HttpResponseRedirect(f"{url}?model={label}&pks={ids}")
 
 